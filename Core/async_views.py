@@ -0,0 +1,136 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from graphql import ExecutionContext
+
+from Core.db_router import current_routing, using_routing
+from Core.profiling import current_profile, using_profile
+
+# Worker threads resolving the root fields of GraphQL queries; each keeps its
+# own database connection between requests, like a WSGI worker thread.
+ROOT_FIELD_WORKERS = 8
+
+_root_field_executor = ThreadPoolExecutor(
+    max_workers=ROOT_FIELD_WORKERS, thread_name_prefix="graphql-root-field"
+)
+_execute_wrappers = ContextVar("request_execute_wrappers", default={})
+
+
+@contextmanager
+def sharing_execute_wrappers():
+    """
+    Make the execute wrappers installed on this thread's connections (the
+    profiler's, the metrics' and record_queries') run on the worker threads'
+    connections too, for the root fields resolved in the block.
+    """
+    token = _execute_wrappers.set(
+        {connection.alias: list(connection.execute_wrappers) for connection in connections.all()}
+    )
+    try:
+        yield
+    finally:
+        _execute_wrappers.reset(token)
+
+
+class AsyncViewSetMixin:
+    """
+    With settings.ASYNC_VIEWS (on under Core.asgi), routes every action that
+    has an ``a<action>`` coroutine (``alist``, ``aretrieve``, ``ame``...) to
+    it, so the request holds no thread while it awaits. Authentication,
+    permissions and throttling still run once, in a worker thread, before the
+    handler. Actions without a coroutine keep their sync dispatch.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        if not getattr(settings, "ASYNC_VIEWS", False):
+            return sync_view
+
+        async_actions = {
+            method: action
+            for method, action in actions.items()
+            if asyncio.iscoroutinefunction(getattr(cls, f"a{action}", None))
+        }
+        if not async_actions:
+            return sync_view
+
+        async def view(request, *args, **kwargs):
+            method = request.method.lower()
+            action = async_actions.get(method)
+            if action is None and method == "head":
+                action = async_actions.get("get")
+            if action is None:
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, name in actions.items():
+                setattr(self, method, getattr(self, name))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, action, *args, **kwargs)
+
+        return update_wrapper(view, sync_view)
+
+    async def adispatch(self, request, action, *args, **kwargs):
+        """APIView.dispatch awaiting ``a<action>``."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await getattr(self, f"a{action}")(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class ConcurrentExecutionContext(ExecutionContext):
+    """
+    Resolves the root fields of a query concurrently on graphql-core's async
+    executor: each root field and its whole subtree resolve in a worker
+    thread, with that thread's database connection. Only for queries run
+    outside a transaction, whose rows other connections could not see.
+    Run it inside sharing_execute_wrappers() so the request's execute
+    wrappers also see the queries of the worker threads.
+    """
+
+    def execute_field(self, parent_type, source, field_nodes, path):
+        if path.prev is not None:
+            return super().execute_field(parent_type, source, field_nodes, path)
+        return asyncio.get_running_loop().run_in_executor(
+            _root_field_executor,
+            self.execute_root_field,
+            current_profile(),
+            current_routing(),
+            _execute_wrappers.get(),
+            parent_type,
+            source,
+            field_nodes,
+            path,
+        )
+
+    def execute_root_field(
+        self, profile, routing, execute_wrappers, parent_type, source, field_nodes, path
+    ):
+        try:
+            with using_profile(profile), using_routing(routing), ExitStack() as stack:
+                for alias, wrappers in execute_wrappers.items():
+                    for wrapper in wrappers:
+                        stack.enter_context(connections[alias].execute_wrapper(wrapper))
+                return super().execute_field(parent_type, source, field_nodes, path)
+        finally:
+            close_old_connections()
@@ -0,0 +1,90 @@
+from django.db.models import Model, QuerySet, prefetch_related_objects
+
+BATCH_ATTR = "_graphql_batch"
+
+
+def attach_batch(instances):
+    """Remember the sibling instances resolved together at one query level."""
+    instances = list(instances)
+    for instance in instances:
+        if isinstance(instance, Model):
+            setattr(instance, BATCH_ATTR, instances)
+    return instances
+
+
+def _is_loaded(instance, name):
+    field = instance._meta.get_field(name)
+    if field.many_to_many or field.one_to_many:
+        return name in getattr(instance, "_prefetched_objects_cache", {})
+    return field.is_cached(instance)
+
+
+def _related_instances(instance, name):
+    field = instance._meta.get_field(name)
+    if field.many_to_many or field.one_to_many:
+        return list(getattr(instance, name).all())
+    related = getattr(instance, name, None)
+    return [related] if related is not None else []
+
+
+def _attach_related(batch, name):
+    related = {}
+    for sibling in batch:
+        if _is_loaded(sibling, name):
+            for obj in _related_instances(sibling, name):
+                related[id(obj)] = obj
+    attach_batch(related.values())
+
+
+def load_related(instance, name):
+    """
+    Resolve ``instance.<name>`` batching the lookup across its siblings.
+
+    The first sibling to ask for a relation loads it for the whole batch with
+    a single ``IN (...)`` query; the related objects then become the batch of
+    the next query level.
+    """
+    batch = getattr(instance, BATCH_ATTR, None) or [instance]
+    if not _is_loaded(instance, name):
+        prefetch_related_objects(batch, name)
+        _attach_related(batch, name)
+    elif any(not hasattr(obj, BATCH_ATTR) for obj in _related_instances(instance, name)):
+        # Loaded by select_related: still batch the level below.
+        _attach_related(batch, name)
+
+    field = instance._meta.get_field(name)
+    if field.many_to_many or field.one_to_many:
+        return list(getattr(instance, name).all())
+    return getattr(instance, name, None)
+
+
+def load_field(instance, name):
+    """
+    Resolve a deferred ``instance.<name>`` loading it for every sibling that
+    also defers it with one query.
+    """
+    if name in instance.get_deferred_fields():
+        batch = getattr(instance, BATCH_ATTR, None) or [instance]
+        pending = [obj for obj in batch if name in obj.get_deferred_fields()]
+        values = dict(
+            type(instance)
+            ._base_manager.using(instance._state.db)
+            .filter(pk__in=[obj.pk for obj in pending])
+            .values_list("pk", name)
+        )
+        for obj in pending:
+            setattr(obj, name, values.get(obj.pk))
+    return getattr(instance, name)
+
+
+class DataLoaderMiddleware:
+    """
+    Graphene middleware that materializes list results once per field so the
+    relation resolvers of their items can be batched per request.
+    """
+
+    def resolve(self, next, root, info, **args):
+        result = next(root, info, **args)
+        if isinstance(result, QuerySet):
+            return attach_batch(result)
+        return result
@@ -0,0 +1,207 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from user.token_cache import request_user
+
+# Signed cookie that pins a client to the primary after it writes, and the
+# cache key prefix of the same pin for authenticated users (whose token
+# clients often keep no cookies).
+PIN_COOKIE = "replica_pin"
+PIN_SALT = "Core.db_router.pin"
+PIN_CACHE_PREFIX = "replica_pin:"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+DEFAULTS = {
+    # DATABASES aliases of the replicas; each request reads from one picked at random.
+    "ALIASES": [],
+    # After a write, the client's requests read from the primary this long.
+    "STICKY_SECONDS": 5,
+    # Holds the pins of authenticated users; shared by every worker with REDIS_URL.
+    "CACHE_ALIAS": "default",
+}
+
+_current = ContextVar("replica_routing", default=None)
+
+
+def replica_settings():
+    return {**DEFAULTS, **getattr(settings, "READ_REPLICAS", {})}
+
+
+def replica_aliases():
+    return [alias for alias in replica_settings()["ALIASES"] if alias in settings.DATABASES]
+
+
+class RoutingState:
+    """Where the reads of the request being handled may go."""
+
+    def __init__(self, use_replica=False, pinned=False):
+        self.use_replica = use_replica and not pinned
+        self.pinned = pinned
+        self.wrote = False
+        # The replica every read of the request goes to, picked on the first one.
+        self.replica = None
+
+
+def current_routing():
+    return _current.get()
+
+
+@contextmanager
+def using_routing(state):
+    """Make ``state`` current in the block, e.g. in a worker thread of the request."""
+    token = _current.set(state)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def allow_replica_reads():
+    """
+    Let the rest of the request read from the replicas unless its client is
+    pinned to the primary or it already wrote. For requests whose method
+    does not say whether they write, such as GraphQL queries over POST.
+    """
+    state = _current.get()
+    if state is not None and not state.pinned and not state.wrote:
+        state.use_replica = True
+
+
+def replica_may_lag(changed_at):
+    """
+    Whether the current request reads from a replica that may not have
+    caught up with a change made at ``changed_at`` (an aware datetime):
+    anything it builds from the replica should not be cached.
+    """
+    state = _current.get()
+    if state is None or not state.use_replica:
+        return False
+    return changed_at.timestamp() > time.time() - replica_settings()["STICKY_SECONDS"]
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a replica (READ_REPLICAS["ALIASES"]) only inside requests
+    that ReplicaRoutingMiddleware or the GraphQL view marked as read-only,
+    and never inside a transaction on the primary. Writes, and every read
+    after one, go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None:
+            return None
+        if not state.use_replica or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Related objects come from wherever their instance was read.
+            return instance._state.db
+        if state.replica is None:
+            aliases = replica_aliases()
+            state.replica = random.choice(aliases) if aliases else DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+            state.use_replica = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets GET/HEAD/OPTIONS requests read from the replicas and pins a client
+    to the primary for STICKY_SECONDS after any request of theirs that
+    wrote (went through ReplicaRouter.db_for_write), so that they read their
+    own writes. The pin is a signed cookie, which holds whichever worker
+    serves the client next, and for authenticated users (identified by
+    session or token before any view runs) also a cache entry, for token
+    clients that send no cookies. Removed from the stack when no replica is
+    configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        self.options = replica_settings()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user, pinned = self.start(request)
+        state = RoutingState(request.method in SAFE_METHODS, pinned)
+        with using_routing(state):
+            response = self.get_response(request)
+        self.finish(request, response, state, user)
+        return response
+
+    async def __acall__(self, request):
+        user, pinned = await sync_to_async(self.start)(request)
+        state = RoutingState(request.method in SAFE_METHODS, pinned)
+        with using_routing(state):
+            response = await self.get_response(request)
+        if state.wrote:
+            await sync_to_async(self.finish)(request, response, state, user)
+        return response
+
+    def start(self, request):
+        user = request_user(request)
+        return user, self.is_pinned(request, user)
+
+    def is_pinned(self, request, user=None):
+        cache = caches[self.options["CACHE_ALIAS"]]
+        if user is not None and cache.get(f"{PIN_CACHE_PREFIX}{user.pk}"):
+            return True
+        # The signature's timestamp expires the pin, whatever the client does with the cookie.
+        pin = request.get_signed_cookie(
+            PIN_COOKIE, default=None, salt=PIN_SALT, max_age=self.options["STICKY_SECONDS"]
+        )
+        return pin is not None
+
+    def finish(self, request, response, state, user=None):
+        if not state.wrote:
+            return
+        sticky = self.options["STICKY_SECONDS"]
+        if user is None:
+            # Authenticated by the view, e.g. a login.
+            user = request_user(request)
+        if user is not None:
+            caches[self.options["CACHE_ALIAS"]].set(f"{PIN_CACHE_PREFIX}{user.pk}", True, sticky)
+        response.set_signed_cookie(
+            PIN_COOKIE, "1", salt=PIN_SALT, max_age=sticky,
+            secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite="Lax",
+        )
+
+
+def copy_sqlite_database(source=DEFAULT_DB_ALIAS, target="replica"):
+    """
+    Overwrite the SQLite database ``target`` with a snapshot of ``source``:
+    what replication does continuously, done on demand for local replicas.
+    """
+    for alias in (source, target):
+        if connections[alias].vendor != "sqlite":
+            raise ValueError(f"{alias} is not a SQLite database")
+        connections[alias].ensure_connection()
+    connections[source].connection.backup(connections[target].connection)
@@ -0,0 +1,87 @@
+from graphql import OperationType, get_named_type
+
+from blog.conditional import make_etag, queryset_validator
+from blog.response_cache import generation_time, get_generations, model_label
+from Core.query_cost import collect_fields, get_fragments, get_operation
+
+
+def document_models(schema, document, operation_name=None):
+    """Return the Django models behind every object type a query selects."""
+    operation = get_operation(document, operation_name)
+    if operation is None or operation.operation != OperationType.QUERY:
+        return []
+
+    fragments = get_fragments(document)
+    models = []
+    walked = set()
+
+    def walk(selection_set, parent_type, visited=frozenset()):
+        # A selection set reached again (through a fragment) selects the same models.
+        key = (id(selection_set), parent_type.name)
+        if key in walked:
+            return
+        walked.add(key)
+        for field_node, owner, spread in collect_fields(
+            schema, fragments, selection_set, parent_type, visited
+        ):
+            field = getattr(owner, "fields", {}).get(field_node.name.value)
+            if field is None or not field_node.selection_set:
+                continue
+            named_type = get_named_type(field.type)
+            graphene_type = getattr(named_type, "graphene_type", None)
+            model = getattr(getattr(graphene_type, "_meta", None), "model", None)
+            if model is not None and model not in models:
+                models.append(model)
+            walk(field_node.selection_set, named_type, spread)
+
+    walk(operation.selection_set, schema.query_type)
+    return models
+
+
+def _through_models(models):
+    """Auto-created m2m tables linking two of ``models``; they never move updated_at."""
+    through = []
+    for model in models:
+        for field in model._meta.many_to_many:
+            table = field.remote_field.through
+            if field.related_model in models and table not in through:
+                through.append(table)
+    return through
+
+
+def document_validators(schema, document, operation_name, variables, query_key):
+    """
+    Validators for the data a query reads: MAX(updated_at) and row count for
+    models that track ``updated_at`` (one aggregate each), plus the change
+    generation of every model, which also moves on UPDATEs that bypass
+    ``updated_at`` (counters), and of m2m links between selected models.
+    Returns None for mutations and subscriptions.
+    """
+    models = document_models(schema, document, operation_name)
+    if not models:
+        return None
+
+    per_model = {}
+    changes = []
+    for model in models:
+        label = model_label(model)
+        (generation,) = get_generations([label])
+        per_model[label] = {"generation": generation}
+        changes.append(generation_time([generation]))
+        if any(field.name == "updated_at" for field in model._meta.concrete_fields):
+            last_modified, count = queryset_validator(model._default_manager.all())
+            per_model[label].update(
+                lastModified=last_modified.isoformat() if last_modified else None,
+                count=count,
+            )
+
+    for table in _through_models(models):
+        (generation,) = get_generations([model_label(table)])
+        per_model[model_label(table)] = {"generation": generation}
+        changes.append(generation_time([generation]))
+
+    return {
+        "etag": make_etag(query_key, variables, per_model),
+        "lastModified": max(changes).isoformat() if changes else None,
+        "models": per_model,
+    }
@@ -1,7 +1,10 @@
+import graphene
 from graphene_django import DjangoObjectType
 from blog.models import Blog, Post
 from tag.models import Tag
 from django.contrib.auth.models import User
+from Core.dataloaders import load_field, load_related
+from Core.pagination import CountableConnection
 
 
 class UserType(DjangoObjectType):
@@ -9,20 +12,73 @@ class UserType(DjangoObjectType):
         model = User
         fields = "__all__"
 
+    def resolve_blog(self, info):
+        return load_related(self, "blog")
+
 
 class BlogType(DjangoObjectType):
     class Meta:
         model = Blog
         fields = "__all__"
 
+    def resolve_user(self, info):
+        return load_related(self, "user")
+
+    def resolve_posts(self, info):
+        return load_related(self, "posts")
+
 
 class PostType(DjangoObjectType):
     class Meta:
         model = Post
-        fields = "__all__"
+        exclude = ("search_vector",)
+
+    def resolve_blog(self, info):
+        return load_related(self, "blog")
+
+    def resolve_tags(self, info):
+        return load_related(self, "tags")
 
 
 class TagType(DjangoObjectType):
     class Meta:
         model = Tag
         fields = "__all__"
+
+    def resolve_post_count(self, info):
+        # Autocomplete serves tags with only id and name loaded.
+        return load_field(self, "post_count")
+
+    def resolve_posts(self, info):
+        return load_related(self, "posts")
+
+
+class UserConnection(CountableConnection):
+    class Meta:
+        node = UserType
+
+
+class BlogConnection(CountableConnection):
+    class Meta:
+        node = BlogType
+
+
+class PostConnection(CountableConnection):
+    class Meta:
+        node = PostType
+
+
+class TagConnection(CountableConnection):
+    class Meta:
+        node = TagType
+
+
+class BulkItemErrorType(graphene.ObjectType):
+    index = graphene.Int()
+    field = graphene.String()
+    messages = graphene.List(graphene.String)
+
+
+class MatchMode(graphene.Enum):
+    CONTAINS = "contains"
+    PREFIX = "prefix"
@@ -0,0 +1,449 @@
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+DEFAULTS = {
+    "ENABLED": True,
+    # Shared by every worker process; each one writes its own snapshot there
+    # and /metrics adds them up. None serves this process's metrics only.
+    "DIRECTORY": None,
+    "FLUSH_INTERVAL": 1.0,
+    # /metrics requires ``Authorization: Bearer <TOKEN>``; without a token it
+    # is only served with DEBUG on.
+    "TOKEN": None,
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Operation names come from clients; past this many distinct ones they are "other".
+MAX_OPERATION_NAMES = 200
+OPERATION_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, "METRICS", {})}
+
+
+class Metric:
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.samples = {}
+        self._lock = registry.lock
+        registry.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def describe(self):
+        return {"type": self.type, "help": self.documentation, "labelnames": self.labelnames}
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.samples[key] = self.samples.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """A current value; the values of several processes add up."""
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.samples[key] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(registry, name, documentation, labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                sample = self.samples[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    sample[0][index] += 1
+                    break
+            sample[1] += value
+            sample[2] += 1
+
+    def describe(self):
+        return {**super().describe(), "buckets": self.buckets}
+
+
+class Registry:
+    """
+    In-process metrics. ``snapshot()`` is a JSON-serializable copy that can be
+    merged with the snapshots of other worker processes and rendered in the
+    Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.collectors = []
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def add_collector(self, collector):
+        """Call ``collector()`` before every snapshot, to update gauges from their source."""
+        self.collectors.append(collector)
+        return collector
+
+    def snapshot(self):
+        for collector in self.collectors:
+            collector()
+        with self.lock:
+            return {
+                name: {
+                    **metric.describe(),
+                    "samples": [[list(key), json.loads(json.dumps(value))]
+                                for key, value in metric.samples.items()],
+                }
+                for name, metric in self.metrics.items()
+            }
+
+    def _path(self, directory):
+        return Path(directory) / f"metrics-{os.getpid()}.json"
+
+    def flush(self, directory):
+        """Write this process's snapshot atomically to ``directory``."""
+        path = self._path(directory)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.snapshot()))
+        os.replace(temporary, path)
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self, directory, interval):
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush(directory)
+
+    def collect(self, directory=None):
+        """This process's snapshot, or the sum of every process's in ``directory``."""
+        if directory is None:
+            return self.snapshot()
+        self.flush(directory)
+        snapshots = []
+        for path in Path(directory).glob("metrics-*.json"):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if not _running(path.stem.removeprefix("metrics-")):
+                # A finished worker's counts still add up, but its gauges
+                # describe a pool or queue that no longer exists.
+                snapshot = {name: metric for name, metric in snapshot.items() if metric["type"] != "gauge"}
+            snapshots.append(snapshot)
+        return merge_snapshots(snapshots)
+
+
+def _running(pid):
+    try:
+        os.kill(int(pid), 0)
+    except PermissionError:
+        return True
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def merge_snapshots(snapshots):
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for key, value in metric["samples"]:
+                key = tuple(key)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif metric["type"] in ("counter", "gauge"):
+                    target["samples"][key] = current + value
+                else:
+                    buckets = [a + b for a, b in zip(current[0], value[0])]
+                    target["samples"][key] = [buckets, current[1] + value[1], current[2] + value[2]]
+    for metric in merged.values():
+        metric["samples"] = [[list(key), value] for key, value in metric["samples"].items()]
+    return merged
+
+
+def _escape(value):
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshot):
+    """The text exposition format (version 0.0.4) of a snapshot."""
+    lines = []
+    for name, metric in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for key, value in sorted(metric["samples"]):
+            if metric["type"] in ("counter", "gauge"):
+                lines.append(f"{name}{_labels(labelnames, key)} {_number(value)}")
+                continue
+            buckets, total, count = value
+            cumulative = 0
+            for bound, observed in zip(metric["buckets"], buckets):
+                cumulative += observed
+                le = (("le", _number(bound)),)
+                lines.append(f"{name}_bucket{_labels(labelnames, key, le)} {cumulative}")
+            lines.append(f'{name}_bucket{_labels(labelnames, key, (("le", "+Inf"),))} {count}')
+            lines.append(f"{name}_sum{_labels(labelnames, key)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labelnames, key)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+request_duration = Histogram(
+    registry,
+    "http_request_duration_seconds",
+    "Request latency by route.",
+    ("method", "route", "status"),
+)
+request_queries = Histogram(
+    registry,
+    "http_request_db_queries",
+    "SQL queries run per request, by route.",
+    ("route",),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+graphql_duration = Histogram(
+    registry,
+    "graphql_operation_duration_seconds",
+    "GraphQL execution latency by operation.",
+    ("operation", "type"),
+)
+token_cache_requests = Counter(
+    registry,
+    "auth_token_cache_requests_total",
+    "Auth token lookups by cache result.",
+    ("result",),
+)
+api_errors = Counter(
+    registry,
+    "api_errors_total",
+    "Error responses built by custom_exception_handler, by code.",
+    ("code", "status"),
+)
+
+pool_connections = Gauge(
+    registry,
+    "db_pool_connections",
+    "Connections of the database connection pool: idle, or in_use (lent or being opened).",
+    ("alias", "state"),
+)
+pool_max_connections = Gauge(
+    registry,
+    "db_pool_max_connections",
+    "Maximum size of the database connection pool.",
+    ("alias",),
+)
+pool_waiting = Gauge(
+    registry,
+    "db_pool_waiting_requests",
+    "Requests waiting for a pooled connection.",
+    ("alias",),
+)
+pool_checkouts = Counter(
+    registry,
+    "db_pool_checkouts_total",
+    "Connections requested from the pool.",
+    ("alias",),
+)
+pool_checkout_wait = Counter(
+    registry,
+    "db_pool_checkout_wait_seconds_total",
+    "Time spent waiting for a pooled connection.",
+    ("alias",),
+)
+pool_checkout_timeouts = Counter(
+    registry,
+    "db_pool_checkout_timeouts_total",
+    "Requests that gave up waiting for a pooled connection.",
+    ("alias",),
+)
+pool_connections_opened = Counter(
+    registry,
+    "db_pool_connections_opened_total",
+    "Connections opened by the pool.",
+    ("alias",),
+)
+pool_connections_lost = Counter(
+    registry,
+    "db_pool_connections_lost_total",
+    "Broken connections discarded by the health check on checkout.",
+    ("alias",),
+)
+
+
+def connection_pools():
+    """The open connection pools of this process, by database alias."""
+    pools = {}
+    for alias in connections:
+        if not connections.settings[alias].get("OPTIONS", {}).get("pool"):
+            continue
+        pool = connections[alias].pool
+        if pool is not None and not pool.closed:
+            pools[alias] = pool
+    return pools
+
+
+@registry.add_collector
+def collect_pool_stats():
+    for alias, pool in connection_pools().items():
+        # pop_stats() resets the pool's counters, so they are added up here.
+        stats = pool.pop_stats()
+        in_use = stats["pool_size"] - stats["pool_available"]
+        pool_connections.set(stats["pool_available"], alias=alias, state="idle")
+        pool_connections.set(in_use, alias=alias, state="in_use")
+        pool_max_connections.set(stats["pool_max"], alias=alias)
+        pool_waiting.set(stats["requests_waiting"], alias=alias)
+        pool_checkouts.inc(stats.get("requests_num", 0), alias=alias)
+        pool_checkout_wait.inc(stats.get("requests_wait_ms", 0) / 1000, alias=alias)
+        pool_checkout_timeouts.inc(stats.get("requests_errors", 0), alias=alias)
+        pool_connections_opened.inc(stats.get("connections_num", 0), alias=alias)
+        pool_connections_lost.inc(stats.get("connections_lost", 0), alias=alias)
+
+
+_operation_names = set()
+
+
+def operation_label(name):
+    """A bounded label for a client-chosen GraphQL operation name."""
+    if not name:
+        return "anonymous"
+    if not OPERATION_NAME.match(name):
+        return "other"
+    if name not in _operation_names:
+        if len(_operation_names) >= MAX_OPERATION_NAMES:
+            return "other"
+        _operation_names.add(name)
+    return name
+
+
+def route_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route or "unmatched"
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    Records the latency and SQL query count of every request by route, and
+    flushes this process's metrics to METRICS["DIRECTORY"] at most every
+    FLUSH_INTERVAL seconds.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.options = metrics_settings()
+        if not self.options["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        if self.options["DIRECTORY"]:
+            atexit.register(registry.flush, self.options["DIRECTORY"])
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = _QueryCounter()
+        started = time.perf_counter()
+        with self.counting(queries):
+            response = self.get_response(request)
+        return self.record(request, response, started, queries)
+
+    async def __acall__(self, request):
+        queries = _QueryCounter()
+        started = time.perf_counter()
+        with self.counting(queries):
+            response = await self.get_response(request)
+        return self.record(request, response, started, queries)
+
+    @contextmanager
+    def counting(self, queries):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            yield
+
+    def record(self, request, response, started, queries):
+        route = route_label(request)
+        request_duration.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=route,
+            status=response.status_code,
+        )
+        request_queries.observe(queries.count, route=route)
+        if self.options["DIRECTORY"]:
+            registry.maybe_flush(self.options["DIRECTORY"], self.options["FLUSH_INTERVAL"])
+        return response
+
+
+def metrics_view(request):
+    options = metrics_settings()
+    token = options["TOKEN"]
+    if token is None and not settings.DEBUG:
+        return HttpResponseForbidden()
+    authorization = request.headers.get("Authorization", "")
+    if token and not constant_time_compare(authorization, f"Bearer {token}"):
+        return HttpResponseForbidden()
+    snapshot = registry.collect(options["DIRECTORY"])
+    return HttpResponse(render(snapshot), content_type=CONTENT_TYPE)
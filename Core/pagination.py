@@ -0,0 +1,177 @@
+import base64
+import json
+from functools import partial
+
+import graphene
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from graphene import relay
+from graphene_django.settings import graphene_settings
+
+from Core.dataloaders import attach_batch
+from user.exceptions import BaseAPIException
+
+INVALID_CURSOR = "Invalid cursor"
+
+
+class CountableConnection(relay.Connection):
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int()
+
+    def resolve_total_count(root, info):
+        # Only runs when the client selects totalCount.
+        return root.iterable.count()
+
+
+def _field_name(key):
+    return key.lstrip("-")
+
+
+def _reverse(ordering):
+    return tuple(key[1:] if key.startswith("-") else f"-{key}" for key in ordering)
+
+
+def encode_cursor(instance, ordering):
+    values = []
+    for key in ordering:
+        value = getattr(instance, _field_name(key))
+        values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _cursor_value(model, name, value):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        # Annotations such as a search rank.
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(value)
+        return value
+    return field.to_python(value)
+
+
+def decode_cursor(cursor, model, ordering):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError(cursor)
+        return [
+            _cursor_value(model, _field_name(key), value)
+            for key, value in zip(ordering, values)
+        ]
+    except Exception:
+        raise BaseAPIException(INVALID_CURSOR)
+
+
+def seek_filter(ordering, values):
+    """
+    Build the keyset predicate selecting the rows strictly after ``values``
+    when the queryset is sorted by ``ordering``.
+    """
+    condition = Q()
+    equal = Q()
+    for key, value in zip(ordering, values):
+        name = _field_name(key)
+        lookup = "lt" if key.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def keyset_page(
+    queryset,
+    ordering,
+    first=None,
+    last=None,
+    after=None,
+    before=None,
+    max_limit=None,
+):
+    """
+    Return ``(nodes, has_previous_page, has_next_page)`` for a Relay page of
+    ``queryset``. Every page is one index range scan, whatever its depth.
+    """
+    for value in (first, last):
+        if value is not None and value < 0:
+            raise BaseAPIException("Pagination arguments must be positive")
+    if first is None and last is None:
+        first = max_limit
+    if max_limit:
+        first = min(first, max_limit) if first is not None else None
+        last = min(last, max_limit) if last is not None else None
+
+    model = queryset.model
+    if after is not None:
+        queryset = queryset.filter(
+            seek_filter(ordering, decode_cursor(after, model, ordering))
+        )
+    if before is not None:
+        queryset = queryset.filter(
+            seek_filter(_reverse(ordering), decode_cursor(before, model, ordering))
+        )
+
+    has_previous_page = after is not None
+    has_next_page = before is not None
+
+    if first is not None:
+        nodes = list(queryset.order_by(*ordering)[: first + 1])
+        has_next_page = len(nodes) > first
+        nodes = nodes[:first]
+        if last is not None:
+            has_previous_page = has_previous_page or len(nodes) > last
+            nodes = nodes[len(nodes) - last :] if last else []
+    else:
+        nodes = list(queryset.order_by(*_reverse(ordering))[: last + 1])
+        has_previous_page = len(nodes) > last
+        nodes = list(reversed(nodes[:last]))
+
+    return nodes, has_previous_page, has_next_page
+
+
+class KeysetConnectionField(relay.ConnectionField):
+    """
+    Relay connection over a queryset paginated by seeking on ``ordering``,
+    which must end with a unique column (usually ``id``).
+    """
+
+    def __init__(self, type_, *args, ordering=("-id",), **kwargs):
+        self.ordering = tuple(ordering)
+        super().__init__(type_, *args, **kwargs)
+
+    def wrap_resolve(self, parent_resolver):
+        resolver = super(relay.ConnectionField, self).wrap_resolve(parent_resolver)
+        return partial(self.keyset_resolver, resolver, self.type, self.ordering)
+
+    @staticmethod
+    def keyset_resolver(resolver, connection_type, ordering, root, info, **args):
+        page_args = {
+            name: args.pop(name, None) for name in ("first", "last", "after", "before")
+        }
+        queryset = resolver(root, info, **args)
+        if isinstance(connection_type, graphene.NonNull):
+            connection_type = connection_type.of_type
+
+        nodes, has_previous_page, has_next_page = keyset_page(
+            queryset,
+            ordering,
+            max_limit=graphene_settings.RELAY_CONNECTION_MAX_LIMIT,
+            **page_args,
+        )
+        nodes = attach_batch(nodes)
+        edges = [
+            connection_type.Edge(node=node, cursor=encode_cursor(node, ordering))
+            for node in nodes
+        ]
+        connection = connection_type(
+            edges=edges,
+            page_info=relay.PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+            ),
+        )
+        connection.iterable = queryset
+        return connection
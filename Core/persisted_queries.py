@@ -0,0 +1,94 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+PERSISTED_QUERY_CACHE_PREFIX = "graphql:apq:"
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LocalQueryStore:
+    """Persisted queries kept in this process only."""
+
+    def __init__(self, max_size=1000):
+        self._local = LRUCache(max_size)
+
+    def get(self, sha256):
+        return self._local.get(sha256)
+
+    def set(self, sha256, query):
+        self._local.set(sha256, query)
+
+    def clear(self):
+        self._local.clear()
+
+
+class CacheQueryStore(LocalQueryStore):
+    """
+    Persisted queries shared through a Django cache backend, with the
+    in-process LRU in front so hot documents never leave the process. Each
+    shared entry lives ``timeout`` seconds from its last registration or
+    fetch, so unused hashes expire.
+    """
+
+    def __init__(self, alias="default", timeout=24 * 60 * 60, max_size=1000):
+        super().__init__(max_size=max_size)
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get(self, sha256):
+        query = super().get(sha256)
+        if query is None:
+            key = PERSISTED_QUERY_CACHE_PREFIX + sha256
+            query = self.cache.get(key)
+            if query is not None:
+                self.cache.touch(key, self.timeout)
+                super().set(sha256, query)
+        return query
+
+    def set(self, sha256, query):
+        super().set(sha256, query)
+        self.cache.set(PERSISTED_QUERY_CACHE_PREFIX + sha256, query, self.timeout)
+
+
+def get_query_store():
+    options = dict(getattr(settings, "GRAPHQL_PERSISTED_QUERIES", {}))
+    store_class = import_string(
+        options.pop("STORE", "Core.persisted_queries.LocalQueryStore")
+    )
+    return store_class(**{key.lower(): value for key, value in options.items()})
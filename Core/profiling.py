@@ -0,0 +1,238 @@
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from graphql import GraphQLResolveInfo
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,
+    # Share of requests that get full profiling; the rest only get timed.
+    "SAMPLE_RATE": 0.01,
+    # Profile every request sending ``X-Profile: 1`` (keep off in production).
+    "ALLOW_FORCE": False,
+    "SLOW_REQUEST_MS": 1000,
+    "TOP_QUERIES": 5,
+}
+
+_current = ContextVar("request_profile", default=None)
+
+
+def profiling_settings():
+    return {**DEFAULTS, **getattr(settings, "REQUEST_PROFILING", {})}
+
+
+def current_profile():
+    """The RequestProfile of the request being handled, or None if not sampled."""
+    return _current.get()
+
+
+class RequestProfile:
+    """Where one request spends its time: SQL, named spans and GraphQL resolvers."""
+
+    def __init__(self):
+        self.start_time = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.queries = []
+        self.spans = defaultdict(float)
+        self.resolvers = []
+        self._active = set()
+
+    def elapsed_ms(self, since=None):
+        return (time.perf_counter() - (since or self.started)) * 1000
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((self.elapsed_ms(started), sql))
+
+    @property
+    def db_ms(self):
+        return sum(duration for duration, _ in self.queries)
+
+    @contextmanager
+    def span(self, name):
+        # Nested spans of the same name (a serializer inside another) count once.
+        if name in self._active:
+            yield
+            return
+        self._active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name] += self.elapsed_ms(started)
+            self._active.discard(name)
+
+    def add_resolver(self, info, started, finished):
+        self.resolvers.append(
+            {
+                "path": list(info.path.as_list()),
+                "parentType": info.parent_type.name,
+                "fieldName": info.field_name,
+                "returnType": str(info.return_type),
+                "startOffset": int((started - self.started) * 1e9),
+                "duration": int((finished - started) * 1e9),
+            }
+        )
+
+    def top_queries(self, limit):
+        return sorted(self.queries, key=lambda query: query[0], reverse=True)[:limit]
+
+    def server_timing(self, total_ms):
+        """The ``Server-Timing`` header value."""
+        metrics = [f'db;dur={self.db_ms:.1f};desc="{len(self.queries)} queries"']
+        metrics += [f"{name};dur={duration:.1f}" for name, duration in self.spans.items()]
+        metrics.append(f"total;dur={total_ms:.1f}")
+        return ", ".join(metrics)
+
+    def tracing(self):
+        """Resolver timings in the Apollo tracing format, for ``extensions.tracing``."""
+        return {
+            "version": 1,
+            "startTime": self.start_time.isoformat(),
+            "endTime": datetime.now(timezone.utc).isoformat(),
+            "duration": int(self.elapsed_ms() * 1e6),
+            "execution": {"resolvers": self.resolvers},
+        }
+
+
+@contextmanager
+def using_profile(profile):
+    """Make ``profile`` current in the block, e.g. in a worker thread of the request."""
+    token = _current.set(profile)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def profile_span(name):
+    """Add the time spent in the block to ``name`` in the current profile, if any."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    with profile.span(name):
+        yield
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a sample of requests (REQUEST_PROFILING["SAMPLE_RATE"]): counts
+    and times their SQL on every database and reports it with the spans
+    recorded by views and serializers in a ``Server-Timing`` header. Requests
+    slower than SLOW_REQUEST_MS are logged, with their slowest queries when
+    sampled. Removed from the stack unless REQUEST_PROFILING["ENABLED"].
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.options = profiling_settings()
+        if not self.options["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self, request):
+        if self.options["ALLOW_FORCE"] and request.headers.get("X-Profile") == "1":
+            return True
+        return random.random() < self.options["SAMPLE_RATE"]
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled(request):
+            started = time.perf_counter()
+            return self.finish_request(request, self.get_response(request), started)
+
+        profile = RequestProfile()
+        with self.profiling(profile):
+            response = self.get_response(request)
+        return self.finish_profile(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self.sampled(request):
+            started = time.perf_counter()
+            return self.finish_request(request, await self.get_response(request), started)
+
+        profile = RequestProfile()
+        with self.profiling(profile):
+            response = await self.get_response(request)
+        return self.finish_profile(request, response, profile)
+
+    @contextmanager
+    def profiling(self, profile):
+        with using_profile(profile), ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile.execute_wrapper))
+            yield
+
+    def finish_request(self, request, response, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        if total_ms >= self.options["SLOW_REQUEST_MS"]:
+            logger.warning("Slow request %s %s: %.0f ms", request.method, request.path, total_ms)
+        return response
+
+    def finish_profile(self, request, response, profile):
+        total_ms = profile.elapsed_ms()
+        response["Server-Timing"] = profile.server_timing(total_ms)
+        if total_ms >= self.options["SLOW_REQUEST_MS"]:
+            self.log_slow_request(request, profile, total_ms)
+        return response
+
+    def log_slow_request(self, request, profile, total_ms):
+        queries = "".join(
+            f"\n  {duration:.1f} ms: {sql}"
+            for duration, sql in profile.top_queries(self.options["TOP_QUERIES"])
+        )
+        logger.warning(
+            "Slow request %s %s: %.0f ms, %d queries in %.0f ms%s",
+            request.method,
+            request.path,
+            total_ms,
+            len(profile.queries),
+            profile.db_ms,
+            queries,
+        )
+
+
+class ResolverTimingMiddleware:
+    """Graphene middleware timing every resolver of profiled requests."""
+
+    def resolve(self, next, root, info: GraphQLResolveInfo, **args):
+        profile = _current.get()
+        if profile is None:
+            return next(root, info, **args)
+        started = time.perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            profile.add_resolver(info, started, time.perf_counter())
+
+
+class ProfiledSerializerMixin:
+    """Reports the time a serializer spends validating and rendering as ``serializer``."""
+
+    def run_validation(self, *args, **kwargs):
+        with profile_span("serializer"):
+            return super().run_validation(*args, **kwargs)
+
+    def to_representation(self, instance):
+        with profile_span("serializer"):
+            return super().to_representation(instance)
@@ -0,0 +1,77 @@
+"""
+pytest plugin for the query budgets in Core/query_budgets.json.
+
+- ``--update-query-budgets`` rewrites the budget file from the measured
+  counts instead of enforcing it.
+- The ``query_budget`` fixture checks any block of code against a named
+  budget.
+- The terminal summary lists the query count and DB time of every target
+  measured in the session.
+"""
+import os
+from contextlib import contextmanager
+
+import pytest
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("query budgets")
+    group.addoption(
+        "--update-query-budgets",
+        action="store_true",
+        help="Rewrite Core/query_budgets.json from the measured query counts.",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("update_query_budgets"):
+        os.environ["UPDATE_QUERY_BUDGETS"] = "1"
+
+
+@pytest.fixture
+def query_budget(db):
+    """
+    ``with query_budget("rest:post.list", size=n): ...`` records the queries of
+    the block and fails the test if they exceed the budget, or differ from
+    another size of the same name.
+    """
+    from Core.query_budget import (
+        budget_violations,
+        load_budgets,
+        record_queries,
+        recorded,
+        updating_budgets,
+    )
+
+    @contextmanager
+    def check(name, size=0):
+        with record_queries() as usage:
+            yield usage
+        recorded.setdefault(name, {})[size] = usage
+        if not updating_budgets():
+            problems = budget_violations(name, recorded[name], load_budgets())
+            if problems:
+                pytest.fail("\n".join(problems))
+
+    return check
+
+
+def pytest_terminal_summary(terminalreporter):
+    from Core.query_budget import recorded
+
+    if not recorded:
+        return
+    terminalreporter.section("query budgets")
+    for name, sizes in sorted(recorded.items()):
+        usages = ", ".join(
+            f"n={size}: {usage.count} queries in {usage.time_ms:.1f} ms"
+            for size, usage in sorted(sizes.items())
+        )
+        terminalreporter.write_line(f"{name:<32} {usages}")
+
+
+def pytest_sessionfinish(session):
+    from Core.query_budget import recorded, updating_budgets, write_budgets
+
+    if updating_budgets() and recorded:
+        write_budgets()
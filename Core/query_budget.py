@@ -0,0 +1,414 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.authtoken.models import Token
+from rest_framework.viewsets import ViewSetMixin
+
+from blog.models import Blog, Post
+from tag.models import Tag
+from user.token_cache import token_cache
+
+BUDGET_FILE = Path(__file__).with_name("query_budgets.json")
+DATASET_SIZES = (2, 6)
+PASSWORD = "Budget-pass-2024!"
+
+# Every measurement taken in this process, as {target: {size: QueryUsage}}.
+recorded = {}
+
+
+def updating_budgets():
+    """True when the run should rewrite the budget file instead of enforcing it."""
+    return os.environ.get("UPDATE_QUERY_BUDGETS") == "1"
+
+
+@dataclass
+class QueryUsage:
+    count: int = 0
+    time_ms: float = 0.0
+    statements: list = field(default_factory=list)
+
+
+@contextmanager
+def record_queries(using=connection):
+    """Count and time every statement run on ``using`` inside the block."""
+    usage = QueryUsage()
+
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            usage.count += 1
+            usage.time_ms += (time.perf_counter() - started) * 1000
+            usage.statements.append(sql)
+
+    with using.execute_wrapper(wrapper):
+        yield usage
+
+
+@dataclass
+class Fixtures:
+    """
+    A dataset where every page and bulk payload grows with ``size``: the
+    owner's blog has ``size`` posts, each linked to all ``size`` tags, and
+    ``size`` other users have a blog each.
+    """
+
+    size: int
+    owner: User
+    admin: User
+    newcomer: User
+    blog: Blog
+    posts: list
+    tags: list
+    spare_tag: Tag
+    tokens: dict
+
+    @property
+    def post(self):
+        return self.posts[0]
+
+    @property
+    def tag(self):
+        return self.tags[0]
+
+    @property
+    def post_ids(self):
+        return [post.pk for post in self.posts]
+
+    @property
+    def tag_ids(self):
+        return [tag.pk for tag in self.tags]
+
+
+def build_fixtures(size):
+    password = make_password(PASSWORD)
+    owner = User.objects.create(username="budget-owner", password=password)
+    admin = User.objects.create(
+        username="budget-admin", password=password, is_staff=True, is_superuser=True
+    )
+    newcomer = User.objects.create(username="budget-newcomer", password=password)
+    blog = Blog.objects.create(user=owner, title="Budget blog", description="<p>Budget</p>")
+    for i in range(size):
+        writer = User.objects.create(username=f"budget-writer{i}", password=password)
+        Blog.objects.create(user=writer, title=f"Budget writer {i}", description="<p>Hi</p>")
+    tags = [Tag.objects.create(name=f"budget{i}") for i in range(size)]
+    spare_tag = Tag.objects.create(name="budget-spare")
+    posts = []
+    for i in range(size):
+        post = Post.objects.create(blog=blog, title=f"Budget post {i}", content="<p>Body</p>")
+        post.tags.set(tags)
+        posts.append(post)
+    tokens = {
+        "owner": Token.objects.create(user=owner).key,
+        "admin": Token.objects.create(user=admin).key,
+        "newcomer": Token.objects.create(user=newcomer).key,
+    }
+    return Fixtures(size, owner, admin, newcomer, blog, posts, tags, spare_tag, tokens)
+
+
+@dataclass(frozen=True)
+class Target:
+    """One DRF action or GraphQL root field, and how to call it."""
+
+    name: str
+    method: str
+    path: Callable
+    body: Optional[Callable] = None
+    auth: Optional[str] = None
+
+    def send(self, fixtures):
+        client = Client()
+        headers = {}
+        if self.auth and self.name.startswith("graphql:"):
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {fixtures.tokens[self.auth]}"
+        elif self.auth:
+            headers["HTTP_AUTHORIZATION"] = f"Token {fixtures.tokens[self.auth]}"
+        body = self.body(fixtures) if self.body else None
+        data = json.dumps(body) if body is not None else None
+        return getattr(client, self.method)(
+            self.path(fixtures), data=data, content_type="application/json", **headers
+        )
+
+    def failed(self, response):
+        """An error message if the call did not do what it is measured for."""
+        if response.status_code >= 400:
+            return f"{self.name}: HTTP {response.status_code} {response.content[:300]!r}"
+        if self.name.startswith("graphql:"):
+            errors = response.json().get("errors")
+            if errors:
+                return f"{self.name}: {errors[0].get('message')}"
+        return None
+
+
+def rest(basename, action, method, path, body=None, auth=None):
+    return Target(f"rest:{basename}.{action}", method, path, body, auth)
+
+
+def graphql(field_name, query, variables=None, auth=None):
+    def body(fixtures):
+        return {"query": query, "variables": variables(fixtures) if variables else {}}
+
+    return Target(f"graphql:{field_name}", "post", lambda f: "/graphql/", body, auth)
+
+
+def _post_payload(f):
+    return {"title": "Budget post", "content": "<p>Body</p>", "tags": f.tag_ids}
+
+
+POST_NODE = "id title blog { id title user { id username } } tags { id name }"
+BLOG_NODE = "id title postCount user { id username }"
+TAG_NODE = "id name postCount"
+USER_NODE = "id username blog { id title }"
+PAGE = "pageInfo { hasNextPage endCursor }"
+
+TARGETS = [
+    rest("auth", "login", "post", lambda f: "/cms/api/auth/login/",
+         lambda f: {"username": f.owner.username, "password": PASSWORD}),
+    rest("auth", "logout", "post", lambda f: "/cms/api/auth/logout/", auth="owner"),
+    rest("auth", "me", "get", lambda f: "/cms/api/auth/me/", auth="owner"),
+    rest("auth", "register", "post", lambda f: "/cms/api/auth/register/",
+         lambda f: {"username": "budget-new", "password": PASSWORD, "password_confirm": PASSWORD}),
+    rest("blog", "list", "get", lambda f: "/cms/api/blogs/"),
+    rest("blog", "retrieve", "get", lambda f: f"/cms/api/blogs/{f.blog.pk}/"),
+    rest("blog", "create", "post", lambda f: "/cms/api/blogs/",
+         lambda f: {"title": "Budget new blog", "description": "<p>New</p>"}, auth="newcomer"),
+    rest("blog", "update", "put", lambda f: f"/cms/api/blogs/{f.blog.pk}/",
+         lambda f: {"title": "Budget blog renamed", "description": "<p>New</p>"}, auth="owner"),
+    rest("blog", "partial_update", "patch", lambda f: f"/cms/api/blogs/{f.blog.pk}/",
+         lambda f: {"title": "Budget blog renamed"}, auth="owner"),
+    rest("blog", "destroy", "delete", lambda f: f"/cms/api/blogs/{f.blog.pk}/", auth="owner"),
+    rest("post", "list", "get", lambda f: "/cms/api/posts/"),
+    rest("post", "retrieve", "get", lambda f: f"/cms/api/posts/{f.post.pk}/"),
+    rest("post", "create", "post", lambda f: "/cms/api/posts/", _post_payload, auth="owner"),
+    rest("post", "update", "put", lambda f: f"/cms/api/posts/{f.post.pk}/",
+         _post_payload, auth="owner"),
+    rest("post", "partial_update", "patch", lambda f: f"/cms/api/posts/{f.post.pk}/",
+         lambda f: {"tags": f.tag_ids[1:]}, auth="owner"),
+    rest("post", "destroy", "delete", lambda f: f"/cms/api/posts/{f.post.pk}/", auth="owner"),
+    rest("post", "bulk.post", "post", lambda f: "/cms/api/posts/bulk/",
+         lambda f: [_post_payload(f) for _ in f.posts], auth="owner"),
+    rest("post", "bulk.patch", "patch", lambda f: "/cms/api/posts/bulk/",
+         lambda f: [{"id": pk, "title": "Budget edit", "tags": f.tag_ids[1:]} for pk in f.post_ids],
+         auth="owner"),
+    rest("post", "bulk.delete", "delete", lambda f: "/cms/api/posts/bulk/",
+         lambda f: f.post_ids, auth="owner"),
+    rest("tag", "list", "get", lambda f: "/cms/api/tags/"),
+    rest("tag", "retrieve", "get", lambda f: f"/cms/api/tags/{f.tag.pk}/"),
+    rest("tag", "create", "post", lambda f: "/cms/api/tags/",
+         lambda f: {"name": "budget-new"}, auth="owner"),
+    rest("tag", "update", "put", lambda f: f"/cms/api/tags/{f.tag.pk}/",
+         lambda f: {"name": "budget-renamed"}, auth="owner"),
+    rest("tag", "partial_update", "patch", lambda f: f"/cms/api/tags/{f.tag.pk}/",
+         lambda f: {"name": "budget-renamed"}, auth="owner"),
+    rest("tag", "destroy", "delete", lambda f: f"/cms/api/tags/{f.tag.pk}/", auth="owner"),
+    graphql("posts", f"{{ posts(first: 20) {{ edges {{ node {{ {POST_NODE} }} }} {PAGE} }} }}"),
+    graphql("post", f"query ($id: ID!) {{ post(id: $id) {{ {POST_NODE} }} }}",
+            lambda f: {"id": f.post.pk}),
+    graphql("postsByBlog",
+            f"query ($id: ID!) {{ postsByBlog(blogId: $id, first: 20) "
+            f"{{ edges {{ node {{ {POST_NODE} }} }} {PAGE} }} }}",
+            lambda f: {"id": f.blog.pk}),
+    graphql("postsByUser", f"query ($id: ID!) {{ postsByUser(userId: $id) {{ {POST_NODE} }} }}",
+            lambda f: {"id": f.owner.pk}, auth="owner"),
+    graphql("postsByTitle", f"{{ postsByTitle(title: \"Budget\") {{ {POST_NODE} }} }}"),
+    graphql("searchPosts",
+            f"{{ searchPosts(query: \"budget\", first: 20) "
+            f"{{ edges {{ node {{ {POST_NODE} }} }} {PAGE} }} }}"),
+    graphql("blogs", f"{{ blogs(first: 20) {{ edges {{ node {{ {BLOG_NODE} }} }} {PAGE} }} }}"),
+    graphql("blog", f"query ($id: ID!) {{ blog(id: $id) {{ {BLOG_NODE} posts {{ id title }} }} }}",
+            lambda f: {"id": f.blog.pk}),
+    graphql("blogsByUser", f"query ($id: ID!) {{ blogsByUser(userId: $id) {{ {BLOG_NODE} }} }}",
+            lambda f: {"id": f.owner.pk}),
+    graphql("blogsByTitle", f"{{ blogsByTitle(title: \"Budget\") {{ {BLOG_NODE} }} }}"),
+    graphql("tags", f"{{ tags(first: 20) {{ edges {{ node {{ {TAG_NODE} }} }} {PAGE} }} }}"),
+    graphql("tag", f"query ($id: ID!) {{ tag(id: $id) {{ {TAG_NODE} posts {{ id title }} }} }}",
+            lambda f: {"id": f.tag.pk}),
+    graphql("postsByTag",
+            f"query ($id: ID!) {{ postsByTag(id: $id, first: 20) "
+            f"{{ edges {{ node {{ {POST_NODE} }} }} {PAGE} }} }}",
+            lambda f: {"id": f.tag.pk}),
+    graphql("tagsByPost", f"query ($id: ID!) {{ tagsByPost(id: $id) {{ {TAG_NODE} }} }}",
+            lambda f: {"id": f.post.pk}),
+    graphql("tagsByPostName", f"{{ tagsByPostName(postName: \"Budget post 0\") {{ {TAG_NODE} }} }}"),
+    graphql("tagsByName", f"{{ tagsByName(name: \"budget\") {{ {TAG_NODE} posts {{ id }} }} }}"),
+    graphql("tagsByNameAndPostId",
+            f"query ($id: ID!) {{ tagsByNameAndPostId(name: \"budget\", postId: $id) "
+            f"{{ {TAG_NODE} }} }}",
+            lambda f: {"id": f.post.pk}),
+    graphql("tagsByNameAndPostName",
+            f"{{ tagsByNameAndPostName(name: \"budget\", postName: \"Budget post 0\") {{ {TAG_NODE} }} }}"),
+    graphql("tagAutocomplete", f"{{ tagAutocomplete(prefix: \"bud\") {{ {TAG_NODE} }} }}"),
+    graphql("allUsers", f"{{ allUsers(first: 20) {{ edges {{ node {{ {USER_NODE} }} }} {PAGE} }} }}"),
+    graphql("userById", f"query ($id: ID!) {{ userById(id: $id) {{ {USER_NODE} }} }}",
+            lambda f: {"id": f.owner.pk}),
+    graphql("createBlog",
+            f"mutation {{ createBlog(title: \"Budget new blog\", description: \"<p>New</p>\") "
+            f"{{ success blog {{ {BLOG_NODE} }} }} }}",
+            auth="newcomer"),
+    graphql("updateBlog",
+            f"mutation ($id: ID!) {{ updateBlog(id: $id, title: \"Budget renamed\", "
+            f"description: \"<p>New</p>\") {{ success blog {{ {BLOG_NODE} }} }} }}",
+            lambda f: {"id": f.blog.pk}, auth="owner"),
+    graphql("deleteBlog", "mutation ($id: ID!) { deleteBlog(id: $id) { success } }",
+            lambda f: {"id": f.blog.pk}, auth="owner"),
+    graphql("createPost",
+            f"mutation ($id: ID!) {{ createPost(blogId: $id, title: \"Budget post\", "
+            f"content: \"<p>Body</p>\") {{ success post {{ {POST_NODE} }} }} }}",
+            lambda f: {"id": f.blog.pk}, auth="owner"),
+    graphql("updatePost",
+            f"mutation ($id: ID!) {{ updatePost(id: $id, title: \"Budget edit\", "
+            f"content: \"<p>Body</p>\") {{ success post {{ {POST_NODE} }} }} }}",
+            lambda f: {"id": f.post.pk}, auth="owner"),
+    graphql("deletePost", "mutation ($id: ID!) { deletePost(id: $id) { success } }",
+            lambda f: {"id": f.post.pk}, auth="owner"),
+    graphql("addTagToPost",
+            f"mutation ($post: ID!, $tag: ID!) {{ addTagToPost(postId: $post, tagId: $tag) "
+            f"{{ success post {{ {POST_NODE} }} }} }}",
+            lambda f: {"post": f.post.pk, "tag": f.spare_tag.pk}, auth="owner"),
+    graphql("removeTagFromPost",
+            f"mutation ($post: ID!, $tag: ID!) {{ removeTagFromPost(postId: $post, tagId: $tag) "
+            f"{{ success post {{ {POST_NODE} }} }} }}",
+            lambda f: {"post": f.post.pk, "tag": f.tag.pk}, auth="owner"),
+    graphql("createPosts",
+            f"mutation ($posts: [CreatePostInput!]!) {{ createPosts(posts: $posts) "
+            f"{{ success posts {{ {POST_NODE} }} }} }}",
+            lambda f: {"posts": [
+                {"blogId": f.blog.pk, "title": "Budget post", "content": "<p>Body</p>",
+                 "tagIds": f.tag_ids}
+                for _ in f.posts
+            ]},
+            auth="owner"),
+    graphql("updatePosts",
+            f"mutation ($posts: [UpdatePostInput!]!) {{ updatePosts(posts: $posts) "
+            f"{{ success posts {{ {POST_NODE} }} }} }}",
+            lambda f: {"posts": [
+                {"id": pk, "title": "Budget edit", "tagIds": f.tag_ids[1:]} for pk in f.post_ids
+            ]},
+            auth="owner"),
+    graphql("setPostTags",
+            f"mutation ($posts: [ID!]!, $tags: [ID!]!) {{ setPostTags(postIds: $posts, "
+            f"tagIds: $tags) {{ success posts {{ {POST_NODE} }} }} }}",
+            lambda f: {"posts": f.post_ids, "tags": f.tag_ids[1:] + [f.spare_tag.pk]},
+            auth="owner"),
+    graphql("createTag",
+            f"mutation {{ createTag(name: \"budget-new\") {{ success tag {{ {TAG_NODE} }} }} }}",
+            auth="owner"),
+    graphql("updateTag",
+            f"mutation ($id: ID!) {{ updateTag(id: $id, name: \"budget-renamed\") "
+            f"{{ success tag {{ {TAG_NODE} }} }} }}",
+            lambda f: {"id": f.tag.pk}, auth="owner"),
+    graphql("deleteTag", "mutation ($id: ID!) { deleteTag(id: $id) { success } }",
+            lambda f: {"id": f.tag.pk}, auth="owner"),
+    graphql("createUser",
+            f"mutation {{ createUser(username: \"budget-new\", email: \"new@example.com\", "
+            f"password: \"{PASSWORD}\", passwordConfirm: \"{PASSWORD}\") "
+            f"{{ token user {{ id username }} }} }}"),
+    graphql("loginUser",
+            f"mutation {{ loginUser(username: \"budget-owner\", password: \"{PASSWORD}\") "
+            f"{{ token user {{ {USER_NODE} }} }} }}"),
+    graphql("logoutUser", "mutation { logoutUser { success } }", auth="owner"),
+    graphql("deleteUser", "mutation ($id: ID!) { deleteUser(userId: $id) { user { username } } }",
+            lambda f: {"id": f.owner.pk}, auth="owner"),
+    graphql("updatePassword",
+            "mutation { updatePassword(newPassword: \"Budget-new-2024!\", "
+            "confirmPassword: \"Budget-new-2024!\") { success } }",
+            auth="owner"),
+]
+
+
+def measure(target, fixtures):
+    """
+    Call ``target`` once against ``fixtures`` from cold caches and return its
+    QueryUsage and response. Writes are rolled back so every target sees the
+    same data.
+    """
+    cache.clear()
+    token_cache.clear()
+    with transaction.atomic():
+        with record_queries() as usage:
+            response = target.send(fixtures)
+        transaction.set_rollback(True)
+    recorded.setdefault(target.name, {})[fixtures.size] = usage
+    return usage, response
+
+
+def _viewset_callbacks(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _viewset_callbacks(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            cls = getattr(pattern.callback, "cls", None)
+            if cls is not None and issubclass(cls, ViewSetMixin):
+                yield pattern.callback
+
+
+def endpoint_names(schema):
+    """
+    Every routed DRF action (suffixed with the method when one action serves
+    several) and every GraphQL root field, named like TARGETS.
+    """
+    names = set()
+    for callback in _viewset_callbacks(get_resolver().url_patterns):
+        basename = callback.initkwargs["basename"]
+        # DRF maps HEAD to the GET action on first dispatch; it is not an endpoint.
+        actions = {m: a for m, a in callback.actions.items() if m != "head"}
+        for method, action in actions.items():
+            shared = list(actions.values()).count(action) > 1
+            names.add(f"rest:{basename}.{action}" + (f".{method}" if shared else ""))
+    graphql_schema = schema.graphql_schema
+    for root in (graphql_schema.query_type, graphql_schema.mutation_type):
+        names.update(f"graphql:{name}" for name in root.fields)
+    return names
+
+
+def load_budgets(path=BUDGET_FILE):
+    try:
+        with open(path) as budget_file:
+            return json.load(budget_file)
+    except FileNotFoundError:
+        return {}
+
+
+def write_budgets(path=BUDGET_FILE):
+    """Merge the largest recorded count of every target into the budget file."""
+    budgets = load_budgets(path)
+    for name, sizes in recorded.items():
+        budgets[name] = max(usage.count for usage in sizes.values())
+    with open(path, "w") as budget_file:
+        json.dump(dict(sorted(budgets.items())), budget_file, indent=2)
+        budget_file.write("\n")
+
+
+def budget_violations(name, sizes, budgets):
+    """
+    Problems with one target's counts, given as ``{size: QueryUsage}``:
+    counts that change with the dataset size, and counts over its budget.
+    """
+    counts = {size: usage.count for size, usage in sorted(sizes.items())}
+    problems = []
+    if len(set(counts.values())) > 1:
+        problems.append(f"{name}: query count grows with the data {counts}")
+    budget = budgets.get(name)
+    if budget is None:
+        problems.append(f"{name}: no budget in {BUDGET_FILE.name}")
+    elif max(counts.values()) > budget:
+        problems.append(f"{name}: {max(counts.values())} queries, budget is {budget}")
+    return problems
+
+
+def format_statements(sizes):
+    """The SQL run at the largest size, to spot the query that repeats."""
+    usage = sizes[max(sizes)]
+    return "\n".join(f"{i}. {sql}" for i, sql in enumerate(usage.statements, 1))
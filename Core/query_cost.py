@@ -0,0 +1,273 @@
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from graphene_django.settings import graphene_settings
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    IntValueNode,
+    OperationDefinitionNode,
+    ValidationRule,
+    VariableNode,
+    get_named_type,
+    get_nullable_type,
+    is_composite_type,
+    is_list_type,
+)
+
+from user.token_cache import request_user
+
+QUERY_COST_CACHE_PREFIX = "graphql:cost:"
+QUERY_TOO_DEEP = "Query depth {depth} exceeds the maximum of {maximum}."
+QUERY_TOO_COSTLY = "Query cost {cost} exceeds the maximum of {maximum}."
+QUERY_COST_THROTTLED = "Query cost budget exhausted, retry in {retry_after} seconds."
+PAGE_SIZE_ARGUMENTS = ("first", "last", "limit")
+
+DEFAULTS = {
+    "MAX_DEPTH": 10,
+    "MAX_COST": 20000,
+    "DEFAULT_LIST_SIZE": 20,
+    "BUDGET": 200000,
+    "BUDGET_WINDOW": 60,
+    "CACHE_ALIAS": "default",
+}
+
+
+def cost_settings():
+    return {**DEFAULTS, **getattr(settings, "GRAPHQL_QUERY_COST", {})}
+
+
+@dataclass(frozen=True)
+class QueryCost:
+    depth: int
+    cost: int
+
+    def as_extension(self, options):
+        return {
+            "depth": self.depth,
+            "requested": self.cost,
+            "maximum": options["MAX_COST"],
+        }
+
+
+def collect_fields(
+    schema, fragments, selection_set, parent_type, visited=frozenset(), expanded=None
+):
+    """
+    Yield ``(field_node, parent_type, visited)`` with fragments expanded. A
+    fragment spread more than once in the same selection set adds the same
+    fields, so it is expanded once (``expanded``).
+    """
+    expanded = set() if expanded is None else expanded
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection, parent_type, visited
+            continue
+        spread = visited
+        if isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            fragment = fragments.get(name)
+            if fragment is None or name in visited or name in expanded:
+                continue
+            expanded.add(name)
+            spread = visited | {name}
+        else:
+            fragment = selection
+        condition = fragment.type_condition
+        fragment_type = schema.get_type(condition.name.value) if condition else parent_type
+        yield from collect_fields(
+            schema, fragments, fragment.selection_set, fragment_type, spread, expanded
+        )
+
+
+def _is_connection(graphql_type):
+    fields = getattr(graphql_type, "fields", {})
+    return "edges" in fields and "pageInfo" in fields
+
+
+class _CostVisitor:
+    """
+    Walks one operation and estimates how many objects it resolves: every
+    composite field costs one object per parent, and list or connection
+    fields multiply their children by their page size (``first``, ``last``
+    or ``limit``), else by the configured default list size.
+
+    The cost of a selection set is proportional to its multiplier, so each
+    (selection set, parent type) is measured once for one parent and scaled:
+    fragments spread many times do not make the walk exponential.
+    """
+
+    def __init__(self, schema, fragments, variables, options):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.default_list_size = options["DEFAULT_LIST_SIZE"]
+        self.max_page_size = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+        self._units = {}
+
+    def page_size(self, field_node):
+        for argument in field_node.arguments:
+            if argument.name.value not in PAGE_SIZE_ARGUMENTS:
+                continue
+            value = argument.value
+            if isinstance(value, VariableNode):
+                value = self.variables.get(value.name.value)
+            elif isinstance(value, IntValueNode):
+                value = int(value.value)
+            if isinstance(value, int):
+                return max(0, min(value, self.max_page_size or value))
+        if self.max_page_size:
+            return min(self.default_list_size, self.max_page_size)
+        return self.default_list_size
+
+    def visit(self, selection_set, parent_type, multiplier, visited=frozenset()):
+        """Return ``(depth, cost)`` for ``selection_set``."""
+        # AST nodes live as long as the visitor, so their ids are stable keys.
+        key = (id(selection_set), parent_type.name)
+        if key not in self._units:
+            self._units[key] = self._measure(selection_set, parent_type, visited)
+        depth, cost = self._units[key]
+        return depth, multiplier * cost
+
+    def _measure(self, selection_set, parent_type, visited):
+        """``(depth, cost)`` of ``selection_set`` for a single parent object."""
+        depth = cost = 0
+        fields = collect_fields(
+            self.schema, self.fragments, selection_set, parent_type, visited
+        )
+        for field_node, owner, spread in fields:
+            name = field_node.name.value
+            field = getattr(owner, "fields", {}).get(name)
+            if name.startswith("__") or field is None:
+                continue
+            field_type = get_nullable_type(field.type)
+            if not is_composite_type(get_named_type(field_type)):
+                continue
+
+            named_type = get_named_type(field_type)
+            objects = children = 1
+            if _is_connection(named_type):
+                children = self.page_size(field_node)
+            elif is_list_type(field_type) and not _is_connection(owner):
+                # Edges are already counted by their connection.
+                objects = children = self.page_size(field_node)
+
+            child_depth, child_cost = (0, 0)
+            if field_node.selection_set:
+                child_depth, child_cost = self.visit(
+                    field_node.selection_set, named_type, children, spread
+                )
+            depth = max(depth, child_depth + 1)
+            cost += objects + child_cost
+        return depth, cost
+
+
+def get_operation(document, operation_name):
+    operations = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+    ]
+    if operation_name:
+        operations = [op for op in operations if op.name and op.name.value == operation_name]
+    return operations[0] if len(operations) == 1 else None
+
+
+def get_fragments(document):
+    return {
+        definition.name.value: definition
+        for definition in document.definitions
+        if definition.kind == "fragment_definition"
+    }
+
+
+def estimate_query_cost(schema, document, operation_name=None, variables=None):
+    """Return the QueryCost of the selected operation, or None if it is ambiguous."""
+    operation = get_operation(document, operation_name)
+    if operation is None:
+        return None
+    root_type = schema.get_root_type(operation.operation)
+    variables = dict(variables or {})
+    for definition in operation.variable_definitions:
+        name = definition.variable.name.value
+        if name not in variables and isinstance(definition.default_value, IntValueNode):
+            variables[name] = int(definition.default_value.value)
+
+    visitor = _CostVisitor(schema, get_fragments(document), variables, cost_settings())
+    depth, cost = visitor.visit(operation.selection_set, root_type, 1)
+    return QueryCost(depth=depth, cost=cost)
+
+
+class QueryDepthRule(ValidationRule):
+    """Reject operations nested deeper than ``GRAPHQL_QUERY_COST["MAX_DEPTH"]``."""
+
+    def enter_operation_definition(self, node, *_args):
+        options = cost_settings()
+        maximum = options["MAX_DEPTH"]
+        schema = self.context.schema
+        root_type = schema.get_root_type(node.operation)
+        if not maximum or root_type is None:
+            return
+        visitor = _CostVisitor(schema, get_fragments(self.context.document), {}, options)
+        depth, _cost = visitor.visit(node.selection_set, root_type, 1)
+        if depth > maximum:
+            self.report_error(
+                GraphQLError(
+                    QUERY_TOO_DEEP.format(depth=depth, maximum=maximum),
+                    node,
+                    extensions={"code": "QUERY_TOO_DEEP"},
+                )
+            )
+
+
+def check_query_cost(query_cost, options):
+    """Raise GraphQLError if ``query_cost`` is over the per-request maximum."""
+    maximum = options["MAX_COST"]
+    if maximum and query_cost.cost > maximum:
+        raise GraphQLError(
+            QUERY_TOO_COSTLY.format(cost=query_cost.cost, maximum=maximum),
+            extensions={"code": "QUERY_TOO_COSTLY"},
+        )
+
+
+def _client_key(request):
+    """
+    The authenticated user, else the client's address: anything else in the
+    request (such as a made-up token) would let a client pick a fresh budget.
+    """
+    user = request_user(request)
+    if user is not None:
+        return f"user:{user.pk}"
+    return f"addr:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def consume_cost_budget(request, query_cost, options):
+    """
+    Charge ``query_cost`` to the client's budget for the current window and
+    raise GraphQLError once the budget is spent. Returns what is left.
+    """
+    budget, window = options["BUDGET"], options["BUDGET_WINDOW"]
+    if not budget:
+        return None
+    now = time.time()
+    window_start = int(now // window) * window
+    key = f"{QUERY_COST_CACHE_PREFIX}{_client_key(request)}:{window_start}"
+    cache = caches[options["CACHE_ALIAS"]]
+
+    cache.add(key, 0, window)
+    try:
+        spent = cache.incr(key, query_cost.cost)
+    except ValueError:
+        spent = query_cost.cost
+        cache.set(key, spent, window)
+
+    if spent > budget:
+        retry_after = max(1, int(window_start + window - now))
+        raise GraphQLError(
+            QUERY_COST_THROTTLED.format(retry_after=retry_after),
+            extensions={"code": "QUERY_COST_THROTTLED", "retryAfter": retry_after},
+        )
+    return budget - spent
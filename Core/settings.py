@@ -64,6 +64,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it times the whole stack; drops itself unless REQUEST_PROFILING is enabled.
+    "Core.profiling.ProfilingMiddleware",
+    "Core.metrics.MetricsMiddleware",
+    # Before anything reads the database; drops itself unless READ_REPLICAS has aliases.
+    "Core.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -92,33 +97,64 @@ TEMPLATES = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        # Caches tokens per process: with several workers, a revoked token or
+        # deactivated user may still authenticate on the other workers for up
+        # to user.constants.TOKEN_CACHE_TTL (60) seconds.
+        "user.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "blog.pagination.KeysetPagination",
+    "PAGE_SIZE": 20,
     "EXCEPTION_HANDLER": "blog.exceptions.custom_exception_handler",
 }
 
 WSGI_APPLICATION = "Core.wsgi.application"
 
+# Async read actions and concurrent GraphQL root fields; Core.asgi turns them
+# on, so they only run under an ASGI server.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "0") == "1"
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 DATABASE_URL = os.getenv("DATABASE_URL") or os.getenv("DATABASE_PUBLIC_URL")
 
+# PostgreSQL connections come from one pool (psycopg_pool) per worker process
+# and database, shared by its threads: a process never opens more than
+# max_size connections, a request finding them all busy waits up to `timeout`
+# seconds, and every connection is checked before being handed out. Size it
+# against the server's threads (see README). DATABASE_POOL=0 keeps one
+# persistent connection per thread instead.
+DATABASE_POOL = os.getenv("DATABASE_POOL", "1") == "1"
+DATABASE_POOL_OPTIONS = {
+    "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+    "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", "4")),
+    "timeout": float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+}
+
+
+def postgres_database(url):
+    if not DATABASE_POOL:
+        return dj_database_url.parse(url, conn_max_age=600, conn_health_checks=True)
+    database = dj_database_url.parse(url, conn_max_age=0, conn_health_checks=True)
+    database["OPTIONS"] = {**database.get("OPTIONS", {}), "pool": dict(DATABASE_POOL_OPTIONS)}
+    return database
+
+
 # Production: Use PostgreSQL
 if DATABASE_URL and (DATABASE_URL.startswith("postgresql://") or DATABASE_URL.startswith("postgres://")):
-    DATABASES = {
-        "default": dj_database_url.config(
-            default=DATABASE_URL,
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
-    }
+    DATABASES = {"default": postgres_database(DATABASE_URL)}
+    # Comma-separated URLs of read replicas, as replica_1, replica_2...
+    for number, url in enumerate(filter(None, os.getenv("DATABASE_REPLICA_URLS", "").split(",")), 1):
+        DATABASES[f"replica_{number}"] = {
+            **postgres_database(url.strip()),
+            "TEST": {"MIRROR": "default"},
+        }
 else:
     # Development: Use SQLite
     if os.getenv("RAILWAY_ENVIRONMENT") or os.getenv("RAILWAY"):
@@ -132,6 +168,51 @@ else:
             "NAME": db_path,
         }
     }
+    # A second SQLite file standing in for a read replica. It only changes
+    # when `manage.py sync_sqlite_replica` copies the primary into it.
+    if os.getenv("SQLITE_REPLICA"):
+        DATABASES["replica"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / os.getenv("SQLITE_REPLICA"),
+        }
+
+DATABASE_ROUTERS = ["Core.db_router.ReplicaRouter"]
+
+# Safe-method requests and GraphQL queries read from these replicas; a client
+# that writes reads from the primary for the next STICKY_SECONDS. A signed
+# cookie pins it, and authenticated users are also pinned in the CACHE_ALIAS
+# cache (every worker sees those pins with REDIS_URL).
+READ_REPLICAS = {
+    "ALIASES": [alias for alias in DATABASES if alias != "default"],
+    "STICKY_SECONDS": int(os.getenv("READ_REPLICA_STICKY_SECONDS", "5")),
+    "CACHE_ALIAS": "default",
+}
+
+# Worker processes serving the project (uvicorn --workers in the Dockerfile;
+# waitress runs one). Anything kept per process is only right with one.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+
+# REDIS_URL (redis://host:6379/0) gives every worker the same cache, for the
+# response cache generations, persisted queries and GraphQL cost budgets.
+# Without it each process has its own LocMemCache, which is only right with a
+# single worker (see blog/checks.py).
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -242,4 +323,59 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 GRAPHENE = {
     "SCHEMA": "Core.schema.schema",
+    "MIDDLEWARE": [
+        "Core.profiling.ResolverTimingMiddleware",
+        "Core.dataloaders.DataLoaderMiddleware",
+    ],
+}
+
+# Opt-in request profiling: Server-Timing headers, GraphQL extensions.tracing
+# and slow request logs for a sample of requests.
+REQUEST_PROFILING = {
+    "ENABLED": os.getenv("REQUEST_PROFILING", "0") == "1",
+    "SAMPLE_RATE": float(os.getenv("REQUEST_PROFILING_SAMPLE_RATE", "0.01")),
+    "ALLOW_FORCE": DEBUG,
+    "SLOW_REQUEST_MS": 1000,
+    "TOP_QUERIES": 5,
+}
+
+# Prometheus metrics served at /metrics, to requests with the METRICS_TOKEN
+# bearer token (or to anyone with DEBUG on and no token). With several worker
+# processes, point METRICS_DIR at a directory they share (emptied on deploy)
+# so that every scrape adds up all of them.
+METRICS = {
+    "ENABLED": os.getenv("METRICS", "1") == "1",
+    "DIRECTORY": os.getenv("METRICS_DIR") or None,
+    "FLUSH_INTERVAL": 1.0,
+    "TOKEN": os.getenv("METRICS_TOKEN") or None,
+}
+
+# Automatic Persisted Queries for /graphql/: documents registered by hash are
+# kept in an in-process LRU and in the ALIAS cache, which workers only share
+# with REDIS_URL (with LocMemCache each worker registers its own). Hashes come
+# from clients, so entries expire TIMEOUT seconds after their last use.
+GRAPHQL_PERSISTED_QUERIES = {
+    "STORE": "Core.persisted_queries.CacheQueryStore",
+    "ALIAS": "default",
+    "TIMEOUT": int(os.getenv("GRAPHQL_PERSISTED_QUERY_TIMEOUT", str(24 * 60 * 60))),
+}
+
+# Depth and estimated-cost limits for /graphql/ (see Core/query_cost.py). Cost
+# counts the objects an operation can resolve; BUDGET is the cost each user (or address)
+# may spend per BUDGET_WINDOW seconds, counted with incr() in the default
+# cache: across all workers with REDIS_URL, per worker without it.
+GRAPHQL_QUERY_COST = {
+    "MAX_DEPTH": 10,
+    "MAX_COST": 20000,
+    "DEFAULT_LIST_SIZE": 20,
+    "BUDGET": 200000,
+    "BUDGET_WINDOW": 60,
+}
+
+# Anonymous list/retrieve responses of the blog, post and tag endpoints (see
+# blog/response_cache.py); entries are invalidated by model signals. ALIAS
+# must be shared by every worker, or a write only invalidates its own.
+RESPONSE_CACHE = {
+    "ALIAS": "default",
+    "TIMEOUT": 300,
 }
@@ -1,9 +1,978 @@
-from django.test import TestCase
-from graphene.test import Client
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory,
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from graphene.test import Client as GraphQLClient
+from graphql import parse
+from rest_framework.authtoken.models import Token
+
+from blog.models import Post
+from blog.tests.factories import BlogFactory, PostFactory, TagFactory
+from blog.views import PostViewSet
+from Core.async_views import ConcurrentExecutionContext
+from Core.db_router import (
+    PIN_COOKIE,
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    RoutingState,
+    allow_replica_reads,
+    copy_sqlite_database,
+    current_routing,
+    replica_may_lag,
+    using_routing,
+)
+from Core.metrics import DEFAULTS as METRICS_DEFAULTS
+from Core.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    merge_snapshots,
+    registry,
+    render,
+)
+from Core.persisted_queries import CacheQueryStore, LocalQueryStore, query_hash
+from Core.profiling import DEFAULTS as PROFILING_DEFAULTS
+from Core.query_budget import (
+    DATASET_SIZES,
+    TARGETS,
+    budget_violations,
+    build_fixtures,
+    endpoint_names,
+    format_statements,
+    load_budgets,
+    measure,
+    record_queries,
+    updating_budgets,
+    write_budgets,
+)
+from Core.freshness import document_models
+from Core.query_cost import QueryCost, estimate_query_cost
 from Core.schema import schema
+from Core.views import (
+    PERSISTED_QUERY_HASH_MISMATCH,
+    PERSISTED_QUERY_NOT_FOUND,
+    default_query_store,
+    document_cache,
+)
+from tag.models import Tag
+from tag.views import TagViewSet
+from user.token_cache import token_cache
+from user.views import AuthViewSet
 
 
 class GraphQLTestCase(TestCase):
     def setUp(self):
         super().setUp()
-        self.client = Client(schema)
\ No newline at end of file
+        self.client = GraphQLClient(schema)
+
+
+TAGS_QUERY = "{ tagsByName(name: \"py\") { name } }"
+
+
+class TestCachedGraphQLView(TestCase):
+    def setUp(self):
+        cache.clear()
+        document_cache.clear()
+        default_query_store().clear()
+        Tag.objects.create(name="python")
+
+    def post(self, **payload):
+        return self.client.post(
+            "/graphql/", json.dumps(payload), content_type="application/json"
+        )
+
+    def persisted(self, sha256):
+        return {"persistedQuery": {"version": 1, "sha256Hash": sha256}}
+
+    def test_unknown_hash_asks_for_the_document(self):
+        response = self.post(extensions=self.persisted(query_hash(TAGS_QUERY)))
+        error = response.json()["errors"][0]
+        self.assertEqual(error["message"], PERSISTED_QUERY_NOT_FOUND)
+        self.assertEqual(error["extensions"]["code"], "PERSISTED_QUERY_NOT_FOUND")
+
+    def test_registered_hash_runs_without_the_document(self):
+        extensions = self.persisted(query_hash(TAGS_QUERY))
+        first = self.post(query=TAGS_QUERY, extensions=extensions)
+        self.assertEqual(first.status_code, 200)
+
+        response = self.post(extensions=extensions)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"], first.json()["data"])
+
+    def test_persisted_query_over_get(self):
+        self.post(query=TAGS_QUERY, extensions=self.persisted(query_hash(TAGS_QUERY)))
+        response = self.client.get(
+            "/graphql/",
+            {"extensions": json.dumps(self.persisted(query_hash(TAGS_QUERY)))},
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.json()["data"]["tagsByName"], [{"name": "python"}])
+
+    def test_hash_mismatch_is_rejected(self):
+        response = self.post(query=TAGS_QUERY, extensions=self.persisted("0" * 64))
+        error = response.json()["errors"][0]
+        self.assertEqual(error["message"], PERSISTED_QUERY_HASH_MISMATCH)
+        self.assertIsNone(default_query_store().get("0" * 64))
+
+    def test_document_is_parsed_once(self):
+        self.post(query=TAGS_QUERY)
+        with mock.patch("Core.views.parse") as parse, mock.patch("Core.views.validate") as validate:
+            response = self.post(query=TAGS_QUERY)
+        parse.assert_not_called()
+        validate.assert_not_called()
+        self.assertEqual(response.json()["data"]["tagsByName"], [{"name": "python"}])
+
+    def test_invalid_documents_are_not_cached(self):
+        query = "{ tagsByName(name: \"py\") { missing } }"
+        self.assertIn("errors", self.post(query=query).json())
+        self.assertIsNone(document_cache.get(query_hash(query)))
+
+
+class TestLocalQueryStore(TestCase):
+    def test_least_recently_used_query_is_evicted(self):
+        store = LocalQueryStore(max_size=2)
+        store.set("a", "{ a }")
+        store.set("b", "{ b }")
+        store.get("a")
+        store.set("c", "{ c }")
+        self.assertEqual(store.get("a"), "{ a }")
+        self.assertIsNone(store.get("b"))
+
+
+# LocMemCache expires entries by time.time(), which the test moves forward.
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class TestCacheQueryStore(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_unused_queries_expire(self):
+        store = CacheQueryStore(timeout=60)
+        store.set("a", "{ a }")
+        now = time.time()
+        with mock.patch("time.time", return_value=now + 30):
+            store.clear()
+            self.assertEqual(store.get("a"), "{ a }")
+        # The fetch at +30 s gave it another 60 s.
+        with mock.patch("time.time", return_value=now + 80):
+            store.clear()
+            self.assertEqual(store.get("a"), "{ a }")
+        with mock.patch("time.time", return_value=now + 200):
+            store.clear()
+            self.assertIsNone(store.get("a"))
+
+
+class TestGraphQLValidators(TestCase):
+    def setUp(self):
+        cache.clear()
+        document_cache.clear()
+        self.post = PostFactory(blog=BlogFactory())
+        self.post.tags.add(TagFactory(name="python"))
+        self.query = "{ postsByTitle(title: \"%s\") { title tags { name } } }" % (
+            self.post.title[:5]
+        )
+
+    def validators(self, query=None):
+        payload = {"query": query or self.query, "extensions": {"validators": True}}
+        response = self.client.post(
+            "/graphql/", json.dumps(payload), content_type="application/json"
+        )
+        return response.json().get("extensions", {}).get("validators")
+
+    def test_validators_cover_selected_models(self):
+        validators = self.validators()
+        self.assertEqual(validators["models"]["blog.post"]["count"], 1)
+        self.assertIn("tag.tag", validators["models"])
+        self.assertIn("tag.tag_posts", validators["models"])
+        self.assertIsNotNone(validators["lastModified"])
+
+    def test_etag_changes_with_the_data(self):
+        etag = self.validators()["etag"]
+        self.assertEqual(self.validators()["etag"], etag)
+        self.post.tags.add(TagFactory(name="django"))
+        self.assertNotEqual(self.validators()["etag"], etag)
+
+    def test_validators_are_opt_in(self):
+        response = self.client.post(
+            "/graphql/", json.dumps({"query": self.query}), content_type="application/json"
+        )
+        self.assertNotIn("validators", response.json()["extensions"])
+
+    def test_mutations_have_no_validators(self):
+        mutation = 'mutation { createTag(name: "new") { success } }'
+        self.assertIsNone(self.validators(mutation))
+
+
+NESTED_QUERY = """
+query Nested($size: Int = 5) {
+    blogs(first: $size) { edges { node { posts { tags { name } } } } }
+}
+"""
+
+
+def spread_twice(levels):
+    """Each fragment spreads the next one twice: 2**levels expansions if walked naively."""
+    return "{ ...F0 }\n" + "".join(
+        f"fragment F{i} on Query {{ ...F{i + 1} ...F{i + 1} }}\n" for i in range(levels)
+    ) + f'fragment F{levels} on Query {{ tagsByName(name: "py") {{ name }} }}'
+
+
+class TestEstimateQueryCost(TestCase):
+    def estimate(self, query, variables=None):
+        return estimate_query_cost(schema.graphql_schema, parse(query), None, variables)
+
+    def test_lists_multiply_their_children(self):
+        # blogs 1 + edges 5 + node 5 + posts 5*20 + tags 100*20
+        self.assertEqual(self.estimate(NESTED_QUERY), QueryCost(depth=5, cost=2111))
+
+    def test_page_size_comes_from_variables(self):
+        self.assertEqual(self.estimate(NESTED_QUERY, {"size": 1}).cost, 423)
+
+    def test_fragments_are_expanded(self):
+        query = """
+        { tagsByName(name: "py") { ...TagPosts } }
+        fragment TagPosts on TagType { posts { title } }
+        """
+        self.assertEqual(self.estimate(query), QueryCost(depth=2, cost=420))
+
+    def test_introspection_is_free(self):
+        query = "{ __schema { types { fields { type { ofType { name } } } } } }"
+        self.assertEqual(self.estimate(query), QueryCost(depth=0, cost=0))
+
+    def assertFast(self, query, seconds=1):
+        document = parse(query)
+        started = time.perf_counter()
+        query_cost = estimate_query_cost(schema.graphql_schema, document)
+        models = document_models(schema.graphql_schema, document)
+        self.assertLess(time.perf_counter() - started, seconds)
+        return query_cost, models
+
+    def test_nested_fragment_spreads_are_expanded_once(self):
+        query_cost, models = self.assertFast(spread_twice(40))
+        self.assertEqual(query_cost, QueryCost(depth=1, cost=20))
+        self.assertEqual(models, [Tag])
+
+    def test_fragments_reached_through_aliases_are_measured_once(self):
+        levels = 30
+        query = '{ tagsByName(name: "py") { ...T0 } }\n' + "".join(
+            f"fragment T{i} on TagType {{ a: posts {{ ...P{i} }} b: posts {{ ...P{i} }} }}\n"
+            f"fragment P{i} on PostType {{ a: tags {{ ...T{i + 1} }} b: tags {{ ...T{i + 1} }} }}\n"
+            for i in range(levels)
+        ) + f"fragment T{levels} on TagType {{ name }}"
+        query_cost, models = self.assertFast(query)
+        self.assertEqual(query_cost.depth, 2 * levels + 1)
+        self.assertGreater(query_cost.cost, 20 ** (2 * levels))
+        self.assertEqual(models, [Tag, Post])
+
+
+@override_settings(
+    GRAPHQL_QUERY_COST={"MAX_DEPTH": 5, "MAX_COST": 1000, "BUDGET": 2500}
+)
+class TestQueryCostLimits(TestCase):
+    def setUp(self):
+        cache.clear()
+        document_cache.clear()
+
+    def post(self, query, variables=None, **extra):
+        return self.client.post(
+            "/graphql/",
+            json.dumps({"query": query, "variables": variables}),
+            content_type="application/json",
+            **extra,
+        )
+
+    def test_cost_is_reported_in_extensions(self):
+        response = self.post('{ tagsByName(name: "py") { name } }')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["extensions"]["cost"],
+            {"depth": 1, "requested": 20, "maximum": 1000, "remaining": 2480},
+        )
+
+    def test_deep_queries_are_rejected(self):
+        query = """
+        { tagsByName(name: "py") { posts { tags { posts { tags { posts { title } } } } } } }
+        """
+        error = self.post(query).json()["errors"][0]
+        self.assertEqual(error["extensions"]["code"], "QUERY_TOO_DEEP")
+
+    def test_nested_fragments_validate_in_bounded_time(self):
+        started = time.perf_counter()
+        response = self.post(spread_twice(40))
+        self.assertLess(time.perf_counter() - started, 2)
+        self.assertEqual(response.json()["data"], {"tagsByName": []})
+
+    def test_costly_queries_are_rejected_before_execution(self):
+        with self.assertNumQueries(0):
+            response = self.post(NESTED_QUERY)
+        body = response.json()
+        self.assertEqual(body["errors"][0]["extensions"]["code"], "QUERY_TOO_COSTLY")
+        self.assertEqual(body["extensions"]["cost"]["requested"], 2111)
+
+    def test_budget_throttles_repeated_queries(self):
+        query = "{ tagsByName(name: \"py\") { posts { title } } }"
+        for _ in range(5):
+            self.assertEqual(self.post(query).status_code, 200)
+        error = self.post(query).json()["errors"][0]
+        self.assertEqual(error["extensions"]["code"], "QUERY_COST_THROTTLED")
+        self.assertGreaterEqual(error["extensions"]["retryAfter"], 1)
+
+    def test_made_up_tokens_share_the_address_budget(self):
+        query = "{ tagsByName(name: \"py\") { posts { title } } }"
+        for i in range(5):
+            self.assertEqual(self.post(query, HTTP_AUTHORIZATION=f"Bearer made-up-{i}").status_code, 200)
+        error = self.post(query, HTTP_AUTHORIZATION="Token made-up-5").json()["errors"][0]
+        self.assertEqual(error["extensions"]["code"], "QUERY_COST_THROTTLED")
+
+    def test_each_user_has_a_budget(self):
+        query = "{ tagsByName(name: \"py\") { posts { title } } }"
+        first, second = (
+            Token.objects.create(user=User.objects.create_user(name, password="pass12345"))
+            for name in ("first", "second")
+        )
+        for _ in range(5):
+            self.post(query, HTTP_AUTHORIZATION=f"Bearer {first.key}")
+        error = self.post(query, HTTP_AUTHORIZATION=f"Token {first.key}").json()["errors"][0]
+        self.assertEqual(error["extensions"]["code"], "QUERY_COST_THROTTLED")
+        response = self.post(query, HTTP_AUTHORIZATION=f"Bearer {second.key}").json()
+        self.assertNotIn("errors", response)
+
+
+class TestQueryBudgets(TestCase):
+    """
+    Every DRF action and GraphQL root field must run a constant number of
+    queries, within Core/query_budgets.json, whatever the dataset size.
+    Rewrite the budgets with UPDATE_QUERY_BUDGETS=1 (or pytest
+    --update-query-budgets) after an intended change.
+    """
+
+    maxDiff = None
+
+    def test_every_endpoint_has_a_target(self):
+        self.assertEqual(endpoint_names(schema) - {t.name for t in TARGETS}, set())
+
+    def test_query_counts_are_constant_and_within_budget(self):
+        usages = {target.name: {} for target in TARGETS}
+        failures = []
+        for size in DATASET_SIZES:
+            with transaction.atomic():
+                fixtures = build_fixtures(size)
+                for target in TARGETS:
+                    usage, response = measure(target, fixtures)
+                    failures.append(target.failed(response))
+                    usages[target.name][size] = usage
+                transaction.set_rollback(True)
+        self.assertEqual([failure for failure in failures if failure], [])
+
+        if updating_budgets():
+            write_budgets()
+        budgets = load_budgets()
+        for name, sizes in usages.items():
+            with self.subTest(name):
+                problems = budget_violations(name, sizes, budgets)
+                self.assertEqual(problems, [], format_statements(sizes))
+
+
+PROFILE_ALL = {**PROFILING_DEFAULTS, "ENABLED": True, "SAMPLE_RATE": 1.0}
+
+
+class TestProfilingMiddleware(TestCase):
+    def setUp(self):
+        cache.clear()
+        blog = BlogFactory()
+        tag = TagFactory(name="python")
+        for _ in range(3):
+            PostFactory(blog=blog).tags.add(tag)
+
+    def graphql(self, client, query, **headers):
+        return client.post(
+            "/graphql/", json.dumps({"query": query}), content_type="application/json", **headers
+        )
+
+    def test_disabled_by_default(self):
+        response = Client().get("/cms/api/posts/")
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_PROFILING=PROFILE_ALL)
+    def test_rest_server_timing(self):
+        response = Client().get("/cms/api/posts/")
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn("serializer;dur=", timing)
+        self.assertIn("total;dur=", timing)
+
+    @override_settings(REQUEST_PROFILING=PROFILE_ALL)
+    def test_graphql_tracing(self):
+        response = self.graphql(Client(), "{ posts(first: 2) { edges { node { title } } } }")
+        self.assertIn("graphql-execute;dur=", response["Server-Timing"])
+        tracing = response.json()["extensions"]["tracing"]
+        self.assertEqual(tracing["version"], 1)
+        paths = [resolver["path"] for resolver in tracing["execution"]["resolvers"]]
+        self.assertIn(["posts"], paths)
+        self.assertIn(["posts", "edges", 1, "node", "title"], paths)
+
+    @override_settings(REQUEST_PROFILING={**PROFILE_ALL, "SAMPLE_RATE": 0})
+    def test_unsampled_requests_are_not_profiled(self):
+        response = self.graphql(Client(), "{ posts(first: 2) { edges { node { title } } } }")
+        self.assertNotIn("Server-Timing", response)
+        self.assertNotIn("tracing", response.json().get("extensions", {}))
+
+    @override_settings(REQUEST_PROFILING={**PROFILE_ALL, "SAMPLE_RATE": 0, "ALLOW_FORCE": True})
+    def test_forced_profile(self):
+        response = Client().get("/cms/api/tags/", HTTP_X_PROFILE="1")
+        self.assertIn("Server-Timing", response)
+
+    @override_settings(REQUEST_PROFILING={**PROFILE_ALL, "SLOW_REQUEST_MS": 0, "TOP_QUERIES": 1})
+    def test_slow_requests_log_their_top_queries(self):
+        with self.assertLogs("Core.profiling", "WARNING") as logs:
+            Client().get("/cms/api/posts/")
+        self.assertIn("Slow request GET /cms/api/posts/", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+
+def sample(text, name, **labels):
+    """The value of ``name`` with exactly ``labels`` in an exposition, 0 if absent."""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    series = f"{name}{{{label_text}}}" if labels else name
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+@override_settings(METRICS={**METRICS_DEFAULTS, "TOKEN": "secret"})
+class TestMetricsEndpoint(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        PostFactory(blog=BlogFactory())
+
+    def scrape(self):
+        response = Client().get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode()
+
+    def test_request_latency_and_queries_by_route(self):
+        before = self.scrape()
+        Client().get("/cms/api/posts/")
+        after = self.scrape()
+        latency = "http_request_duration_seconds_count"
+        labels = {"method": "GET", "route": "post-list", "status": "200"}
+        self.assertEqual(sample(after, latency, **labels) - sample(before, latency, **labels), 1)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",route="post-list",'
+                      'status="200",le="+Inf"}', after)
+        queries = "http_request_db_queries_sum"
+        self.assertGreater(sample(after, queries, route="post-list"),
+                           sample(before, queries, route="post-list"))
+
+    def test_graphql_latency_by_operation(self):
+        before = self.scrape()
+        Client().post(
+            "/graphql/",
+            json.dumps({"query": "query RecentPosts { posts(first: 1) { edges { node { title } } } }"}),
+            content_type="application/json",
+        )
+        after = self.scrape()
+        name = "graphql_operation_duration_seconds_count"
+        labels = {"operation": "RecentPosts", "type": "query"}
+        self.assertEqual(sample(after, name, **labels) - sample(before, name, **labels), 1)
+
+    def test_token_cache_hits_and_misses(self):
+        user = User.objects.create_user("metrics", password="pass12345")
+        client = Client(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+        before = self.scrape()
+        client.get("/cms/api/auth/me/")
+        client.get("/cms/api/auth/me/")
+        after = self.scrape()
+        name = "auth_token_cache_requests_total"
+        self.assertEqual(sample(after, name, result="miss") - sample(before, name, result="miss"), 1)
+        self.assertEqual(sample(after, name, result="hit") - sample(before, name, result="hit"), 1)
+
+    def test_error_codes(self):
+        user = User.objects.create_user("metrics", password="pass12345")
+        client = Client(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+        before = self.scrape()
+        client.post("/cms/api/tags/", {}, content_type="application/json")
+        Client().get("/cms/api/posts/0/")
+        after = self.scrape()
+        name = "api_errors_total"
+        for labels in ({"code": "validation_error", "status": "400"},
+                       {"code": "api_error", "status": "404"}):
+            self.assertEqual(sample(after, name, **labels) - sample(before, name, **labels), 1)
+
+    def test_token_protection(self):
+        self.assertEqual(Client().get("/metrics").status_code, 403)
+        self.assertEqual(Client().get("/metrics", HTTP_AUTHORIZATION="Bearer other").status_code, 403)
+
+    @override_settings(METRICS=METRICS_DEFAULTS)
+    def test_no_token_only_with_debug(self):
+        self.assertEqual(Client().get("/metrics").status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(Client().get("/metrics").status_code, 200)
+
+
+class TestRegistry(TestCase):
+    def build(self):
+        registry = Registry()
+        counter = Counter(registry, "jobs_total", "Jobs.", ("queue",))
+        histogram = Histogram(registry, "job_seconds", "Job time.", buckets=(0.1, 1.0))
+        return registry, counter, histogram
+
+    def test_render(self):
+        registry, counter, histogram = self.build()
+        counter.inc(queue='a"b')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+        text = render(registry.snapshot())
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{queue="a\\"b"} 1', text)
+        self.assertIn('job_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('job_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('job_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("job_seconds_count 3", text)
+        self.assertEqual(sample(text, "job_seconds_sum"), 5.55)
+
+    def test_processes_are_added_up(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Another running worker process's snapshot.
+            other, counter, histogram = self.build()
+            counter.inc(2, queue="a")
+            histogram.observe(0.5)
+            Path(directory, f"metrics-{os.getppid()}.json").write_text(json.dumps(other.snapshot()))
+
+            registry, counter, histogram = self.build()
+            counter.inc(queue="a")
+            counter.inc(queue="b")
+            histogram.observe(0.05)
+            text = render(registry.collect(directory))
+
+        self.assertEqual(sample(text, "jobs_total", queue="a"), 3)
+        self.assertEqual(sample(text, "jobs_total", queue="b"), 1)
+        self.assertEqual(sample(text, "job_seconds_bucket", le="0.1"), 1)
+        self.assertEqual(sample(text, "job_seconds_bucket", le="1.0"), 2)
+        self.assertEqual(sample(text, "job_seconds_count"), 2)
+
+    def test_finished_processes_keep_counts_but_not_gauges(self):
+        finished = subprocess.Popen([sys.executable, "-c", ""])
+        finished.wait()
+        with tempfile.TemporaryDirectory() as directory:
+            other, counter, histogram = self.build()
+            gauge = Gauge(other, "queue_length", "Jobs waiting.")
+            counter.inc(2, queue="a")
+            histogram.observe(0.5)
+            gauge.set(7)
+            Path(directory, f"metrics-{finished.pid}.json").write_text(json.dumps(other.snapshot()))
+
+            registry, counter, histogram = self.build()
+            Gauge(registry, "queue_length", "Jobs waiting.").set(3)
+            counter.inc(queue="a")
+            text = render(registry.collect(directory))
+
+        self.assertEqual(sample(text, "jobs_total", queue="a"), 3)
+        self.assertEqual(sample(text, "job_seconds_count"), 1)
+        self.assertEqual(sample(text, "queue_length"), 3)
+
+    def test_merge_without_snapshots(self):
+        self.assertEqual(merge_snapshots([]), {})
+
+    def test_gauges_come_from_collectors(self):
+        registry = Registry()
+        gauge = Gauge(registry, "queue_length", "Jobs waiting.", ("queue",))
+        lengths = [3]
+        registry.add_collector(lambda: gauge.set(lengths[-1], queue="a"))
+        self.assertIn('queue_length{queue="a"} 3', render(registry.snapshot()))
+        lengths.append(5)
+        # Another process's queue adds up with this one's.
+        text = render(merge_snapshots([registry.snapshot(), registry.snapshot()]))
+        self.assertIn("# TYPE queue_length gauge", text)
+        self.assertEqual(sample(text, "queue_length", queue="a"), 5 + 5)
+
+
+class FakePool:
+    def __init__(self, **stats):
+        self.stats = stats
+
+    def pop_stats(self):
+        stats, self.stats = self.stats, {
+            key: value for key, value in self.stats.items()
+            if key in ("pool_min", "pool_max", "pool_size", "pool_available", "requests_waiting")
+        }
+        return stats
+
+
+class TestPoolMetrics(TestCase):
+    def test_pool_stats(self):
+        pool = FakePool(
+            pool_min=2, pool_max=4, pool_size=3, pool_available=1, requests_waiting=2,
+            requests_num=10, requests_wait_ms=1500, requests_errors=1,
+            connections_num=3, connections_lost=1,
+        )
+        before = render(registry.snapshot())
+        with mock.patch("Core.metrics.connection_pools", return_value={"default": pool}):
+            text = render(registry.snapshot())
+
+        def delta(name, **labels):
+            return sample(text, name, **labels) - sample(before, name, **labels)
+
+        self.assertEqual(sample(text, "db_pool_connections", alias="default", state="idle"), 1)
+        self.assertEqual(sample(text, "db_pool_connections", alias="default", state="in_use"), 2)
+        self.assertEqual(sample(text, "db_pool_max_connections", alias="default"), 4)
+        self.assertEqual(sample(text, "db_pool_waiting_requests", alias="default"), 2)
+        # Counters add up what the pool counted since the previous snapshot.
+        self.assertEqual(delta("db_pool_checkouts_total", alias="default"), 10)
+        self.assertEqual(delta("db_pool_checkout_wait_seconds_total", alias="default"), 1.5)
+        self.assertEqual(delta("db_pool_checkout_timeouts_total", alias="default"), 1)
+        self.assertEqual(delta("db_pool_connections_opened_total", alias="default"), 3)
+        self.assertEqual(delta("db_pool_connections_lost_total", alias="default"), 1)
+
+    def test_no_pools_with_sqlite(self):
+        self.assertNotIn("db_pool_connections{", render(registry.snapshot()))
+
+
+CONCURRENT_QUERY = "{ posts(first: 2) { edges { node { title } } } tags(first: 2) { edges { node { name } } } }"
+
+
+class TestAsyncViewSets(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.blog = BlogFactory()
+        self.posts = [PostFactory(blog=self.blog) for _ in range(3)]
+        self.factory = AsyncRequestFactory()
+
+    @override_settings(ASYNC_VIEWS=False)
+    def test_sync_views_under_wsgi(self):
+        view = PostViewSet.as_view({"get": "list"})
+        self.assertFalse(asyncio.iscoroutinefunction(view))
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_read_actions_are_async(self):
+        view = PostViewSet.as_view({"get": "list", "post": "create"})
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        self.assertEqual(view.actions, {"get": "list", "post": "create"})
+        self.assertIs(view.cls, PostViewSet)
+
+    @override_settings(ASYNC_VIEWS=True)
+    async def test_list_and_retrieve_match_sync(self):
+        list_view = PostViewSet.as_view({"get": "list"})
+        response = await list_view(self.factory.get("/cms/api/posts/"))
+        expected = await sync_to_async(Client().get)("/cms/api/posts/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, expected.json())
+
+        post = self.posts[0]
+        detail_view = PostViewSet.as_view({"get": "retrieve"})
+        response = await detail_view(self.factory.get(f"/cms/api/posts/{post.pk}/"), pk=post.pk)
+        self.assertEqual(response.data["id"], post.pk)
+        response = await detail_view(self.factory.get("/cms/api/posts/0/"), pk=0)
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(ASYNC_VIEWS=True)
+    async def test_cache_hits_stay_on_the_event_loop(self):
+        view = TagViewSet.as_view({"get": "list"})
+        await sync_to_async(TagFactory)()
+        first = await view(self.factory.get("/cms/api/tags/"))
+        with mock.patch.object(TagViewSet, "list", side_effect=AssertionError):
+            cached = await view(self.factory.get("/cms/api/tags/"))
+            not_modified = await view(
+                self.factory.get("/cms/api/tags/", headers={"If-None-Match": first["ETag"]})
+            )
+        self.assertEqual(cached.data, first.data)
+        self.assertEqual(not_modified.status_code, 304)
+
+    @override_settings(ASYNC_VIEWS=True)
+    async def test_unsafe_methods_keep_the_sync_action(self):
+        user = await User.objects.acreate_user("writer", password="pass12345")
+        token = await Token.objects.acreate(user=user)
+        view = TagViewSet.as_view({"get": "list", "post": "create"})
+        request = self.factory.post(
+            "/cms/api/tags/",
+            {"name": "async"},
+            content_type="application/json",
+            headers={"Authorization": f"Token {token.key}"},
+        )
+        response = await view(request)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["name"], "async")
+
+    @override_settings(ASYNC_VIEWS=True)
+    async def test_me(self):
+        user = await User.objects.acreate_user("reader", password="pass12345")
+        token = await Token.objects.acreate(user=user)
+        view = AuthViewSet.as_view({"get": "me"})
+        response = await view(
+            self.factory.get("/cms/api/auth/me/", headers={"Authorization": f"Token {token.key}"})
+        )
+        self.assertEqual(response.data["username"], "reader")
+
+
+class TestConcurrentGraphQL(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        blog = BlogFactory()
+        tag = TagFactory(name="python")
+        for _ in range(2):
+            PostFactory(blog=blog).tags.add(tag)
+
+    def graphql(self):
+        response = Client().post(
+            "/graphql/", json.dumps({"query": CONCURRENT_QUERY}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_root_fields_resolve_in_worker_threads(self):
+        expected = self.graphql()
+        threads = []
+        execute_root_field = ConcurrentExecutionContext.execute_root_field
+
+        def record(self, *args):
+            threads.append(threading.current_thread().name)
+            return execute_root_field(self, *args)
+
+        with override_settings(ASYNC_VIEWS=True), mock.patch.object(
+            ConcurrentExecutionContext, "execute_root_field", record
+        ):
+            result = self.graphql()
+
+        self.assertEqual(result["data"], expected["data"])
+        self.assertEqual(len(threads), 2)
+        self.assertTrue(all(name.startswith("graphql-root-field") for name in threads))
+
+    def test_worker_queries_reach_the_request_instrumentation(self):
+        with record_queries() as expected:
+            self.graphql()
+        with override_settings(ASYNC_VIEWS=True, REQUEST_PROFILING=PROFILE_ALL), record_queries() as usage:
+            response = Client().post(
+                "/graphql/", json.dumps({"query": CONCURRENT_QUERY}), content_type="application/json"
+            )
+        self.assertGreater(expected.count, 0)
+        self.assertEqual(usage.count, expected.count)
+        self.assertIn(f'desc="{expected.count} queries"', response["Server-Timing"])
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_mutations_and_single_fields_run_in_the_request_thread(self):
+        with mock.patch.object(
+            ConcurrentExecutionContext, "execute_root_field", side_effect=AssertionError
+        ):
+            response = Client().post(
+                "/graphql/",
+                json.dumps({"query": "{ tags(first: 1) { edges { node { name } } } }"}),
+                content_type="application/json",
+            )
+        self.assertEqual(response.json()["data"]["tags"]["edges"][0]["node"]["name"], "python")
+
+
+FAKE_REPLICAS = {
+    "DATABASES": {**settings.DATABASES, "replica_a": {}, "replica_b": {}},
+    "READ_REPLICAS": {"ALIASES": ["replica_a", "replica_b", "missing"], "STICKY_SECONDS": 5},
+}
+
+
+@override_settings(**FAKE_REPLICAS)
+class TestReplicaRouter(SimpleTestCase):
+    router = ReplicaRouter()
+
+    def test_no_routing_outside_requests(self):
+        self.assertIsNone(self.router.db_for_read(Post))
+        self.assertEqual(self.router.db_for_write(Post), "default")
+
+    def test_reads_go_to_configured_replicas(self):
+        replicas = set()
+        for _ in range(50):
+            with using_routing(RoutingState(use_replica=True)):
+                reads = {self.router.db_for_read(Post) for _ in range(5)}
+            # Every read of a request goes to the same replica.
+            self.assertEqual(len(reads), 1)
+            replicas |= reads
+        self.assertEqual(replicas, {"replica_a", "replica_b"})
+
+    def test_related_objects_follow_their_instance(self):
+        post = Post(title="x")
+        post._state.db = "replica_b"
+        with using_routing(RoutingState(use_replica=True)):
+            self.assertEqual(self.router.db_for_read(Tag, instance=post), "replica_b")
+
+    def test_reads_after_a_write_go_to_the_primary(self):
+        state = RoutingState(use_replica=True)
+        with using_routing(state):
+            self.assertEqual(self.router.db_for_write(Post), "default")
+            self.assertEqual(self.router.db_for_read(Post), "default")
+            allow_replica_reads()
+            self.assertEqual(self.router.db_for_read(Post), "default")
+        self.assertTrue(state.wrote)
+
+    def test_pinned_and_unsafe_requests_read_from_the_primary(self):
+        pinned = RoutingState(use_replica=True, pinned=True)
+        with using_routing(pinned):
+            allow_replica_reads()
+            self.assertEqual(self.router.db_for_read(Post), "default")
+
+        graphql = RoutingState(use_replica=False)
+        with using_routing(graphql):
+            self.assertEqual(self.router.db_for_read(Post), "default")
+            allow_replica_reads()
+            self.assertIn(self.router.db_for_read(Post), {"replica_a", "replica_b"})
+
+    def test_replica_may_lag_behind_recent_changes(self):
+        recent = datetime.now(timezone.utc)
+        old = recent - timedelta(seconds=60)
+        self.assertFalse(replica_may_lag(recent))
+        with using_routing(RoutingState(use_replica=True)):
+            self.assertTrue(replica_may_lag(recent))
+            self.assertFalse(replica_may_lag(old))
+
+
+@override_settings(**FAKE_REPLICAS)
+class TestReplicaRoutingMiddleware(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def serve(self, request, writes=False):
+        seen = {}
+
+        def view(request):
+            seen["use_replica"] = current_routing().use_replica
+            if writes:
+                ReplicaRouter().db_for_write(Post)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(request)
+        # The client sends back the cookies it was given.
+        for name, morsel in response.cookies.items():
+            self.factory.cookies[name] = morsel.value
+        return seen["use_replica"]
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        self.assertTrue(self.serve(self.factory.get("/")))
+        self.assertFalse(self.serve(self.factory.post("/"), writes=True))
+        self.assertFalse(self.serve(self.factory.get("/")))
+        # Other clients still read from the replicas.
+        self.factory = RequestFactory()
+        self.assertTrue(self.serve(self.factory.get("/")))
+
+    def test_unsafe_requests_that_do_not_write_do_not_pin(self):
+        self.assertFalse(self.serve(self.factory.post("/")))
+        self.assertTrue(self.serve(self.factory.get("/")))
+
+    def test_forged_pins_are_ignored(self):
+        self.factory.cookies[PIN_COOKIE] = "1"
+        self.assertTrue(self.serve(self.factory.get("/")))
+
+    @override_settings(READ_REPLICAS={"ALIASES": ["replica_a"], "STICKY_SECONDS": 1})
+    def test_pins_expire(self):
+        self.serve(self.factory.post("/"), writes=True)
+        self.assertFalse(self.serve(self.factory.get("/")))
+        time.sleep(1.1)
+        self.assertTrue(self.serve(self.factory.get("/")))
+
+
+@override_settings(**FAKE_REPLICAS)
+class TestReplicaPinsByUser(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.token = Token.objects.create(user=User.objects.create_user("pinned", password="pass12345"))
+
+    def serve(self, method, authorization, writes=False):
+        seen = {}
+
+        def view(request):
+            seen["use_replica"] = current_routing().use_replica
+            if writes:
+                ReplicaRouter().db_for_write(Post)
+            return HttpResponse()
+
+        # A new factory per request: the client keeps no cookies.
+        request = getattr(RequestFactory(), method)("/", HTTP_AUTHORIZATION=authorization)
+        ReplicaRoutingMiddleware(view)(request)
+        return seen["use_replica"]
+
+    def test_token_clients_without_cookies_are_pinned(self):
+        token = f"Token {self.token.key}"
+        self.assertTrue(self.serve("get", token))
+        self.assertFalse(self.serve("post", token, writes=True))
+        self.assertFalse(self.serve("get", token))
+        # The same user through GraphQL's Bearer scheme.
+        self.assertFalse(self.serve("get", f"Bearer {self.token.key}"))
+        # Unknown tokens are anonymous, and not pinned.
+        self.assertTrue(self.serve("get", "Token made-up"))
+
+    @override_settings(READ_REPLICAS={"ALIASES": ["replica_a"], "STICKY_SECONDS": 1})
+    def test_user_pins_expire(self):
+        token = f"Token {self.token.key}"
+        self.serve("post", token, writes=True)
+        self.assertFalse(self.serve("get", token))
+        time.sleep(1.1)
+        self.assertTrue(self.serve("get", token))
+
+
+@unittest.skipUnless(
+    "replica" in settings.DATABASES,
+    "Set SQLITE_REPLICA to run against a second SQLite database.",
+)
+class TestSqliteReplica(TransactionTestCase):
+    """The primary and an SQLite replica that only changes when copied."""
+
+    databases = {"default", "replica"} & set(settings.DATABASES)
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        user = User.objects.create_user(username="writer", password="x")
+        self.token = Token.objects.create(user=user)
+        copy_sqlite_database("default", "replica")
+
+    def test_read_your_writes(self):
+        writer = Client(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        reader = Client(REMOTE_ADDR="10.0.0.2")
+
+        response = writer.post("/cms/api/tags/", {"name": "replicated"})
+        self.assertEqual(response.status_code, 201)
+        url = f"/cms/api/tags/{response.json()['id']}/"
+
+        self.assertEqual(reader.get(url).status_code, 404)
+        self.assertEqual(writer.get(url).status_code, 200)
+        # Without the cookie the writer got, its token still pins it.
+        self.assertEqual(Client(HTTP_AUTHORIZATION=f"Token {self.token.key}").get(url).status_code, 200)
+        query = {"query": "{ tags(first: 5) { edges { node { name } } } }"}
+        edges = reader.post("/graphql/", query, content_type="application/json").json()
+        self.assertEqual(edges["data"]["tags"]["edges"], [])
+
+        copy_sqlite_database("default", "replica")
+        self.assertEqual(reader.get(url).status_code, 200)
+        edges = reader.post("/graphql/", query, content_type="application/json").json()
+        self.assertEqual(len(edges["data"]["tags"]["edges"]), 1)
+
+    def test_mutations_write_to_the_primary(self):
+        writer = Client(HTTP_AUTHORIZATION=f"Bearer {self.token.key}")
+        mutation = 'mutation { createTag(name: "from-graphql") { tag { name } } }'
+        response = writer.post("/graphql/", {"query": mutation}, content_type="application/json")
+        self.assertNotIn("errors", response.json())
+        self.assertTrue(Tag.objects.using("default").filter(name="from-graphql").exists())
+        self.assertFalse(Tag.objects.using("replica").filter(name="from-graphql").exists())
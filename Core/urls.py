@@ -8,8 +8,9 @@ from drf_spectacular.views import (
     SpectacularRedocView,
     SpectacularSwaggerView,
 )
-from graphene_django.views import GraphQLView
+from Core.metrics import metrics_view
 from Core.schema import schema
+from Core.views import CachedGraphQLView
 
 
 def root_view(request):
@@ -28,6 +29,7 @@ def root_view(request):
             "posts": "/cms/api/posts/",
             "tags": "/cms/api/tags/",
             "graphql": "/graphql/",
+            "metrics": "/metrics",
         },
         "documentation": "See /api/docs/ for interactive API documentation"
     })
@@ -47,7 +49,8 @@ urlpatterns = [
         name="swagger-ui",
     ),
     path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
-    path("graphql/", GraphQLView.as_view(graphiql=True, schema=schema)),
+    path("graphql/", CachedGraphQLView.as_view(graphiql=True, schema=schema)),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,303 @@
+import json
+import time
+from functools import cache
+from inspect import isawaitable
+
+from asgiref.sync import async_to_sync
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponseBadRequest, HttpResponseNotAllowed
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql import (
+    ExecutionResult,
+    GraphQLError,
+    OperationType,
+    execute,
+    get_operation_ast,
+    parse,
+    specified_rules,
+    validate,
+    validate_schema,
+)
+
+from Core.async_views import ConcurrentExecutionContext, sharing_execute_wrappers
+from Core.db_router import allow_replica_reads
+from Core.freshness import document_validators
+from Core.metrics import graphql_duration, operation_label
+from Core.persisted_queries import LRUCache, get_query_store, query_hash
+from Core.profiling import current_profile, profile_span
+from Core.query_cost import (
+    QueryDepthRule,
+    check_query_cost,
+    consume_cost_budget,
+    cost_settings,
+    estimate_query_cost,
+)
+
+DOCUMENT_CACHE_SIZE = 500
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+PERSISTED_QUERY_HASH_MISMATCH = "provided sha does not match query"
+
+document_cache = LRUCache(DOCUMENT_CACHE_SIZE)
+
+
+@cache
+def default_query_store():
+    return get_query_store()
+
+
+class CachedGraphQLView(GraphQLView):
+    """
+    GraphQLView that accepts Automatic Persisted Queries, reuses parsed and
+    validated documents across requests (keyed by the query's sha256) and
+    rejects operations over the depth and cost limits in GRAPHQL_QUERY_COST.
+    Whatever the view learns about a request is reported under the response
+    ``extensions`` key, including the data's validators when the request asks
+    for them with ``extensions.validators``.
+    """
+
+    validation_rules = (*specified_rules, QueryDepthRule)
+
+    def get_query_store(self):
+        return default_query_store()
+
+    @staticmethod
+    def get_extensions(request, data):
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        return extensions if isinstance(extensions, dict) else {}
+
+    def get_persisted_query(self, request, data, query):
+        persisted = self.get_extensions(request, data).get("persistedQuery")
+        if not persisted:
+            return query
+        if persisted.get("version") != 1 or not persisted.get("sha256Hash"):
+            raise GraphQLError(
+                PERSISTED_QUERY_NOT_SUPPORTED,
+                extensions={"code": "PERSISTED_QUERY_NOT_SUPPORTED"},
+            )
+
+        sha256 = persisted["sha256Hash"]
+        store = self.get_query_store()
+        if query:
+            if query_hash(query) != sha256:
+                raise GraphQLError(PERSISTED_QUERY_HASH_MISMATCH)
+            store.set(sha256, query)
+            return query
+
+        query = store.get(sha256)
+        if query is None:
+            raise GraphQLError(
+                PERSISTED_QUERY_NOT_FOUND,
+                extensions={"code": "PERSISTED_QUERY_NOT_FOUND"},
+            )
+        return query
+
+    def get_document(self, schema, query):
+        """Return ``(document, errors)``, parsing and validating each query once."""
+        key = query_hash(query)
+        document = document_cache.get(key)
+        if document is not None:
+            return document, []
+
+        try:
+            document = parse(query)
+        except GraphQLError as e:
+            return None, [e]
+
+        errors = validate(
+            schema,
+            document,
+            self.validation_rules,
+            graphene_settings.MAX_VALIDATION_ERRORS,
+        )
+        if errors:
+            return None, errors
+        document_cache.set(key, document)
+        return document, []
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        try:
+            query = self.get_persisted_query(request, data, query)
+        except GraphQLError as e:
+            return ExecutionResult(data=None, errors=[e])
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        with profile_span("graphql-document"):
+            document, errors = self.get_document(schema, query)
+        if errors:
+            return ExecutionResult(data=None, errors=errors)
+
+        operation_ast = get_operation_ast(document, operation_name)
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_ast.operation.value
+                    ),
+                )
+            )
+
+        if operation_ast is not None and operation_ast.operation == OperationType.QUERY:
+            allow_replica_reads()
+
+        extensions = {}
+        options = cost_settings()
+        query_cost = estimate_query_cost(schema, document, operation_name, variables)
+        if query_cost is not None:
+            extensions["cost"] = query_cost.as_extension(options)
+            try:
+                check_query_cost(query_cost, options)
+                remaining = consume_cost_budget(request, query_cost, options)
+            except GraphQLError as e:
+                return ExecutionResult(data=None, errors=[e], extensions=extensions)
+            if remaining is not None:
+                extensions["cost"]["remaining"] = remaining
+
+        if self.get_extensions(request, data).get("validators"):
+            validators = document_validators(
+                schema, document, operation_name, variables, query_hash(query)
+            )
+            if validators is not None:
+                extensions["validators"] = validators
+
+        started = time.perf_counter()
+        with profile_span("graphql-execute"):
+            result = self.execute_operation(
+                request, schema, document, operation_ast, variables, operation_name
+            )
+        if operation_ast is not None:
+            name = operation_ast.name.value if operation_ast.name else operation_name
+            graphql_duration.observe(
+                time.perf_counter() - started,
+                operation=operation_label(name),
+                type=operation_ast.operation.value,
+            )
+        profile = current_profile()
+        if profile is not None:
+            extensions["tracing"] = profile.tracing()
+        if extensions:
+            result.extensions = {**(result.extensions or {}), **extensions}
+        return result
+
+    def execute_operation(
+        self, request, schema, document, operation_ast, variables, operation_name
+    ):
+        try:
+            execute_options = {
+                "root_value": self.get_root_value(request),
+                "context_value": self.get_context(request),
+                "variable_values": variables,
+                "operation_name": operation_name,
+                "middleware": self.get_middleware(request),
+            }
+            if self.execution_context_class:
+                execute_options["execution_context_class"] = self.execution_context_class
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = self.execute_document(
+                        schema, document, operation_ast, **execute_options
+                    )
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            return self.execute_document(schema, document, operation_ast, **execute_options)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+    def execute_document(self, schema, document, operation_ast, **options):
+        """
+        Execute ``document``. With settings.ASYNC_VIEWS, a query selecting
+        several root fields outside a transaction resolves them concurrently
+        on graphql-core's async executor (see ConcurrentExecutionContext).
+        """
+        if (
+            settings.ASYNC_VIEWS
+            and operation_ast is not None
+            and operation_ast.operation == OperationType.QUERY
+            and len(operation_ast.selection_set.selections) > 1
+            and not connection.in_atomic_block
+        ):
+            options["execution_context_class"] = ConcurrentExecutionContext
+            with sharing_execute_wrappers():
+                return async_to_sync(self.aexecute_document)(schema, document, **options)
+        return execute(schema, document, **options)
+
+    async def aexecute_document(self, schema, document, **options):
+        result = execute(schema, document, **options)
+        return await result if isawaitable(result) else result
+
+    def get_response(self, request, data, show_graphiql=False):
+        # Same as GraphQLView.get_response, plus the result's ``extensions``.
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if not execution_result:
+            return None, status_code
+
+        response = {}
+        if execution_result.errors:
+            set_rollback()
+            response["errors"] = [self.format_error(e) for e in execution_result.errors]
+
+        if execution_result.errors and any(
+            not getattr(e, "path", None) for e in execution_result.errors
+        ):
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+
+        if execution_result.extensions:
+            response["extensions"] = execution_result.extensions
+
+        if self.batch:
+            response["id"] = id
+            response["status"] = status_code
+
+        return self.json_encode(request, response, pretty=show_graphiql), status_code
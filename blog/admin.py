@@ -1,10 +1,27 @@
 from django.contrib import admin
 from .models import Blog, Post
+from import_export import resources
 from import_export.admin import ImportExportModelAdmin
+from .mixins import StreamingExportAdminMixin
 
 
-class BlogAdmin(ImportExportModelAdmin):
-    list_display = ["title", "created_by", "created_at", "updated_at"]
+class PostResource(resources.ModelResource):
+    class Meta:
+        model = Post
+        exclude = ("search_vector",)
+
+
+class BlogResource(resources.ModelResource):
+    class Meta:
+        model = Blog
+        # Counters are maintained by blog.counters, never imported.
+        exclude = ("post_count",)
+
+
+class BlogAdmin(StreamingExportAdminMixin, ImportExportModelAdmin):
+    resource_classes = [BlogResource]
+    export_name = "blogs"
+    list_display = ["title", "created_by", "post_count", "created_at", "updated_at"]
     list_filter = ["created_at", "updated_at"]
     search_fields = ["title"]
     list_per_page = 25
@@ -17,7 +34,9 @@ class BlogAdmin(ImportExportModelAdmin):
     created_by.admin_order_field = "user__username"
 
 
-class PostAdmin(ImportExportModelAdmin):
+class PostAdmin(StreamingExportAdminMixin, ImportExportModelAdmin):
+    resource_classes = [PostResource]
+    export_name = "posts"
     list_display = ["title", "blog", "published_at", "updated_at"]
     list_filter = ["blog", "published_at", "updated_at"]
     search_fields = ["title", "blog__title"]
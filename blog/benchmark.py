@@ -0,0 +1,237 @@
+import json
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from Core.query_cost import cost_settings
+from tag.models import Tag
+from .models import Blog, Post
+from .response_cache import response_cache_settings
+from .seed import seed_dataset
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+PERCENTILES = (50, 90, 95, 99)
+
+POST_FIELDS = "id title publishedAt blog { id title } tags { id name }"
+
+GRAPHQL_QUERIES = {
+    "posts": (
+        "query ($first: Int) { posts(first: $first) { edges { node { %s } } "
+        "pageInfo { hasNextPage endCursor } } }" % POST_FIELDS
+    ),
+    "blogs": (
+        "query ($first: Int) { blogs(first: $first) { edges { node { id title postCount "
+        "user { id username } } } pageInfo { hasNextPage endCursor } } }"
+    ),
+    "tags": (
+        "query ($first: Int) { tags(first: $first) { edges { node { id name postCount } } "
+        "pageInfo { hasNextPage endCursor } } }"
+    ),
+    "postsByTag": (
+        "query ($id: ID!, $first: Int) { postsByTag(id: $id, first: $first) { edges { node "
+        "{ %s } } pageInfo { hasNextPage endCursor } } }" % POST_FIELDS
+    ),
+    "tagsByPost": "query ($id: ID!) { tagsByPost(id: $id) { id name postCount } }",
+}
+
+
+def scenarios(page_size=20):
+    """
+    The requests to benchmark, as ``{name: (path, graphql_body_or_None)}``,
+    with ids taken from the current data: list and detail of every public REST
+    resource and every hot GraphQL root field.
+    """
+    post = Post.objects.order_by("-published_at", "-id").first()
+    blog = Blog.objects.order_by("-post_count", "id").first()
+    tag = Tag.objects.order_by("-post_count", "id").first()
+    if not (post and blog and tag):
+        raise ValueError("Seed the database before benchmarking (see seed_posts).")
+
+    rest = {
+        "rest:blogs.list": "/cms/api/blogs/",
+        "rest:blogs.retrieve": f"/cms/api/blogs/{blog.pk}/",
+        "rest:posts.list": "/cms/api/posts/",
+        "rest:posts.retrieve": f"/cms/api/posts/{post.pk}/",
+        "rest:tags.list": "/cms/api/tags/",
+        "rest:tags.retrieve": f"/cms/api/tags/{tag.pk}/",
+    }
+    variables = {
+        "posts": {"first": page_size},
+        "blogs": {"first": page_size},
+        "tags": {"first": page_size},
+        "postsByTag": {"id": tag.pk, "first": page_size},
+        "tagsByPost": {"id": post.pk},
+    }
+    requests = {name: (path, None) for name, path in rest.items()}
+    for field, query in GRAPHQL_QUERIES.items():
+        body = {"query": query, "variables": variables[field]}
+        requests[f"graphql:{field}"] = ("/graphql/", body)
+    return requests
+
+
+def _percentile(sorted_values, percentile):
+    """Nearest-rank percentile; stable for the small samples a CI run takes."""
+    rank = max(1, -(-percentile * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def summarize(timings, query_counts, elapsed, errors):
+    """Latency percentiles (ms), throughput (requests/s) and queries per request."""
+    timings = sorted(timings)
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "throughput_rps": round(len(timings) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(statistics.fmean(timings), 3),
+            **{f"p{p}": round(_percentile(timings, p), 3) for p in PERCENTILES},
+            "max": round(timings[-1], 3),
+        },
+        "queries": {
+            "min": min(query_counts),
+            "median": statistics.median(query_counts),
+            "max": max(query_counts),
+        },
+    }
+
+
+def _send(client, path, body):
+    if body is None:
+        return client.get(path)
+    return client.post(path, json.dumps(body), content_type="application/json")
+
+
+def _failed(response):
+    if response.status_code != 200:
+        return True
+    if response.headers.get("Content-Type", "").startswith("application/json"):
+        return bool(json.loads(response.content).get("errors"))
+    return False
+
+
+def run_scenario(client, path, body, requests=100, warmup=5, warm_cache=False):
+    """
+    Send ``requests`` sequential requests (after ``warmup`` unmeasured ones)
+    and summarize them. Unless ``warm_cache``, the response cache is cleared
+    before every request, outside the measured time, so the numbers reflect
+    the database path rather than cache hits.
+    """
+    cache = caches[response_cache_settings()["ALIAS"]]
+    for _ in range(warmup):
+        _send(client, path, body)
+
+    timings, query_counts, errors, elapsed = [], [], 0, 0.0
+    for _ in range(requests):
+        if not warm_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = _send(client, path, body)
+            duration = time.perf_counter() - started
+        elapsed += duration
+        timings.append(duration * 1000)
+        query_counts.append(len(queries))
+        errors += _failed(response)
+    return summarize(timings, query_counts, elapsed, errors)
+
+
+def dataset_rows():
+    return {
+        "users": get_user_model().objects.count(),
+        "blogs": Blog.objects.count(),
+        "tags": Tag.objects.count(),
+        "posts": Post.objects.count(),
+        "post_tags": Tag.posts.through.objects.count(),
+    }
+
+
+def grow_dataset(posts, **seed_options):
+    """Seed only the posts missing to reach ``posts``; sizes can grow run after run."""
+    missing = posts - Post.objects.count()
+    if missing > 0:
+        seed_dataset(missing, **seed_options)
+
+
+def run_benchmarks(
+    sizes=DEFAULT_SIZES,
+    requests=100,
+    warmup=5,
+    page_size=20,
+    warm_cache=False,
+    only=None,
+    seed_options=None,
+    progress=None,
+):
+    """
+    Grow the dataset to each of ``sizes`` posts in turn (smallest first) and
+    run every scenario against it. Returns a JSON-serializable dict meant to
+    be written next to the results of other commits and diffed with
+    :func:`compare_results`. GraphQL cost budgets are disabled for the run.
+    """
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "vendor": connection.vendor,
+            "django": django.get_version(),
+            "python": platform.python_version(),
+            "requests": requests,
+            "warmup": warmup,
+            "page_size": page_size,
+            "warm_cache": warm_cache,
+        },
+        "datasets": {},
+    }
+    overrides = override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        GRAPHQL_QUERY_COST={**cost_settings(), "BUDGET": None},
+    )
+    client = Client()
+    with overrides:
+        for size in sorted(sizes):
+            grow_dataset(size, **(seed_options or {}))
+            dataset = {"rows": dataset_rows(), "scenarios": {}}
+            for name, (path, body) in scenarios(page_size).items():
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                if progress:
+                    progress(size, name)
+                dataset["scenarios"][name] = run_scenario(
+                    client, path, body, requests, warmup, warm_cache
+                )
+            results["datasets"][str(size)] = dataset
+    return results
+
+
+def compare_results(baseline, current, tolerance=0.2):
+    """
+    List regressions between two :func:`run_benchmarks` results: more queries
+    per request, and p95 latency growing by more than ``tolerance`` (a
+    fraction). Only datasets and scenarios present in both are compared.
+    """
+    regressions = []
+    for size, dataset in current["datasets"].items():
+        previous = baseline["datasets"].get(size)
+        if previous is None:
+            continue
+        for name, summary in dataset["scenarios"].items():
+            before = previous["scenarios"].get(name)
+            if before is None:
+                continue
+            if summary["queries"]["max"] > before["queries"]["max"]:
+                regressions.append(
+                    f"{size} {name}: queries {before['queries']['max']} -> "
+                    f"{summary['queries']['max']}"
+                )
+            old_p95, new_p95 = before["latency_ms"]["p95"], summary["latency_ms"]["p95"]
+            if old_p95 and new_p95 > old_p95 * (1 + tolerance):
+                regressions.append(f"{size} {name}: p95 {old_p95} ms -> {new_p95} ms")
+    return regressions
@@ -0,0 +1,193 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+from rest_framework import serializers
+
+from tag.models import Tag
+from .constants import (
+    BLOG_NOT_FOUND,
+    POST_NOT_FOUND,
+    POST_MODIFY_PERMISSION_DENIED,
+    POST_BULK_INVALID_ITEM,
+    POST_BULK_ID_REQUIRED,
+    POST_BULK_TAGS_NOT_FOUND,
+    POST_BULK_BATCH_SIZE,
+)
+from .counters import adjust_blog_counts, batched_counters, release_post_tags
+from .models import Blog, Post
+from .permissions import can_edit_post
+from .response_cache import bump_generation, model_label
+from .search import index_posts
+from .utils import set_tags_by_post
+
+
+class BulkPostSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    blog_id = serializers.IntegerField(required=False)
+    tags = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    class Meta:
+        model = Post
+        fields = ["id", "blog_id", "title", "content", "tags"]
+
+
+def _error(index, errors):
+    return {"index": index, "errors": errors}
+
+
+def _validate_items(items, partial=False):
+    """
+    Validate every item on its own and check all referenced tags with a
+    single query. Returns ``([(index, data)], errors)``.
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(_error(index, {"non_field_errors": [POST_BULK_INVALID_ITEM]}))
+            continue
+        serializer = BulkPostSerializer(data=item, partial=partial)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append(_error(index, serializer.errors))
+
+    tag_ids = {tag_id for _, data in valid for tag_id in data.get("tags", [])}
+    existing = set(Tag.objects.filter(id__in=tag_ids).values_list("id", flat=True))
+    checked = []
+    for index, data in valid:
+        missing = sorted(set(data.get("tags", [])) - existing)
+        if missing:
+            message = POST_BULK_TAGS_NOT_FOUND.format(
+                tag_ids=", ".join(str(tag_id) for tag_id in missing)
+            )
+            errors.append(_error(index, {"tags": [message]}))
+        else:
+            checked.append((index, data))
+    return checked, errors
+
+
+def _editable(user, blogs):
+    """Check ownership once per distinct blog."""
+    return {blog.pk: can_edit_post(user, blog) for blog in blogs}
+
+
+def _prefetch_tags(posts):
+    for post in posts:
+        getattr(post, "_prefetched_objects_cache", {}).pop("tags", None)
+    prefetch_related_objects(posts, "tags")
+    return posts
+
+
+def bulk_create_posts(user, items, blog=None):
+    """
+    Create posts from ``items`` in one transaction. Every post goes to
+    ``blog`` when given, otherwise to the blog named by its ``blog_id``.
+    Returns ``(posts, errors)``; invalid items are reported and skipped.
+    """
+    valid, errors = _validate_items(items)
+
+    if blog is not None:
+        blogs = {blog.pk: blog}
+    else:
+        blogs = Blog.objects.in_bulk(
+            {data["blog_id"] for _, data in valid if "blog_id" in data}
+        )
+    allowed = _editable(user, blogs.values())
+
+    pending = []
+    for index, data in valid:
+        target = blog or blogs.get(data.get("blog_id"))
+        if target is None:
+            errors.append(_error(index, {"blog_id": [BLOG_NOT_FOUND]}))
+        elif not allowed[target.pk]:
+            errors.append(_error(index, {"non_field_errors": [POST_MODIFY_PERMISSION_DENIED]}))
+        else:
+            post = Post(blog=target, title=data["title"], content=data["content"])
+            pending.append((index, post, data.get("tags", [])))
+
+    posts = [post for _, post, _ in pending]
+    with transaction.atomic(), batched_counters():
+        Post.objects.bulk_create(posts, batch_size=POST_BULK_BATCH_SIZE)
+        index_posts(posts)
+        adjust_blog_counts(Counter(post.blog_id for post in posts))
+        bump_generation(model_label(Post))
+        set_tags_by_post({post: tags for _, post, tags in pending}, created=True)
+
+    return _prefetch_tags(posts), sorted(errors, key=lambda error: error["index"])
+
+
+def _load_for_change(user, items, errors):
+    """
+    Fetch the posts named by ``items`` with their blogs in one query and
+    drop the ones that are missing or not editable by ``user``.
+    """
+    ids = {data["id"] for _, data in items if "id" in data}
+    posts = Post.objects.select_related("blog").in_bulk(ids)
+    allowed = _editable(user, {post.blog for post in posts.values()})
+
+    found = []
+    for index, data in items:
+        if "id" not in data:
+            errors.append(_error(index, {"id": [POST_BULK_ID_REQUIRED]}))
+        elif data["id"] not in posts:
+            errors.append(_error(index, {"id": [POST_NOT_FOUND]}))
+        elif not allowed[posts[data["id"]].blog_id]:
+            errors.append(_error(index, {"non_field_errors": [POST_MODIFY_PERMISSION_DENIED]}))
+        else:
+            found.append((index, posts[data["id"]], data))
+    return found
+
+
+def bulk_update_posts(user, items):
+    """
+    Partially update posts in one transaction with one ``bulk_update``.
+    ``tags``, when present, replaces the tag set of that post.
+    """
+    valid, errors = _validate_items(items, partial=True)
+    found = _load_for_change(user, valid, errors)
+
+    now = timezone.now()
+    fields = {"updated_at"}
+    tags_by_post = {}
+    for _, post, data in found:
+        for name in ("title", "content"):
+            if name in data:
+                setattr(post, name, data[name])
+                fields.add(name)
+        post.updated_at = now
+        if "tags" in data:
+            tags_by_post[post] = data["tags"]
+
+    posts = [post for _, post, _ in found]
+    with transaction.atomic():
+        Post.objects.bulk_update(posts, sorted(fields), batch_size=POST_BULK_BATCH_SIZE)
+        if fields & {"title", "content"}:
+            index_posts(posts)
+        bump_generation(model_label(Post))
+        set_tags_by_post(tags_by_post)
+
+    return _prefetch_tags(posts), sorted(errors, key=lambda error: error["index"])
+
+
+def bulk_delete_posts(user, items):
+    """
+    Delete posts given as ids or ``{"id": ...}`` objects with one DELETE.
+    Returns ``(deleted_ids, errors)``.
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        post_id = item.get("id") if isinstance(item, dict) else item
+        try:
+            valid.append((index, {"id": int(post_id)}))
+        except (TypeError, ValueError):
+            errors.append(_error(index, {"id": [POST_BULK_ID_REQUIRED]}))
+    found = _load_for_change(user, valid, errors)
+
+    ids = [post.pk for _, post, _ in found]
+    with transaction.atomic(), batched_counters():
+        release_post_tags(ids)
+        Post.objects.filter(pk__in=ids).delete()
+
+    return ids, sorted(errors, key=lambda error: error["index"])
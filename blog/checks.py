@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+from .response_cache import response_cache_settings
+
+
+@register(Tags.caches)
+def check_response_cache(app_configs, **kwargs):
+    """
+    Generations live in the response cache: with a per-process cache, a write
+    invalidates only the worker that made it and the others keep serving the
+    old responses (and 304s) until TIMEOUT.
+    """
+    alias = response_cache_settings()["ALIAS"]
+    workers = getattr(settings, "WEB_CONCURRENCY", 1)
+    if workers > 1 and isinstance(caches[alias], LocMemCache):
+        return [
+            Error(
+                f"RESPONSE_CACHE uses the per-process cache {alias!r} with "
+                f"WEB_CONCURRENCY={workers}.",
+                hint="Set REDIS_URL so every worker shares the cache, or run one worker.",
+                id="blog.E001",
+            )
+        ]
+    return []
@@ -0,0 +1,16 @@
+import hashlib
+
+from django.db.models import Count, Max
+
+
+def queryset_validator(queryset):
+    """Return ``(MAX(updated_at), COUNT(*))`` of ``queryset`` with one aggregate query."""
+    values = queryset.order_by().aggregate(
+        last_modified=Max("updated_at"), count=Count("pk")
+    )
+    return values["last_modified"], values["count"]
+
+
+def make_etag(*parts):
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
@@ -0,0 +1,117 @@
+import threading
+import time
+
+from django.db import DEFAULT_DB_ALIAS, Error, connections
+
+from .server_benchmark import summarize_load
+
+SERVER_CONNECTIONS_SQL = (
+    "SELECT count(*) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+)
+
+
+def server_connections(alias=DEFAULT_DB_ALIAS):
+    """
+    A function returning how many connections the database server of
+    ``alias`` has open to its database, through a connection of its own
+    (outside any pool); None when the server cannot tell (not PostgreSQL).
+    """
+    wrapper = connections[alias]
+    if wrapper.vendor != "postgresql":
+        return None
+    connection = wrapper.Database.connect(**wrapper.get_connection_params())
+    connection.autocommit = True
+
+    def count():
+        with connection.cursor() as cursor:
+            cursor.execute(SERVER_CONNECTIONS_SQL)
+            return cursor.fetchone()[0]
+
+    count.close = connection.close
+    return count
+
+
+def _request(alias, hold):
+    """What a request does with its thread's connection: use it, then finish."""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT pg_sleep(%s)", [hold])
+            else:
+                cursor.execute("SELECT 1")
+                time.sleep(hold)
+    finally:
+        # As on request_finished: returned to the pool, or kept if persistent.
+        connection.close_if_unusable_or_obsolete()
+
+
+def _worker(alias, hold, deadline, latencies, errors, lock):
+    try:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                _request(alias, hold)
+            except Error:
+                with lock:
+                    errors["database"] += 1
+            else:
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        connections[alias].close()
+
+
+def run_connection_load(threads=32, duration=5.0, hold=0.01, alias=DEFAULT_DB_ALIAS, interval=0.05):
+    """
+    Run ``threads`` threads, standing in for server threads, each making
+    requests that hold a database connection for ``hold`` seconds, for
+    ``duration`` seconds. Samples the connections open on the server and the
+    pool's size meanwhile, to show how many connections the load takes.
+    """
+    count = server_connections(alias)
+    pool = connections[alias].pool if connections[alias].vendor == "postgresql" else None
+    latencies = []
+    errors = {"database": 0}
+    lock = threading.Lock()
+    peaks = {"server_connections": None, "pool_size": None, "requests_waiting": None}
+
+    def sample():
+        if count is not None:
+            current = count()
+            peaks["server_connections"] = max(peaks["server_connections"] or 0, current)
+        if pool is not None and not pool.closed:
+            stats = pool.get_stats()
+            peaks["pool_size"] = max(peaks["pool_size"] or 0, stats["pool_size"])
+            peaks["requests_waiting"] = max(peaks["requests_waiting"] or 0, stats["requests_waiting"])
+
+    baseline = count() if count is not None else None
+    deadline = time.monotonic() + duration
+    workers = [
+        threading.Thread(target=_worker, args=(alias, hold, deadline, latencies, errors, lock))
+        for _ in range(threads)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    try:
+        while any(worker.is_alive() for worker in workers):
+            sample()
+            time.sleep(interval)
+    finally:
+        for worker in workers:
+            worker.join()
+        if count is not None:
+            count.close()
+
+    return {
+        "alias": alias,
+        "threads": threads,
+        "duration": duration,
+        "hold_ms": hold * 1000,
+        "pool_max_size": pool.max_size if pool is not None else None,
+        "baseline_server_connections": baseline,
+        **{f"peak_{name}": value for name, value in peaks.items()},
+        **summarize_load(latencies, errors, time.perf_counter() - started),
+    }
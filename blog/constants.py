@@ -41,10 +41,40 @@ POST_ERROR_CREATING = "Error creating post"
 POST_ERROR_UPDATING = "Error updating post"
 POST_ERROR_DELETING = "Error deleting post"
 
+# Bulk post messages
+POST_BULK_INVALID_PAYLOAD = "Expected a list of items"
+POST_BULK_INVALID_ITEM = "Expected an object"
+POST_BULK_TOO_MANY_ITEMS = "A bulk request accepts at most {limit} items"
+POST_BULK_ID_REQUIRED = "This field is required."
+POST_BULK_TAGS_NOT_FOUND = "Tags not found: {tag_ids}"
+POST_BULK_CREATED_SUCCESS = "{count} posts created successfully"
+POST_BULK_UPDATED_SUCCESS = "{count} posts updated successfully"
+POST_BULK_MAX_ITEMS = 5000
+POST_BULK_BATCH_SIZE = 500
+
+# Post import messages
+POST_IMPORT_CHUNK_SIZE = 5000
+POST_IMPORT_BLOG_REQUIRED = "A blog title (blog) or id (blog_id) is required"
+POST_IMPORT_BLOG_NOT_FOUND = "Blog not found: {blog}"
+POST_IMPORT_TAGS_NOT_FOUND = "Tags not found: {tags}"
+POST_IMPORT_INVALID_DATE = "Invalid date: {value}"
+POST_IMPORT_INVALID_ROW = "Invalid row: {error}"
+
 # Tag-Post relationship messages
 TAG_NOT_FOUND = "Tag not found"
 TAG_ADDED_TO_POST_SUCCESS = "Tag added to post successfully"
 TAG_REMOVED_FROM_POST_SUCCESS = "Tag removed from post successfully"
 TAG_ERROR_ADDING_TO_POST = "Error adding tag to post"
 TAG_ERROR_REMOVING_FROM_POST = "Error removing tag from post"
+TAGS_SET_ON_POSTS_SUCCESS = "Post tags updated successfully"
+TAG_ERROR_SETTING_ON_POSTS = "Error updating post tags"
+
+# Keyset pagination orderings (must end with a unique column)
+POST_ORDERING = ("-published_at", "-id")
+POST_SEARCH_ORDERING = ("-rank", "-id")
+BLOG_ORDERING = ("-created_at", "-id")
 
+# Full-text search
+POST_SEARCH_CONFIG = "simple"
+POST_SEARCH_QUERY_REQUIRED = "Search query is required"
+POST_ERROR_SEARCHING = "Error searching posts"
@@ -0,0 +1,148 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from tag.models import Tag
+from .models import Blog, Post
+from .response_cache import bump_generation, model_label
+
+PostTag = Tag.posts.through
+
+_batch = ContextVar("post_counter_batch", default=None)
+
+
+class _CounterBatch:
+    def __init__(self):
+        self.blogs = Counter()
+        self.tags = Counter()
+        self.recount_tags = set()
+        self.released_posts = set()
+
+
+def _apply_deltas(model, deltas):
+    """One ``post_count = post_count + delta`` UPDATE per distinct delta."""
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(pk)
+    for delta, pks in by_delta.items():
+        model.objects.filter(pk__in=pks).update(post_count=F("post_count") + delta)
+    if by_delta:
+        bump_generation(model_label(model))
+
+
+def adjust_blog_counts(deltas):
+    """Add ``{blog_id: delta}`` to Blog.post_count, or queue it inside batched_counters()."""
+    batch = _batch.get()
+    if batch is not None:
+        batch.blogs.update(deltas)
+    else:
+        _apply_deltas(Blog, deltas)
+
+
+def adjust_tag_counts(deltas):
+    """Add ``{tag_id: delta}`` to Tag.post_count, or queue it inside batched_counters()."""
+    batch = _batch.get()
+    if batch is not None:
+        batch.tags.update(deltas)
+    else:
+        _apply_deltas(Tag, deltas)
+
+
+def recount_blogs(blog_ids=None):
+    """Recompute Blog.post_count from the posts table with one UPDATE."""
+    posts = (
+        Post.objects.filter(blog_id=OuterRef("pk"))
+        .order_by()
+        .values("blog_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    blogs = Blog.objects.all() if blog_ids is None else Blog.objects.filter(pk__in=blog_ids)
+    updated = blogs.update(
+        post_count=Coalesce(Subquery(posts, output_field=IntegerField()), Value(0))
+    )
+    bump_generation(model_label(Blog))
+    return updated
+
+
+def recount_tags(tag_ids=None):
+    """Recompute Tag.post_count from the post-tag links with one UPDATE."""
+    batch = _batch.get()
+    if batch is not None and tag_ids is not None:
+        batch.recount_tags.update(tag_ids)
+        return None
+    links = (
+        PostTag.objects.filter(tag_id=OuterRef("pk"))
+        .order_by()
+        .values("tag_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    tags = Tag.objects.all() if tag_ids is None else Tag.objects.filter(pk__in=tag_ids)
+    updated = tags.update(
+        post_count=Coalesce(Subquery(links, output_field=IntegerField()), Value(0))
+    )
+    bump_generation(model_label(Tag))
+    return updated
+
+
+def _release_links(links):
+    """Decrement each tag's counter by its rows in ``links`` with one UPDATE."""
+    per_tag = (
+        links.filter(tag_id=OuterRef("pk"))
+        .order_by()
+        .values("tag_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    updated = Tag.objects.filter(pk__in=links.values("tag_id")).update(
+        post_count=F("post_count") - Subquery(per_tag, output_field=IntegerField())
+    )
+    if updated:
+        bump_generation(model_label(Tag), model_label(PostTag))
+
+
+def release_post_tags(post_ids):
+    """
+    Decrement the counters of every tag linked to ``post_ids`` with one
+    UPDATE. Call it before the posts are deleted: their links disappear
+    without an m2m_changed signal.
+    """
+    post_ids = [pk for pk in post_ids if pk is not None]
+    batch = _batch.get()
+    if batch is not None:
+        post_ids = [pk for pk in post_ids if pk not in batch.released_posts]
+        batch.released_posts.update(post_ids)
+    if post_ids:
+        _release_links(PostTag.objects.filter(post_id__in=post_ids))
+
+
+def release_blog_post_tags(blog_ids):
+    """release_post_tags() for every post of ``blog_ids``, before the blogs are deleted."""
+    _release_links(PostTag.objects.filter(post__blog_id__in=blog_ids))
+
+
+@contextmanager
+def batched_counters():
+    """
+    Queue counter changes made inside the block (by signals or explicit calls)
+    and write them on exit with one UPDATE per distinct delta. Use it inside
+    the transaction of a bulk write.
+    """
+    if _batch.get() is not None:
+        yield _batch.get()
+        return
+    batch = _CounterBatch()
+    token = _batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _batch.reset(token)
+    _apply_deltas(Blog, batch.blogs)
+    _apply_deltas(Tag, batch.tags)
+    if batch.recount_tags:
+        recount_tags(batch.recount_tags)
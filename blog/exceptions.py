@@ -5,6 +5,8 @@ from rest_framework.views import exception_handler
 import logging
 from rest_framework.exceptions import ValidationError
 
+from Core.metrics import api_errors
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +28,16 @@ class AuthenticationError(BaseAPIException):
 
 
 def custom_exception_handler(exc, context):
+    response = _handle_exception(exc, context)
+    if response is not None:
+        code = response.data.get("code") if isinstance(response.data, dict) else None
+        if not isinstance(code, str):
+            code = "validation_error" if isinstance(exc, ValidationError) else "api_error"
+        api_errors.inc(code=code, status=response.status_code)
+    return response
+
+
+def _handle_exception(exc, context):
     response = exception_handler(exc, context)
 
     if isinstance(exc, ValidationError):
@@ -0,0 +1,50 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """
+    Resolves every submitted primary key with a single ``pk__in`` query and
+    reports all the missing ones together.
+    """
+
+    default_error_messages = {
+        "does_not_exist": _('Invalid pks "{pk_values}" - objects do not exist.'),
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        queryset = self.child_relation.get_queryset()
+        pk_field = queryset.model._meta.pk
+        pks = []
+        for item in data:
+            if isinstance(item, bool):
+                self.child_relation.fail("incorrect_type", data_type=type(item).__name__)
+            try:
+                pk = pk_field.to_python(item)
+            except DjangoValidationError:
+                self.child_relation.fail("incorrect_type", data_type=type(item).__name__)
+            if pk not in pks:
+                pks.append(pk)
+
+        objects = queryset.in_bulk(pks)
+        missing = [pk for pk in pks if pk not in objects]
+        if missing:
+            self.fail("does_not_exist", pk_values=", ".join(str(pk) for pk in missing))
+        return [objects[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
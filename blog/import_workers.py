@@ -0,0 +1,13 @@
+"""
+Set-up of the processes importing chunks for blog.importer. Kept apart from
+it, as it has to be importable before Django is set up.
+"""
+import django
+from django.db import connections
+
+
+def init_worker(databases):
+    django.setup()
+    # Use the parent's databases, e.g. the test databases under tests.
+    for alias, name in databases.items():
+        connections[alias].settings_dict["NAME"] = name
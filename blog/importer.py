@@ -0,0 +1,319 @@
+import csv
+import hashlib
+import json
+import multiprocessing
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from tag.autocomplete import prefix_index
+from tag.models import Tag
+from .constants import (
+    POST_BULK_BATCH_SIZE,
+    POST_IMPORT_BLOG_NOT_FOUND,
+    POST_IMPORT_BLOG_REQUIRED,
+    POST_IMPORT_CHUNK_SIZE,
+    POST_IMPORT_INVALID_DATE,
+    POST_IMPORT_INVALID_ROW,
+    POST_IMPORT_TAGS_NOT_FOUND,
+)
+from .counters import adjust_blog_counts, adjust_tag_counts, batched_counters
+from .export import LIST_SEPARATOR
+from .import_workers import init_worker
+from .models import Blog, ImportedChunk, Post
+from .response_cache import bump_generation, model_label
+from .search import index_posts
+from .seed import explicit_timestamps
+
+PostTag = Tag.posts.through
+
+FORMATS = ("csv", "jsonl")
+
+
+def read_rows(path, format=None):
+    """
+    Yield ``(line, row)`` for every row of a CSV or JSONL file (the formats
+    of export_data), reading it as it goes. JSONL rows are left as text, to
+    be parsed with the rest of their chunk.
+    """
+    format = format or ("jsonl" if Path(path).suffix in (".jsonl", ".ndjson") else "csv")
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}. Available: {', '.join(FORMATS)}.")
+    with open(path, newline="", encoding="utf-8") as source:
+        if format == "csv":
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line, text in enumerate(source, 1):
+                if text.strip():
+                    yield line, text
+
+
+def _parse(row):
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except ValueError as e:
+            raise ValidationError({"non_field_errors": [POST_IMPORT_INVALID_ROW.format(error=e)]})
+    if not isinstance(row, dict):
+        raise ValidationError({"non_field_errors": [POST_IMPORT_INVALID_ROW.format(error=row)]})
+    return row
+
+
+def _datetime(value):
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = parse_datetime(str(value))
+        except ValueError:
+            parsed = None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _tag_names(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(LIST_SEPARATOR)
+    return list(dict.fromkeys(str(name).strip() for name in value if str(name).strip()))
+
+
+def build_post(row, now=None):
+    """
+    An unsaved Post from one input row, validated field by field without
+    touching the database, with the natural key of its blog (``("title",
+    ...)`` or ``("id", ...)``) and its tag names.
+    """
+    data = _parse(row)
+    errors = {}
+    post = Post(title=str(data.get("title") or ""), content=str(data.get("content") or ""))
+
+    now = now or timezone.now()
+    for name in ("published_at", "updated_at"):
+        value = data.get(name)
+        if value in (None, ""):
+            setattr(post, name, post.published_at if name == "updated_at" else now)
+            continue
+        parsed = _datetime(value)
+        if parsed is None:
+            errors[name] = [POST_IMPORT_INVALID_DATE.format(value=value)]
+        setattr(post, name, parsed)
+
+    blog_key = None
+    if data.get("blog"):
+        blog_key = ("title", str(data["blog"]))
+    elif data.get("blog_id") not in (None, ""):
+        try:
+            blog_key = ("id", int(data["blog_id"]))
+        except (TypeError, ValueError):
+            errors["blog_id"] = [POST_IMPORT_BLOG_NOT_FOUND.format(blog=data["blog_id"])]
+    else:
+        errors["blog"] = [POST_IMPORT_BLOG_REQUIRED]
+
+    try:
+        post.clean_fields(exclude=["blog", "published_at", "updated_at", "search_vector"])
+    except ValidationError as e:
+        errors.update(e.message_dict)
+    if errors:
+        raise ValidationError(errors)
+    return post, blog_key, _tag_names(data.get("tags"))
+
+
+def _error(line, error):
+    return {"line": line, "errors": error.message_dict}
+
+
+def _blog_ids(keys):
+    """Resolve blog natural keys with one query per kind of key."""
+    titles = {value for kind, value in keys if kind == "title"}
+    ids = {value for kind, value in keys if kind == "id"}
+    found = {}
+    if titles:
+        rows = Blog.objects.filter(title__in=titles).values_list("title", "pk")
+        found.update({("title", title): pk for title, pk in rows})
+    if ids:
+        rows = Blog.objects.filter(pk__in=ids).values_list("pk", flat=True)
+        found.update({("id", pk): pk for pk in rows})
+    return found
+
+
+def _tag_ids(names, create):
+    """Resolve tag names with one query; with ``create``, insert the missing valid ones."""
+    found = dict(Tag.objects.filter(name__in=names).values_list("name", "pk"))
+    missing = [name for name in sorted(names) if name not in found]
+    if create and missing:
+        new = []
+        for name in missing:
+            tag = Tag(name=name)
+            try:
+                tag.clean_fields()
+            except ValidationError:
+                continue
+            new.append(tag)
+        # Another worker may create the same tags meanwhile.
+        Tag.objects.bulk_create(new, batch_size=POST_BULK_BATCH_SIZE, ignore_conflicts=True)
+        if new:
+            # bulk_create sends no post_save: what tag.signals would do.
+            prefix_index.invalidate()
+            bump_generation(model_label(Tag))
+        created = Tag.objects.filter(name__in=[tag.name for tag in new])
+        found.update(created.values_list("name", "pk"))
+    return found
+
+
+def import_chunk(job, index, rows, create_tags=False, batch_size=POST_BULK_BATCH_SIZE):
+    """
+    Import one chunk of ``(line, row)`` in one transaction: validate every
+    row, resolve blogs and tags with batched lookups, then write the posts
+    with bulk_create(), their tags with a single through-table insert, the
+    counters and the search index. The chunk is recorded as ``(job,
+    index)`` in the same transaction; a chunk already recorded is skipped.
+    Invalid rows are reported and left out.
+    """
+    result = {"index": index, "rows": len(rows), "imported": 0, "errors": [], "skipped": False}
+    now = timezone.now()
+    parsed = []
+    for line, row in rows:
+        try:
+            parsed.append((line, *build_post(row, now)))
+        except ValidationError as e:
+            result["errors"].append(_error(line, e))
+
+    try:
+        with transaction.atomic(), batched_counters():
+            blogs = _blog_ids({key for _, _, key, _ in parsed})
+            tags = _tag_ids({name for *_, names in parsed for name in names}, create_tags)
+
+            pending = []
+            for line, post, blog_key, names in parsed:
+                missing = [name for name in names if name not in tags]
+                if blog_key not in blogs:
+                    error = {"blog": [POST_IMPORT_BLOG_NOT_FOUND.format(blog=blog_key[1])]}
+                    result["errors"].append(_error(line, ValidationError(error)))
+                elif missing:
+                    error = {"tags": [POST_IMPORT_TAGS_NOT_FOUND.format(tags=", ".join(missing))]}
+                    result["errors"].append(_error(line, ValidationError(error)))
+                else:
+                    post.blog_id = blogs[blog_key]
+                    pending.append((post, [tags[name] for name in names]))
+
+            posts = [post for post, _ in pending]
+            with explicit_timestamps(Post, "published_at", "updated_at"):
+                Post.objects.bulk_create(posts, batch_size=batch_size)
+            links = [
+                PostTag(post_id=post.pk, tag_id=tag_id) for post, tag_ids in pending
+                for tag_id in tag_ids
+            ]
+            PostTag.objects.bulk_create(links, batch_size=batch_size)
+            index_posts(posts)
+            adjust_blog_counts(Counter(post.blog_id for post in posts))
+            adjust_tag_counts(Counter(link.tag_id for link in links))
+            bump_generation(model_label(Post), model_label(PostTag))
+
+            ImportedChunk.objects.create(job=job, index=index, rows=len(rows), imported=len(posts))
+    except IntegrityError:
+        if not ImportedChunk.objects.filter(job=job, index=index).exists():
+            raise
+        return {**result, "errors": [], "skipped": True}
+
+    result["imported"] = len(posts)
+    result["errors"].sort(key=lambda error: error["line"])
+    return result
+
+
+def default_job(path, chunk_size):
+    """
+    A job name tied to the file (path, size and modification time) and the
+    chunking, so that an edited file is imported again rather than resumed.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    digest = hashlib.sha256(
+        f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{chunk_size}".encode()
+    ).hexdigest()
+    return f"{path.name[:200]}:{digest[:16]}"
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    index = 0
+    while chunk := list(islice(rows, size)):
+        yield index, chunk
+        index += 1
+
+
+def _import_in_processes(job, chunks, workers, create_tags, record):
+    databases = {alias: connections[alias].settings_dict["NAME"] for alias in connections}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(databases,),
+    ) as executor:
+        running = set()
+        for index, chunk in chunks:
+            running.add(executor.submit(import_chunk, job, index, chunk, create_tags))
+            # Read ahead at most two chunks per worker.
+            while len(running) >= workers * 2:
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(future.result())
+        for future in wait(running).done:
+            record(future.result())
+
+
+def import_posts(
+    path,
+    format=None,
+    job=None,
+    chunk_size=POST_IMPORT_CHUNK_SIZE,
+    workers=1,
+    create_tags=False,
+    on_chunk=None,
+):
+    """
+    Stream posts from a CSV or JSONL file into the database in chunks of
+    ``chunk_size`` rows (see import_chunk), in this process or in
+    ``workers`` processes. Rows name their blog by title (``blog``) or id
+    (``blog_id``) and their tags by name (``tags``). Chunks already imported
+    under ``job`` are skipped, so running it again after an interruption
+    resumes the import. ``on_chunk`` is called with each chunk's result.
+    """
+    if workers > 1 and connections["default"].vendor == "sqlite":
+        # SQLite takes one writer at a time: the workers would only lock each other out.
+        raise ValueError("Importing with several workers needs PostgreSQL; use workers=1 on SQLite.")
+    job = job or default_job(path, chunk_size)
+    done = set(ImportedChunk.objects.filter(job=job).values_list("index", flat=True))
+    chunks = (
+        (index, chunk)
+        for index, chunk in _chunks(read_rows(path, format), chunk_size)
+        if index not in done
+    )
+    summary = {"job": job, "chunks": 0, "resumed_after": len(done), "rows": 0, "imported": 0,
+               "errors": 0}
+
+    def record(result):
+        summary["chunks"] += 1
+        summary["rows"] += result["rows"]
+        summary["imported"] += result["imported"]
+        summary["errors"] += len(result["errors"])
+        if on_chunk:
+            on_chunk(result)
+
+    if workers > 1:
+        _import_in_processes(job, chunks, workers, create_tags, record)
+    else:
+        for index, chunk in chunks:
+            record(import_chunk(job, index, chunk, create_tags))
+    return summary
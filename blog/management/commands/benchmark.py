@@ -0,0 +1,75 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.benchmark import DEFAULT_SIZES, compare_results, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Grow a seeded dataset to each size and measure latency percentiles, "
+        "throughput and queries per request of the public REST endpoints and "
+        "GraphQL root fields. Writes to the configured database: use a "
+        "dedicated benchmark database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+            help="Dataset sizes, in posts.",
+        )
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument(
+            "--warm-cache", action="store_true",
+            help="Keep the response cache between requests (measures cache hits).",
+        )
+        parser.add_argument(
+            "--only", nargs="+",
+            help="Scenario name prefixes to run, e.g. rest:posts graphql:.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--compare", help="Baseline results file to report regressions against.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.2,
+            help="Allowed p95 growth against the baseline, as a fraction.",
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            with open(options["compare"]) as baseline_file:
+                baseline = json.load(baseline_file)
+
+        results = run_benchmarks(
+            sizes=options["sizes"],
+            requests=options["requests"],
+            warmup=options["warmup"],
+            page_size=options["page_size"],
+            warm_cache=options["warm_cache"],
+            only=options["only"],
+            seed_options={"seed": options["seed"]},
+            progress=lambda size, name: self.stderr.write(f"{size} {name}"),
+        )
+
+        for size, dataset in results["datasets"].items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{size} posts"))
+            for name, summary in dataset["scenarios"].items():
+                latency = summary["latency_ms"]
+                self.stdout.write(
+                    f"  {name:<22} p50 {latency['p50']:>8} ms  p95 {latency['p95']:>8} ms  "
+                    f"p99 {latency['p99']:>8} ms  {summary['throughput_rps']:>8} req/s  "
+                    f"{summary['queries']['max']:>3} queries  {summary['errors']} errors"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
+
+        if baseline is not None:
+            regressions = compare_results(baseline, results, options["tolerance"])
+            if regressions:
+                raise CommandError("Regressions:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.server_benchmark import DEFAULT_PATHS, benchmark_servers
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the project with waitress (WSGI) and uvicorn (ASGI) in turn and "
+        "load each one with many concurrent keep-alive connections. Uses the "
+        "configured database: seed it first (seed_posts)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--servers", nargs="+", default=["waitress", "uvicorn"],
+            choices=["waitress", "uvicorn"],
+        )
+        parser.add_argument("--connections", type=int, default=1000)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per server.")
+        parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of warm-up per server.")
+        parser.add_argument("--paths", nargs="+", default=list(DEFAULT_PATHS))
+        parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+        parser.add_argument("--threads", type=int, default=8, help="waitress threads.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            results = benchmark_servers(
+                servers=options["servers"],
+                paths=options["paths"],
+                connections=options["connections"],
+                duration=options["duration"],
+                warmup=options["warmup"],
+                workers=options["workers"],
+                threads=options["threads"],
+                progress=lambda server: self.stderr.write(f"Benchmarking {server}..."),
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{results['connections']} connections, {results['duration']}s"
+        ))
+        for server, summary in results["servers"].items():
+            latency = summary["latency_ms"] or {}
+            errors = summary["errors"]
+            self.stdout.write(
+                f"  {server:<9} {summary['throughput_rps']:>9} req/s  "
+                f"p50 {latency.get('p50', '-'):>8} ms  p95 {latency.get('p95', '-'):>8} ms  "
+                f"p99 {latency.get('p99', '-'):>8} ms  "
+                f"{errors['connection']} connection errors  {errors['status']} error responses"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
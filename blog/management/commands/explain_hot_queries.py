@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.query_plans import compare_plans
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the plan and timings of the hot read queries with the previous "
+        "indexes and with the current ones. Seed data first with seed_posts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--json", dest="output", help="Also write the results to this file.")
+
+    def handle(self, *args, **options):
+        results = compare_plans(repeat=options["repeat"], page_size=options["page_size"])
+        for name, phases in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for phase in ("before", "after"):
+                result = phases[phase]
+                self.stdout.write(
+                    f"  {phase}: median {result['median_ms']} ms, max {result['max_ms']} ms"
+                )
+                for line in result["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump({"vendor": connection.vendor, "queries": results}, output, indent=2)
@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.export import EXPORT_CHUNK_SIZE, EXPORTS, FORMATS, export, parse_columns
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream blogs, posts or tags to CSV, JSONL or columnar JSONL in constant "
+        "memory. Posts leave out content unless --columns asks for it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=list(EXPORTS))
+        parser.add_argument("--format", default="csv", choices=list(FORMATS))
+        parser.add_argument(
+            "--columns",
+            help="Comma-separated columns (default: all but the large ones). "
+            + "; ".join(f"{name}: {', '.join(spec.available)}" for name, spec in EXPORTS.items()),
+        )
+        parser.add_argument("--output", default="-", help="File to write (default: stdout).")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--database", default=DEFAULT_DB_ALIAS,
+            help="Database alias to read from, e.g. a replica.",
+        )
+
+    def handle(self, *args, **options):
+        spec = EXPORTS[options["name"]]
+        queryset = spec.model._default_manager.using(options["database"])
+        try:
+            text, _, _ = export(
+                options["name"],
+                options["format"],
+                parse_columns(options["columns"]),
+                queryset,
+                options["chunk_size"],
+            )
+            if options["output"] == "-":
+                for chunk in text:
+                    sys.stdout.write(chunk)
+                return
+            with open(options["output"], "w", newline="", encoding="utf-8") as output:
+                for chunk in text:
+                    output.write(chunk)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stderr.write(self.style.SUCCESS(f"Exported {options['name']} to {options['output']}."))
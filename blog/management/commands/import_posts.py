@@ -0,0 +1,80 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.constants import POST_IMPORT_CHUNK_SIZE
+from blog.importer import FORMATS, default_job, import_posts
+from blog.models import ImportedChunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Import posts from a CSV or JSONL file (as written by export_data) in "
+        "chunks, with batched blog and tag lookups and bulk inserts. Rows name "
+        "their blog by title (blog) or id (blog_id) and their tags by name "
+        "(tags, |-separated in CSV). Run it again to resume an interrupted import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, help="Default: from the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=POST_IMPORT_CHUNK_SIZE)
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Processes importing chunks in parallel (use with PostgreSQL).",
+        )
+        parser.add_argument(
+            "--create-tags", action="store_true", help="Create the tags that do not exist."
+        )
+        parser.add_argument(
+            "--job",
+            help="Checkpoint name. Default: derived from the file and the chunk size.",
+        )
+        parser.add_argument(
+            "--restart", action="store_true",
+            help="Forget the job's checkpoints and import every chunk again.",
+        )
+        parser.add_argument("--errors", help="Write the rejected rows as JSONL to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            job = options["job"] or default_job(options["path"], options["chunk_size"])
+        except OSError as e:
+            raise CommandError(str(e))
+        if options["restart"]:
+            ImportedChunk.objects.filter(job=job).delete()
+
+        errors = open(options["errors"], "w", encoding="utf-8") if options["errors"] else None
+
+        def on_chunk(result):
+            if result["skipped"]:
+                self.stderr.write(f"Chunk {result['index']}: already imported.")
+                return
+            self.stderr.write(
+                f"Chunk {result['index']}: {result['imported']}/{result['rows']} rows imported."
+            )
+            if errors:
+                for error in result["errors"]:
+                    errors.write(json.dumps(error) + "\n")
+
+        try:
+            summary = import_posts(
+                options["path"],
+                format=options["format"],
+                job=job,
+                chunk_size=options["chunk_size"],
+                workers=options["workers"],
+                create_tags=options["create_tags"],
+                on_chunk=on_chunk,
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        finally:
+            if errors:
+                errors.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Job {summary['job']}: {summary['imported']} of {summary['rows']} rows imported "
+            f"in {summary['chunks']} chunks, {summary['errors']} rejected"
+            + (f", resumed after {summary['resumed_after']} chunks." if summary["resumed_after"] else ".")
+        ))
@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.connection_load import run_connection_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Make many threads use the database at once, as server threads would, and "
+        "report the peak number of connections open on the server (PostgreSQL) "
+        "and in the connection pool. Compare with DATABASE_POOL=0."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds.")
+        parser.add_argument(
+            "--hold-ms", type=float, default=10.0,
+            help="How long each request holds its connection.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        results = run_connection_load(
+            threads=options["threads"],
+            duration=options["duration"],
+            hold=options["hold_ms"] / 1000,
+            alias=options["database"],
+        )
+        latency = results["latency_ms"] or {}
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{results['threads']} threads, {results['duration']}s, "
+            f"{results['hold_ms']} ms per request on {results['alias']}"
+        ))
+        self.stdout.write(
+            f"  {results['throughput_rps']} req/s  p50 {latency.get('p50', '-')} ms  "
+            f"p99 {latency.get('p99', '-')} ms  {results['errors']['database']} database errors"
+        )
+        self.stdout.write(
+            f"  server connections: {results['baseline_server_connections']} before, "
+            f"{results['peak_server_connections']} at peak"
+        )
+        self.stdout.write(
+            f"  pool: max_size {results['pool_max_size']}, peak size {results['peak_pool_size']}, "
+            f"peak waiting {results['peak_requests_waiting']}"
+        )
+
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2)
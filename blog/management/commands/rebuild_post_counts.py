@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.counters import recount_blogs, recount_tags
+
+
+class Command(BaseCommand):
+    help = "Recompute Blog.post_count and Tag.post_count from the posts and post-tag links."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            blogs = recount_blogs()
+            tags = recount_tags()
+        self.stdout.write(
+            self.style.SUCCESS(f"Recounted posts for {blogs} blogs and {tags} tags.")
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.seed import seed_dataset
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert a deterministic dataset of blogs, tags and posts for benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("posts", type=int, help="Number of posts to create.")
+        parser.add_argument("--blogs", type=int, help="Defaults to one per 100 posts.")
+        parser.add_argument("--tags", type=int, help="Defaults to one per 50 posts (max 5000).")
+        parser.add_argument("--tags-per-post", type=int, default=3)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--search-index", action="store_true", help="Also fill the full-text index."
+        )
+
+    def handle(self, *args, **options):
+        counts = seed_dataset(
+            options["posts"],
+            blogs=options["blogs"],
+            tags=options["tags"],
+            tags_per_post=options["tags_per_post"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            search_index=options["search_index"],
+        )
+        summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Seeded {summary}."))
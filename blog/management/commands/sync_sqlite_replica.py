@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from Core.db_router import copy_sqlite_database, replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary database into the SQLite replicas (SQLITE_REPLICA), "
+        "standing in for replication when testing read-replica routing locally."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("aliases", nargs="*", help="Replica aliases (default: all).")
+
+    def handle(self, *args, **options):
+        aliases = options["aliases"] or replica_aliases()
+        if not aliases:
+            raise CommandError("No replica configured: set SQLITE_REPLICA to a file name.")
+        for alias in aliases:
+            try:
+                copy_sqlite_database(DEFAULT_DB_ALIAS, alias)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Copied {DEFAULT_DB_ALIAS} into {alias}."))
@@ -0,0 +1,61 @@
+# Generated by Django 5.2 on 2026-10-17 21:53
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+FTS_TABLE = "blog_post_fts"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX blog_post_search_vector_gin ON blog_post "
+            "USING GIN (search_vector)"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "title, body, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON blog_post BEGIN "
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS blog_post_search_vector_gin")
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def index_existing_posts(apps, schema_editor):
+    from blog.search import index_rows
+
+    Post = apps.get_model("blog", "Post")
+    alias = schema_editor.connection.alias
+    rows = Post.objects.using(alias).values_list("id", "title", "content")
+    index_rows(rows.iterator(), using=alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0009_alter_blog_title_alter_blog_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(index_existing_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Same expression indexes as tag.0003 for Blog.title lookups.
+INDEXES = {
+    "blog_blog_title_upper_trgm": "USING GIN (UPPER(title) gin_trgm_ops)",
+    "blog_blog_title_upper_prefix": "(UPPER(title) text_pattern_ops)",
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, definition in INDEXES.items():
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON blog_blog {definition}")
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0010_post_search_vector"),
+        # Creates the pg_trgm extension.
+        ("tag", "0003_tag_name_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-17 22:35
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_posts(apps, schema_editor):
+    Blog = apps.get_model("blog", "Blog")
+    Post = apps.get_model("blog", "Post")
+    posts = (
+        Post.objects.filter(blog_id=OuterRef("pk"))
+        .order_by()
+        .values("blog_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Blog.objects.using(schema_editor.connection.alias).update(
+        post_count=Coalesce(Subquery(posts, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_blog_title_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
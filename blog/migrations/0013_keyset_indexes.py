@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-17 22:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Same expression index as tag.0003 for postsByTitle (title__icontains).
+TITLE_INDEX = "blog_post_title_upper_trgm"
+
+
+def create_title_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {TITLE_INDEX} ON blog_post "
+        "USING GIN (UPPER(title) gin_trgm_ops)"
+    )
+
+
+def drop_title_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {TITLE_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_blog_post_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-created_at', '-id'], name='blog_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-published_at', '-id'], name='post_published_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['blog', '-published_at', '-id'], name='post_blog_published_id_idx'),
+        ),
+        # The composite index above leads with blog_id, so the FK's own
+        # index is dropped only once it exists.
+        migrations.AlterField(
+            model_name='post',
+            name='blog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='posts', to='blog.blog'),
+        ),
+        migrations.RunPython(create_title_index, drop_title_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-17 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=255)),
+                ('index', models.PositiveIntegerField()),
+                ('rows', models.PositiveIntegerField()),
+                ('imported', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job', 'index'), name='imported_chunk_job_index_uniq')],
+            },
+        ),
+    ]
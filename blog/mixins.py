@@ -1,9 +1,23 @@
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
+from django.urls import path
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.utils.encoders import JSONEncoder
+from .prefetch import build_plan, apply_plan
+from .conditional import make_etag, queryset_validator
+from .export import export, parse_columns
+from .response_cache import CachedResponse, generation_time, get_generations
+from .utils import get_or_create_user_blog
 from django.utils.translation import gettext_lazy as _
 from .permissions import can_edit_post, can_add_post
 from blog.exceptions import AuthenticationError
 from rest_framework import permissions
-from .models import Blog
+from Core.db_router import replica_may_lag
 
 
 class PostReadonlyFieldsMixin:
@@ -25,6 +39,200 @@ class PublicReadOnlyMixin:
         return [permission() for permission in permission_classes]
 
 
+class PublicResponseCacheMixin:
+    """
+    Caches anonymous list/retrieve responses, keyed by URL, query params and
+    the generation of every model in ``cache_models``, and answers matching
+    ``If-None-Match``/``If-Modified-Since`` with 304 before touching the
+    database. Authenticated requests may see a different queryset and are
+    never cached.
+    """
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def is_response_cacheable(self, request):
+        return (
+            request.method in ("GET", "HEAD")
+            and request.query_params.get("stream") != "1"
+            and not request.user.is_authenticated
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.cache_models or not self.is_response_cacheable(request):
+            return handler(request, *args, **kwargs)
+
+        self.serving_cached_response = True
+        cached = CachedResponse(request, self.cache_models)
+        last_modified = int(cached.last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=cached.etag, last_modified=last_modified
+        )
+        if response is None:
+            data = cached.get()
+            if data is not None:
+                response = Response(data)
+            else:
+                response = handler(request, *args, **kwargs)
+                if response.status_code != 200 or not isinstance(response, Response):
+                    return response
+                if replica_may_lag(cached.last_modified):
+                    # Possibly stale: neither cached nor given validators.
+                    return response
+                cached.set(response.data)
+        return self.with_cache_validators(response, cached, last_modified)
+
+    async def acached_response(self, request):
+        """
+        The cached response (or 304) for ``request``, read through the cache's
+        async API, or None when it has to be built.
+        """
+        if not self.cache_models or not self.is_response_cacheable(request):
+            return None
+
+        cached = await CachedResponse.acreate(request, self.cache_models)
+        last_modified = int(cached.last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=cached.etag, last_modified=last_modified
+        )
+        if response is None:
+            data = await cached.aget()
+            if data is None:
+                return None
+            response = Response(data)
+        return self.with_cache_validators(response, cached, last_modified)
+
+    def with_cache_validators(self, response, cached, last_modified):
+        response["ETag"] = cached.etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+
+class AsyncReadActionsMixin:
+    """
+    ``alist``/``aretrieve`` for Core.async_views.AsyncViewSetMixin. Response
+    cache hits and the 304s they answer are served on the event loop. A cache
+    miss is a thread offload, not the async ORM: the sync action
+    (conditional GET, keyset page, serializer prefetch plan) runs in one
+    worker thread. Django's async ORM would run each of those queries
+    through sync_to_async anyway, one thread hop per query.
+    """
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.aread(self.list, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.aread(self.retrieve, request, *args, **kwargs)
+
+    async def aread(self, handler, request, *args, **kwargs):
+        response = await self.acached_response(request)
+        if response is None:
+            response = await sync_to_async(handler)(request, *args, **kwargs)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Answers ``If-None-Match``/``If-Modified-Since`` on list/retrieve from one
+    MAX(updated_at)/COUNT aggregate over the filtered queryset, before any
+    row is loaded or serialized. ``validator_models`` names related models
+    whose changes do not move ``updated_at``; their generations are folded
+    into the validator. Requests served by PublicResponseCacheMixin already
+    carry validators and are skipped.
+    """
+
+    validator_models = ()
+    serving_cached_response = False
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(super().list, queryset, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, ValidationError):
+            # A malformed lookup (e.g. a non-numeric pk): let retrieve answer 404.
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(super().retrieve, queryset, request, *args, **kwargs)
+
+    def conditional_response(self, handler, queryset, request, *args, **kwargs):
+        if (
+            self.serving_cached_response
+            or request.method not in ("GET", "HEAD")
+            or request.query_params.get("stream") == "1"
+        ):
+            return handler(request, *args, **kwargs)
+
+        last_modified, count = queryset_validator(queryset)
+        if not count:
+            return handler(request, *args, **kwargs)
+        generations = get_generations(self.validator_models) if self.validator_models else ()
+        if generations:
+            last_modified = max(last_modified, generation_time(generations))
+        etag = make_etag(
+            request.get_full_path(), request.user.pk, last_modified, count, generations
+        )
+        last_modified = int(last_modified.timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+
+class StreamingExportAdminMixin:
+    """
+    A streaming download of the changelist's rows, filters included, for
+    ImportExportModelAdmin classes: ``stream-export/?format=csv|jsonl|columnar
+    &columns=id,title``. Rows come from a server-side iterator in chunks,
+    so the export never holds the whole table in memory.
+    """
+
+    export_name = None
+    import_export_change_list_template = "admin/stream_export_change_list.html"
+
+    def get_urls(self):
+        name = f"{self.opts.app_label}_{self.opts.model_name}_stream_export"
+        view = self.admin_site.admin_view(self.stream_export_view)
+        return [path("stream-export/", view, name=name), *super().get_urls()]
+
+    def stream_export_view(self, request):
+        if not self.has_export_permission(request):
+            return HttpResponseForbidden()
+        params = request.GET.copy()
+        format = params.pop("format", ["csv"])[-1]
+        columns = parse_columns(params.pop("columns", [""])[-1])
+        # The remaining parameters are the changelist's filters and search.
+        request.GET = params
+        request.META["QUERY_STRING"] = params.urlencode()
+        queryset = self.get_changelist_instance(request).get_queryset(request)
+        try:
+            text, content_type, filename = export(self.export_name, format, columns, queryset)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        response = StreamingHttpResponse(text, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
 class LimitBlogChoicesToOwnerMixin:
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
@@ -66,10 +274,13 @@ class PostOwnerQuerysetAdminMixin:
 
 
 class PostOwnerQuerysetViewSetMixin:
+    # Writes look the post up among all of them, so that PostEditorMixin
+    # refuses someone else's post with 403 instead of hiding it with 404.
+    unscoped_actions = ("update", "partial_update", "destroy")
 
     def get_queryset(self):
         qs = super().get_queryset()
-        if not self.request.user.is_authenticated:
+        if not self.request.user.is_authenticated or self.action in self.unscoped_actions:
             return qs
         if not self.request.user.is_superuser:
             return qs.filter(blog__user=self.request.user)
@@ -96,15 +307,7 @@ class PostEditorMixin:
         if not self.request.user.is_authenticated:
             raise AuthenticationError(_("Authentication required to create posts."))
 
-        if not hasattr(self.request.user, "blog"):
-            blog = Blog.objects.create(
-                title=f"Blog de {self.request.user.username}",
-                description="Blog personal",
-                user=self.request.user,
-            )
-            serializer.save(blog=blog)
-        else:
-            serializer.save(blog=self.request.user.blog)
+        serializer.save(blog=get_or_create_user_blog(self.request.user))
 
     def perform_update(self, serializer):
         if not self.request.user.is_authenticated:
@@ -122,3 +325,64 @@ class PostEditorMixin:
             raise PermissionDenied(_("You are not allowed to delete this post."))
         instance.delete()
 
+
+class StreamingListMixin:
+    """
+    ``?stream=1`` on a list action streams every row as NDJSON from a
+    server-side iterator instead of building one paginated response.
+    """
+
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("stream") != "1":
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = getattr(self, "keyset_ordering", None)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        response = StreamingHttpResponse(
+            self.stream_rows(queryset), content_type="application/x-ndjson"
+        )
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def stream_rows(self, queryset):
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        encoder = JSONEncoder()
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while True:
+            chunk = list(islice(rows, self.stream_chunk_size))
+            if not chunk:
+                break
+            data = serializer_class(chunk, many=True, context=context).data
+            yield "".join(encoder.encode(item) + "\n" for item in data)
+
+
+class SerializerPrefetchMixin:
+    """
+    Applies the select_related/prefetch_related/only() plan derived from the
+    serializer's declared fields to read actions, so nested fields never
+    fall back to one query per row.
+    """
+
+    def get_query_plan(self):
+        # Prefetch objects are mutated when nested, so plans are not shared.
+        serializer_class = self.get_serializer_class()
+        serializer = serializer_class(context=self.get_serializer_context())
+        return build_plan(serializer, serializer_class.Meta.model)
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.request is None or self.request.method not in permissions.SAFE_METHODS:
+            return qs
+        columns = {field.name for field in qs.model._meta.concrete_fields}
+        ordering_fields = [
+            key.lstrip("-")
+            for key in getattr(self, "keyset_ordering", ())
+            if key.lstrip("-") in columns
+        ]
+        return apply_plan(qs, self.get_query_plan(), extra_fields=ordering_fields)
+
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from tinymce.models import HTMLField
 from django.contrib.auth.models import User
@@ -24,12 +25,20 @@ class Blog(models.Model):
     description = HTMLField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by blog.counters.
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # BLOG_ORDERING keyset pages and the admin changelist.
+            models.Index(fields=["-created_at", "-id"], name="blog_created_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
     def is_owner(self, user: User) -> bool:
-        return user == self.user
+        return user is not None and self.user_id == user.pk
 
     @staticmethod
     def filter_blogs_by_user(queryset, user_id):
@@ -42,15 +51,25 @@ class Blog(models.Model):
         return queryset.filter(user_id=user_id_int)
 
     @staticmethod
-    def filter_blogs_by_title(queryset, title):
+    def filter_blogs_by_title(queryset, title, prefix=False):
         if title is None:
             return queryset.none()
+        if prefix:
+            return queryset.filter(title__istartswith=title)
         return queryset.filter(title__icontains=title)
 
 
 
+class PostManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
+
+
 class Post(models.Model):
-    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name="posts")
+    # Indexed by post_blog_published_id_idx, whose leading column is blog_id.
+    blog = models.ForeignKey(
+        Blog, on_delete=models.CASCADE, related_name="posts", db_index=False
+    )
     title = models.CharField(
         max_length=200,
         validators=[
@@ -63,6 +82,20 @@ class Post(models.Model):
     content = HTMLField()
     published_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by blog.search; only populated on PostgreSQL.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PostManager()
+
+    class Meta:
+        indexes = [
+            # POST_ORDERING keyset pages, unfiltered and per blog (blog_id
+            # filters, owner querysets and the admin blog filter).
+            models.Index(fields=["-published_at", "-id"], name="post_published_id_idx"),
+            models.Index(
+                fields=["blog", "-published_at", "-id"], name="post_blog_published_id_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.blog.title}"
@@ -79,4 +112,32 @@ class Post(models.Model):
             return queryset.none()
         return queryset.filter(blog_id=blog_id_int)
 
+    @staticmethod
+    def filter_posts_by_title(queryset, title):
+        # Substring match on UPPER(title), served by the blog_post_title_upper_trgm
+        # trigram index on PostgreSQL; searchPosts is the word search.
+        if title is None:
+            return queryset.none()
+        return queryset.filter(title__icontains=title)
+
+
+class ImportedChunk(models.Model):
+    """
+    A chunk of input rows written by blog.importer, recorded in the same
+    transaction as its posts, so an interrupted import resumes after the
+    last chunk that committed and never writes a chunk twice.
+    """
 
+    job = models.CharField(max_length=255)
+    index = models.PositiveIntegerField()
+    rows = models.PositiveIntegerField()
+    imported = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["job", "index"], name="imported_chunk_job_index_uniq")
+        ]
+
+    def __str__(self):
+        return f"{self.job} #{self.index}"
@@ -0,0 +1,102 @@
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from Core.pagination import encode_cursor, keyset_page
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking on ``view.keyset_ordering`` so that every page
+    costs one index range scan. ``after``/``before`` carry opaque cursors.
+    """
+
+    ordering = ("-id",)
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    after_query_param = "after"
+    before_query_param = "before"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = getattr(view, "keyset_ordering", self.ordering)
+        page_size = self.get_page_size(request)
+        after = request.query_params.get(self.after_query_param)
+        before = request.query_params.get(self.before_query_param)
+
+        page, self.has_previous, self.has_next = keyset_page(
+            queryset,
+            self.ordering,
+            first=None if before else page_size,
+            last=page_size if before else None,
+            after=after,
+            before=before,
+            max_limit=self.max_page_size,
+        )
+        self.page = page
+        return page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.before_query_param
+        )
+        cursor = encode_cursor(self.page[-1], self.ordering)
+        return replace_query_param(url, self.after_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.after_query_param
+        )
+        cursor = encode_cursor(self.page[0], self.ordering)
+        return replace_query_param(url, self.before_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": description,
+                "schema": {"type": schema_type},
+            }
+            for name, description, schema_type in (
+                (self.after_query_param, "Cursor of the last item seen", "string"),
+                (self.before_query_param, "Cursor of the first item seen", "string"),
+                (self.page_size_query_param, "Number of results per page", "integer"),
+            )
+        ]
@@ -0,0 +1,98 @@
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+QueryPlan = namedtuple("QueryPlan", ["select_related", "prefetch_related", "only"])
+
+
+def _is_many(field):
+    return isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField))
+
+
+def _child(field):
+    if isinstance(field, serializers.ListSerializer):
+        return field.child
+    if isinstance(field, serializers.ManyRelatedField):
+        return field.child_relation
+    return field
+
+
+def build_plan(serializer, model, prefix=""):
+    """
+    Derive the select_related/prefetch_related/only() calls needed to render
+    ``serializer`` for ``model`` without a query per row. ``only`` is None
+    when a field reads something that is not a concrete column.
+    """
+    select_related, prefetch_related, only = [], [], []
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        source = field.source
+        if source == "*" or "." in source or isinstance(
+            field, serializers.SerializerMethodField
+        ):
+            only = None
+            continue
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            only = None
+            continue
+
+        path = f"{prefix}{source}"
+        if not model_field.is_relation:
+            if only is not None:
+                only.append(path)
+            continue
+
+        child = _child(field)
+        related_model = model_field.related_model
+
+        if model_field.many_to_many or model_field.one_to_many:
+            if isinstance(child, serializers.BaseSerializer):
+                nested = build_plan(child, related_model)
+            else:
+                nested = QueryPlan([], [], [])
+            if nested.only is not None and model_field.one_to_many:
+                nested.only.append(model_field.field.name)
+            related_queryset = apply_plan(related_model._default_manager.all(), nested)
+            prefetch_related.append(Prefetch(source, queryset=related_queryset))
+            continue
+
+        if only is not None and model_field.concrete:
+            only.append(path)
+        if isinstance(child, serializers.BaseSerializer):
+            select_related.append(path)
+            nested = build_plan(child, related_model, prefix=f"{path}__")
+            select_related += nested.select_related
+            if nested.only is None or only is None:
+                only = None
+            else:
+                only += nested.only
+            prefetch_related += [
+                Prefetch(f"{path}__{p.prefetch_through}", queryset=p.queryset)
+                for p in nested.prefetch_related
+            ]
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            if not model_field.concrete:
+                select_related.append(path)
+                if only is not None:
+                    only.append(f"{path}__{related_model._meta.pk.name}")
+        else:
+            select_related.append(path)
+            only = None
+
+    return QueryPlan(select_related, prefetch_related, only)
+
+
+def apply_plan(queryset, plan, extra_fields=()):
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+    if plan.prefetch_related:
+        queryset = queryset.prefetch_related(*plan.prefetch_related)
+    if plan.only is not None:
+        queryset = queryset.only(*plan.only, *extra_fields)
+    return queryset
@@ -0,0 +1,96 @@
+import statistics
+import time
+
+from django.db import connection, transaction
+from django.db.models import Max, Min
+
+from tag.models import Tag
+from .constants import BLOG_ORDERING, POST_ORDERING
+from .models import Blog, Post
+
+PostTag = Tag.posts.through
+
+# Indexes added for the keyset orderings, post-tag lookups and title
+# search (blog 0013, tag 0005). Dropped to measure "before".
+HOT_PATH_INDEXES = [
+    "blog_created_id_idx",
+    "post_published_id_idx",
+    "post_blog_published_id_idx",
+    "tag_tag_posts_post_tag_idx",
+    "blog_post_title_upper_trgm",
+]
+# What blog_post had instead: Django's own index on the blog FK.
+PREVIOUS_INDEX = "CREATE INDEX blog_post_blog_id_before_idx ON blog_post (blog_id)"
+
+
+def hot_queries(page_size=20):
+    """
+    The query shapes behind the busiest read paths, with parameters taken
+    from the current data: keyset pages of posts (first page, a deep page,
+    per blog and per owner), blog pages, the tags of a page of posts and a
+    title search.
+    """
+    blog = Blog.objects.order_by("-post_count", "id").first()
+    bounds = Post.objects.aggregate(first=Min("published_at"), last=Max("published_at"))
+    queries = {
+        "posts_first_page": Post.objects.order_by(*POST_ORDERING)[:page_size],
+        "blogs_first_page": Blog.objects.order_by(*BLOG_ORDERING)[:page_size],
+        "posts_by_title": Post.filter_posts_by_title(Post.objects.all(), "graphql")[:page_size],
+    }
+    if bounds["first"] is not None:
+        middle = bounds["first"] + (bounds["last"] - bounds["first"]) / 2
+        queries["posts_deep_page"] = Post.objects.filter(published_at__lt=middle).order_by(
+            *POST_ORDERING
+        )[:page_size]
+    if blog is not None:
+        queries["posts_by_blog"] = Post.objects.filter(blog_id=blog.pk).order_by(
+            *POST_ORDERING
+        )[:page_size]
+        queries["posts_by_owner"] = Post.objects.filter(blog__user_id=blog.user_id).order_by(
+            *POST_ORDERING
+        )[:page_size]
+    page = list(Post.objects.order_by(*POST_ORDERING).values_list("pk", flat=True)[:page_size])
+    queries["tags_of_page"] = PostTag.objects.filter(post_id__in=page).values_list(
+        "post_id", "tag_id"
+    )
+    return queries
+
+
+def _restore_previous_indexes(cursor):
+    for name in HOT_PATH_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+    cursor.execute(PREVIOUS_INDEX)
+
+
+def _measure(queryset, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(queryset.all())
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "plan": queryset.explain(),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def compare_plans(repeat=5, page_size=20):
+    """
+    Return ``{query: {"before": ..., "after": ...}}`` with the plan and timings
+    of every hot query with the previous indexes and with the current ones.
+    "before" runs in a transaction that swaps the indexes and is rolled back
+    (PostgreSQL and SQLite both have transactional DDL); the tables stay
+    locked meanwhile, so run it against a benchmark database.
+    """
+    queries = hot_queries(page_size)
+    results = {name: {} for name in queries}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            _restore_previous_indexes(cursor)
+        for name, queryset in queries.items():
+            results[name]["before"] = _measure(queryset, repeat)
+        transaction.set_rollback(True)
+    for name, queryset in queries.items():
+        results[name]["after"] = _measure(queryset, repeat)
+    return results
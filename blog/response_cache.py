@@ -0,0 +1,120 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+RESPONSE_CACHE_PREFIX = "response:"
+
+DEFAULTS = {
+    "ALIAS": "default",
+    "TIMEOUT": 300,
+}
+
+
+def response_cache_settings():
+    return {**DEFAULTS, **getattr(settings, "RESPONSE_CACHE", {})}
+
+
+def _cache():
+    return caches[response_cache_settings()["ALIAS"]]
+
+
+def _generation_key(label):
+    return f"{RESPONSE_CACHE_PREFIX}generation:{label}"
+
+
+def _now():
+    return time.time_ns() // 1000
+
+
+def get_generations(labels):
+    """
+    Return the generation of each model label. A generation is the time (in
+    microseconds) of the last change to that model, so it doubles as the
+    ``Last-Modified`` of anything built from it.
+    """
+    cache = _cache()
+    keys = [_generation_key(label) for label in labels]
+    found = cache.get_many(keys)
+    missing = {key: _now() for key in keys if key not in found}
+    for key, value in missing.items():
+        if not cache.add(key, value, None):
+            missing[key] = cache.get(key, value)
+    return tuple({**found, **missing}[key] for key in keys)
+
+
+async def aget_generations(labels):
+    """get_generations() through the cache's async API."""
+    cache = _cache()
+    keys = [_generation_key(label) for label in labels]
+    found = await cache.aget_many(keys)
+    missing = {key: _now() for key in keys if key not in found}
+    for key, value in missing.items():
+        if not await cache.aadd(key, value, None):
+            missing[key] = await cache.aget(key, value)
+    return tuple({**found, **missing}[key] for key in keys)
+
+
+def _bump(labels):
+    cache = _cache()
+    for label in labels:
+        key = _generation_key(label)
+        now = _now()
+        if cache.add(key, now, None):
+            continue
+        # incr() is atomic, so concurrent bumps all move the generation; the
+        # step only keeps it in line with the clock for Last-Modified.
+        try:
+            cache.incr(key, max(1, now - cache.get(key, now)))
+        except ValueError:
+            # Evicted since add().
+            cache.add(key, now, None)
+
+
+def bump_generation(*labels):
+    """
+    Invalidate every cached response built from ``labels``. Bumped right away
+    and again on commit, so a response computed from the old rows while the
+    transaction was open is not served afterwards.
+    """
+    _bump(labels)
+    transaction.on_commit(lambda: _bump(labels))
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def generation_time(generations):
+    """The latest change among ``generations`` as an aware datetime."""
+    return datetime.fromtimestamp(max(generations) / 1_000_000, tz=timezone.utc)
+
+
+class CachedResponse:
+    """One cacheable request: its cache key, ETag and Last-Modified."""
+
+    def __init__(self, request, labels, generations=None):
+        if generations is None:
+            generations = get_generations(labels)
+        query = sorted(request.query_params.lists())
+        fingerprint = f"{request.build_absolute_uri(request.path)}|{query}|{generations}"
+        digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+        self.key = f"{RESPONSE_CACHE_PREFIX}{digest}"
+        self.etag = f'"{digest[:32]}"'
+        self.last_modified = generation_time(generations)
+
+    @classmethod
+    async def acreate(cls, request, labels):
+        return cls(request, labels, await aget_generations(labels))
+
+    def get(self):
+        return _cache().get(self.key)
+
+    async def aget(self):
+        return await _cache().aget(self.key)
+
+    def set(self, data):
+        _cache().set(self.key, data, response_cache_settings()["TIMEOUT"])
@@ -1,5 +1,10 @@
 import graphene
+from django.db import transaction
 from .models import Blog, Post
+from .bulk import bulk_create_posts, bulk_update_posts
+from .permissions import can_edit_post
+from .search import search_posts
+from .utils import add_posts_tags, remove_posts_tags, set_posts_tags
 from tag.models import Tag
 from user.utils import get_authenticated_user, is_superuser
 from user.exceptions import (
@@ -8,7 +13,17 @@ from user.exceptions import (
     BaseAPIException,
     NotFoundError,
 )
-from Core.graphql_types import BlogType, PostType, TagType
+from Core.graphql_types import (
+    BlogType,
+    PostType,
+    TagType,
+    BlogConnection,
+    PostConnection,
+    BulkItemErrorType,
+    MatchMode,
+)
+from Core.dataloaders import attach_batch
+from Core.pagination import KeysetConnectionField
 from blog.constants import (
     AUTH_NOT_AUTHENTICATED,
     BLOG_TITLE_REQUIRED,
@@ -38,25 +53,47 @@ from blog.constants import (
     POST_ERROR_CREATING,
     POST_ERROR_UPDATING,
     POST_ERROR_DELETING,
+    POST_BULK_CREATED_SUCCESS,
+    POST_BULK_UPDATED_SUCCESS,
+    POST_BULK_TOO_MANY_ITEMS,
+    POST_BULK_MAX_ITEMS,
     TAG_NOT_FOUND,
     TAG_ADDED_TO_POST_SUCCESS,
     TAG_REMOVED_FROM_POST_SUCCESS,
     TAG_ERROR_ADDING_TO_POST,
     TAG_ERROR_REMOVING_FROM_POST,
+    TAGS_SET_ON_POSTS_SUCCESS,
+    TAG_ERROR_SETTING_ON_POSTS,
+    POST_ORDERING,
+    POST_SEARCH_ORDERING,
+    POST_SEARCH_QUERY_REQUIRED,
+    POST_ERROR_SEARCHING,
+    BLOG_ORDERING,
 )
 
 class Query(graphene.ObjectType):
-    posts = graphene.List(PostType)
+    posts = KeysetConnectionField(PostConnection, ordering=POST_ORDERING)
     post = graphene.Field(PostType, id=graphene.ID(required=True))
 
-    posts_by_blog = graphene.List(PostType, blog_id=graphene.ID(required=True))
+    posts_by_blog = KeysetConnectionField(
+        PostConnection, ordering=POST_ORDERING, blog_id=graphene.ID(required=True)
+    )
     posts_by_user = graphene.List(PostType, user_id=graphene.ID(required=True))
     posts_by_title = graphene.List(PostType, title=graphene.String(required=True))
+    search_posts = KeysetConnectionField(
+        PostConnection,
+        ordering=POST_SEARCH_ORDERING,
+        query=graphene.String(required=True),
+    )
 
-    blogs = graphene.List(BlogType)
+    blogs = KeysetConnectionField(BlogConnection, ordering=BLOG_ORDERING)
     blog = graphene.Field(BlogType, id=graphene.ID(required=True))
     blogs_by_user = graphene.List(BlogType, user_id=graphene.ID(required=True))
-    blogs_by_title = graphene.List(BlogType, title=graphene.String(required=True))
+    blogs_by_title = graphene.List(
+        BlogType,
+        title=graphene.String(required=True),
+        match=MatchMode(default_value=MatchMode.CONTAINS.value),
+    )
 
     def resolve_blogs(self, info):
         try:
@@ -76,9 +113,11 @@ class Query(graphene.ObjectType):
         except Exception as e:
             raise BaseAPIException(f"{BLOG_ERROR_FETCHING}: {e}")
 
-    def resolve_blogs_by_title(self, info, title):
+    def resolve_blogs_by_title(self, info, title, match=MatchMode.CONTAINS):
         try:
-            return Blog.filter_blogs_by_title(Blog.objects.all(), title)
+            return Blog.filter_blogs_by_title(
+                Blog.objects.all(), title, prefix=match == MatchMode.PREFIX
+            )
         except Exception as e:
             raise BaseAPIException(f"{BLOG_ERROR_FETCHING}: {e}")
 
@@ -117,10 +156,18 @@ class Query(graphene.ObjectType):
 
     def resolve_posts_by_title(self, info, title):
         try:
-            return Post.objects.filter(title__icontains=title)
+            return Post.filter_posts_by_title(Post.objects.all(), title)
         except Exception as e:
             raise BaseAPIException(f"{POST_ERROR_FETCHING}: {e}")
 
+    def resolve_search_posts(self, info, query):
+        if not query.strip():
+            raise BaseAPIException(POST_SEARCH_QUERY_REQUIRED)
+        try:
+            return search_posts(Post.objects.all(), query)
+        except Exception as e:
+            raise BaseAPIException(f"{POST_ERROR_SEARCHING}: {e}")
+
     
 
 class CreateBlog(graphene.Mutation):
@@ -402,6 +449,167 @@ class RemoveTagFromPost(graphene.Mutation):
         except Exception as e:
             raise BaseAPIException(f"{TAG_ERROR_REMOVING_FROM_POST}: {e}")
 
+class TagAssignmentMode(graphene.Enum):
+    ADD = "add"
+    REMOVE = "remove"
+    REPLACE = "replace"
+
+
+class CreatePostInput(graphene.InputObjectType):
+    blog_id = graphene.ID(required=True)
+    title = graphene.String(required=True)
+    content = graphene.String(required=True)
+    tag_ids = graphene.List(graphene.NonNull(graphene.ID))
+
+
+class UpdatePostInput(graphene.InputObjectType):
+    id = graphene.ID(required=True)
+    title = graphene.String()
+    content = graphene.String()
+    tag_ids = graphene.List(graphene.NonNull(graphene.ID))
+
+
+def _bulk_items(inputs):
+    if len(inputs) > POST_BULK_MAX_ITEMS:
+        raise BaseAPIException(POST_BULK_TOO_MANY_ITEMS.format(limit=POST_BULK_MAX_ITEMS))
+    return [
+        {("tags" if key == "tag_ids" else key): value for key, value in item.items()}
+        for item in inputs
+    ]
+
+
+def _messages(detail):
+    if isinstance(detail, dict):
+        return [message for value in detail.values() for message in _messages(value)]
+    if isinstance(detail, list):
+        return [message for value in detail for message in _messages(value)]
+    return [str(detail)]
+
+
+def _bulk_errors(errors):
+    return [
+        BulkItemErrorType(
+            index=error["index"],
+            field="tag_ids" if field == "tags" else field,
+            messages=_messages(detail),
+        )
+        for error in errors
+        for field, detail in error["errors"].items()
+    ]
+
+
+def _parse_ids(ids, message):
+    try:
+        return list(dict.fromkeys(int(pk) for pk in ids))
+    except ValueError:
+        raise NotFoundError(message)
+
+
+class CreatePosts(graphene.Mutation):
+    posts = graphene.List(PostType)
+    errors = graphene.List(BulkItemErrorType)
+    message = graphene.String()
+    success = graphene.Boolean()
+
+    class Arguments:
+        posts = graphene.List(graphene.NonNull(CreatePostInput), required=True)
+
+    def mutate(self, info, posts):
+        try:
+            user = get_authenticated_user(info)
+            if not user:
+                raise AuthenticationError(AUTH_NOT_AUTHENTICATED)
+
+            created, errors = bulk_create_posts(user, _bulk_items(posts))
+            return CreatePosts(
+                posts=attach_batch(created),
+                errors=_bulk_errors(errors),
+                message=POST_BULK_CREATED_SUCCESS.format(count=len(created)),
+                success=not errors,
+            )
+
+        except (AuthenticationError, BaseAPIException) as e:
+            raise e
+        except Exception as e:
+            raise BaseAPIException(f"{POST_ERROR_CREATING}: {e}")
+
+
+class UpdatePosts(graphene.Mutation):
+    posts = graphene.List(PostType)
+    errors = graphene.List(BulkItemErrorType)
+    message = graphene.String()
+    success = graphene.Boolean()
+
+    class Arguments:
+        posts = graphene.List(graphene.NonNull(UpdatePostInput), required=True)
+
+    def mutate(self, info, posts):
+        try:
+            user = get_authenticated_user(info)
+            if not user:
+                raise AuthenticationError(AUTH_NOT_AUTHENTICATED)
+
+            updated, errors = bulk_update_posts(user, _bulk_items(posts))
+            return UpdatePosts(
+                posts=attach_batch(updated),
+                errors=_bulk_errors(errors),
+                message=POST_BULK_UPDATED_SUCCESS.format(count=len(updated)),
+                success=not errors,
+            )
+
+        except (AuthenticationError, BaseAPIException) as e:
+            raise e
+        except Exception as e:
+            raise BaseAPIException(f"{POST_ERROR_UPDATING}: {e}")
+
+
+class SetPostTags(graphene.Mutation):
+    posts = graphene.List(PostType)
+    message = graphene.String()
+    success = graphene.Boolean()
+
+    class Arguments:
+        post_ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+        tag_ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+        mode = TagAssignmentMode(default_value=TagAssignmentMode.REPLACE.value)
+
+    def mutate(self, info, post_ids, tag_ids, mode=TagAssignmentMode.REPLACE):
+        try:
+            user = get_authenticated_user(info)
+            if not user:
+                raise AuthenticationError(AUTH_NOT_AUTHENTICATED)
+
+            post_ids = _parse_ids(post_ids, POST_NOT_FOUND)
+            tag_ids = _parse_ids(tag_ids, TAG_NOT_FOUND)
+
+            found = Post.objects.select_related("blog").in_bulk(post_ids)
+            if len(found) != len(post_ids):
+                raise NotFoundError(POST_NOT_FOUND)
+            posts = [found[pk] for pk in post_ids]
+            if not all(can_edit_post(user, post.blog) for post in posts):
+                raise PermissionDeniedError(POST_MODIFY_PERMISSION_DENIED)
+
+            if Tag.objects.filter(id__in=tag_ids).count() != len(tag_ids):
+                raise NotFoundError(TAG_NOT_FOUND)
+
+            with transaction.atomic():
+                if mode == TagAssignmentMode.ADD:
+                    add_posts_tags(posts, tag_ids)
+                elif mode == TagAssignmentMode.REMOVE:
+                    remove_posts_tags(posts, tag_ids)
+                else:
+                    set_posts_tags(posts, tag_ids)
+
+            return SetPostTags(
+                posts=attach_batch(posts), message=TAGS_SET_ON_POSTS_SUCCESS, success=True
+            )
+
+        except (AuthenticationError, PermissionDeniedError, BaseAPIException) as e:
+            raise e
+        except Exception as e:
+            raise BaseAPIException(f"{TAG_ERROR_SETTING_ON_POSTS}: {e}")
+
+
 class Mutation(graphene.ObjectType):
     create_blog = CreateBlog.Field()
     update_blog = UpdateBlog.Field()
@@ -411,3 +619,6 @@ class Mutation(graphene.ObjectType):
     delete_post = DeletePost.Field()
     add_tag_to_post = AddTagToPost.Field()
     remove_tag_from_post = RemoveTagFromPost.Field()
+    create_posts = CreatePosts.Field()
+    update_posts = UpdatePosts.Field()
+    set_post_tags = SetPostTags.Field()
@@ -0,0 +1,96 @@
+import html
+from itertools import islice
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections, router
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.utils.html import strip_tags
+
+from .constants import POST_BULK_BATCH_SIZE, POST_SEARCH_CONFIG
+from .models import Post
+
+FTS_TABLE = "blog_post_fts"
+
+
+def plain_text(content):
+    """Drop the TinyMCE markup so only the words reach the index."""
+    return " ".join(html.unescape(strip_tags(content or "")).split())
+
+
+def _batches(rows):
+    rows = iter(rows)
+    while batch := list(islice(rows, POST_BULK_BATCH_SIZE)):
+        yield batch
+
+
+def index_rows(rows, using=None):
+    """
+    Write the search document of every ``(id, title, content)`` row with one
+    statement per batch.
+    """
+    connection = connections[using or router.db_for_write(Post)]
+    documents = ((pk, title, plain_text(content)) for pk, title, content in rows)
+    table = connection.ops.quote_name(Post._meta.db_table)
+
+    with connection.cursor() as cursor:
+        for batch in _batches(documents):
+            if connection.vendor == "postgresql":
+                values = ", ".join(["(%s::bigint, %s, %s)"] * len(batch))
+                cursor.execute(
+                    f"UPDATE {table} AS post SET search_vector = "
+                    f"setweight(to_tsvector(%s::regconfig, document.title), 'A') || "
+                    f"setweight(to_tsvector(%s::regconfig, document.body), 'B') "
+                    f"FROM (VALUES {values}) AS document (id, title, body) "
+                    f"WHERE post.id = document.id",
+                    [POST_SEARCH_CONFIG, POST_SEARCH_CONFIG]
+                    + [value for row in batch for value in row],
+                )
+            elif connection.vendor == "sqlite":
+                cursor.executemany(
+                    f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, body) "
+                    f"VALUES (%s, %s, %s)",
+                    batch,
+                )
+
+
+def index_posts(posts, using=None):
+    index_rows([(post.pk, post.title, post.content) for post in posts], using=using)
+
+
+def search_posts(queryset, query):
+    """
+    Filter ``queryset`` to the posts matching every word of ``query`` and
+    annotate them with a ``rank`` where higher is more relevant.
+    """
+    terms = query.split()
+    if not terms:
+        return queryset.none()
+
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        search_query = SearchQuery(
+            query, config=POST_SEARCH_CONFIG, search_type="websearch"
+        )
+        # Cast to double precision so cursors round-trip the rank exactly.
+        rank = Cast(SearchRank(F("search_vector"), search_query), FloatField())
+        return queryset.filter(search_vector=search_query).annotate(rank=rank)
+
+    if vendor == "sqlite":
+        match = " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        table = Post._meta.db_table
+        matches = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,))
+        # bm25() is lower for better matches; titles weigh like tsvector's 'A'.
+        rank = RawSQL(
+            f"SELECT -bm25({FTS_TABLE}, 2.5, 1.0) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id",
+            (match,),
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(rank=rank)
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(content__icontains=term)
+    return queryset.filter(condition).annotate(rank=Value(0.0, output_field=FloatField()))
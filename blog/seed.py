@@ -0,0 +1,125 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from tag.models import Tag
+from .counters import recount_blogs, recount_tags
+from .models import Blog, Post
+from .search import index_posts
+
+PostTag = Tag.posts.through
+
+SEED_PREFIX = "seed"
+SEED_TOPICS = ("django", "graphql", "sql", "python")
+
+
+@contextmanager
+def explicit_timestamps(model, *names):
+    """Let bulk_create keep the auto_now/auto_now_add values set on instances."""
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def seed_dataset(
+    posts,
+    blogs=None,
+    tags=None,
+    tags_per_post=3,
+    batch_size=5000,
+    seed=0,
+    search_index=False,
+):
+    """
+    Insert ``posts`` posts spread over ``blogs`` blogs (one user each) and
+    linked to ``tags_per_post`` of ``tags`` tags, with bulk inserts and no
+    signals, then recount the post counters. Publication dates go back one
+    minute per post so keyset pages have realistic spread. Pass
+    ``search_index=True`` to also fill the full-text index. Deterministic for
+    a given ``seed``; returns the number of rows written per table.
+    """
+    rng = random.Random(seed)
+    blogs = blogs or max(1, posts // 100)
+    tags = tags or max(10, min(posts // 50, 5000))
+    now = timezone.now()
+    password = make_password(None)
+
+    with transaction.atomic():
+        start = User.objects.count()
+        users = User.objects.bulk_create(
+            [
+                User(username=f"{SEED_PREFIX}{start + i}", password=password)
+                for i in range(blogs)
+            ],
+            batch_size=batch_size,
+        )
+        start = Blog.objects.count()
+        with explicit_timestamps(Blog, "created_at", "updated_at"):
+            blog_rows = Blog.objects.bulk_create(
+                [
+                    Blog(
+                        user=user,
+                        title=f"Seed blog {start + i}",
+                        description="<p>Seeded blog</p>",
+                        created_at=now - timedelta(hours=i),
+                        updated_at=now - timedelta(hours=i),
+                    )
+                    for i, user in enumerate(users)
+                ],
+                batch_size=batch_size,
+            )
+        start = Tag.objects.count()
+        tag_rows = Tag.objects.bulk_create(
+            [Tag(name=f"{SEED_PREFIX}{start + i}") for i in range(tags)],
+            batch_size=batch_size,
+        )
+
+        blog_ids = [blog.pk for blog in blog_rows]
+        tag_ids = [tag.pk for tag in tag_rows]
+        links = 0
+        with explicit_timestamps(Post, "published_at", "updated_at"):
+            for chunk in _chunks(range(posts), batch_size):
+                rows = Post.objects.bulk_create(
+                    [
+                        Post(
+                            blog_id=rng.choice(blog_ids),
+                            title=f"Seed post {i} about {rng.choice(SEED_TOPICS)}",
+                            content=f"<p>Body of seeded post {i}.</p>",
+                            published_at=now - timedelta(minutes=i),
+                            updated_at=now - timedelta(minutes=i),
+                        )
+                        for i in chunk
+                    ]
+                )
+                through = [
+                    PostTag(post_id=post.pk, tag_id=tag_id)
+                    for post in rows
+                    for tag_id in rng.sample(tag_ids, min(tags_per_post, len(tag_ids)))
+                ]
+                PostTag.objects.bulk_create(through, batch_size=batch_size)
+                links += len(through)
+                if search_index:
+                    index_posts(rows)
+
+        recount_blogs(blog_ids)
+        recount_tags(tag_ids)
+
+    return {"users": blogs, "blogs": blogs, "tags": tags, "posts": posts, "post_tags": links}
@@ -1,5 +1,9 @@
+from django.db import transaction
 from rest_framework import serializers
+from Core.profiling import ProfiledSerializerMixin
+from .fields import BulkPrimaryKeyRelatedField
 from .models import Blog, Post
+from .utils import set_posts_tags
 from tag.models import Tag
 from user.serializers import UserSerializer
 from drf_spectacular.utils import extend_schema_serializer
@@ -24,9 +28,9 @@ from drf_spectacular.openapi import OpenApiExample
         )
     ]
 )
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
 
-    tags = serializers.PrimaryKeyRelatedField(many=True, queryset=Tag.objects.all())
+    tags = BulkPrimaryKeyRelatedField(many=True, queryset=Tag.objects.all())
     blog = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
@@ -42,6 +46,21 @@ class PostSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["published_at", "updated_at", "blog"]
 
+    def create(self, validated_data):
+        tags = validated_data.pop("tags", [])
+        with transaction.atomic():
+            post = super().create(validated_data)
+            set_posts_tags([post], [tag.pk for tag in tags], created=True)
+        return post
+
+    def update(self, instance, validated_data):
+        tags = validated_data.pop("tags", None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if tags is not None:
+                set_posts_tags([instance], [tag.pk for tag in tags])
+        return instance
+
 
 @extend_schema_serializer(
     examples=[
@@ -55,19 +74,28 @@ class PostSerializer(serializers.ModelSerializer):
                 "description": "Un blog sobre tecnología y programación",
                 "created_at": "2025-01-27T10:00:00Z",
                 "updated_at": "2025-01-27T10:00:00Z",
+                "post_count": 12,
                 "user": {"id": 1, "username": "usuario"},
             },
         )
     ]
 )
-class BlogSerializer(serializers.ModelSerializer):
+class BlogSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
 
     user = UserSerializer(read_only=True)
 
     class Meta:
         model = Blog
-        fields = ["id", "title", "description", "created_at", "updated_at", "user"]
-        read_only_fields = ["created_at", "updated_at"]
+        fields = [
+            "id",
+            "title",
+            "description",
+            "created_at",
+            "updated_at",
+            "post_count",
+            "user",
+        ]
+        read_only_fields = ["created_at", "updated_at", "post_count"]
 
     def create(self, validated_data):
         validated_data["user"] = self.context["request"].user
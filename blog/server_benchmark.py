@@ -0,0 +1,205 @@
+import asyncio
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from .benchmark import PERCENTILES, _percentile
+
+DEFAULT_PATHS = ("/cms/api/posts/", "/cms/api/tags/")
+SERVER_START_TIMEOUT = 30
+
+
+def server_command(server, port, workers=1, threads=8):
+    """The command line serving the project with ``server`` on ``port``."""
+    if server == "waitress":
+        # waitress has no worker processes: one process, ``threads`` threads.
+        return [
+            sys.executable, "-m", "waitress", "--host=127.0.0.1", f"--port={port}",
+            f"--threads={threads}", f"--connection-limit={10_000}",
+            "Core.wsgi:application",
+        ]
+    if server == "uvicorn":
+        return [
+            sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+            "Core.asgi:application",
+        ]
+    raise ValueError(f"Unknown server {server!r}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def raise_open_files_limit(connections):
+    """Both ends of every connection need a descriptor, plus some headroom."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = connections * 2 + 256
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+
+def start_server(server, port, **options):
+    # A file rather than a pipe: a server blocked on a full pipe stops serving.
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        server_command(server, port, **options),
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+        stdout=subprocess.DEVNULL,
+        stderr=log,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"{server} exited: {log.read().decode()[-2000:]}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{server} did not listen on port {port} within {SERVER_START_TIMEOUT}s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def _read_response(reader):
+    """Read one HTTP/1.1 response; return ``(status, keep_alive)``."""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip().lower()
+
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("connection") != "close"
+
+
+async def _client(host, port, paths, deadline, latencies, errors, timeout):
+    reader = writer = None
+    sent = 0
+    while time.monotonic() < deadline:
+        path = paths[sent % len(paths)]
+        sent += 1
+        request = f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nAccept: application/json\r\n\r\n"
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port), timeout
+                )
+            writer.write(request.encode("ascii"))
+            status, keep_alive = await asyncio.wait_for(_read_response(reader), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            errors["connection"] += 1
+            keep_alive = False
+        else:
+            if status >= 400:
+                errors["status"] += 1
+            else:
+                latencies.append((time.perf_counter() - started) * 1000)
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, paths=DEFAULT_PATHS, connections=1000, duration=10.0, timeout=30.0):
+    """
+    Keep ``connections`` keep-alive connections busy for ``duration``
+    seconds, each sending GETs to ``paths`` in turn.
+    """
+    latencies = []
+    errors = {"connection": 0, "status": 0}
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client(host, port, list(paths), deadline, latencies, errors, timeout)
+            for _ in range(connections)
+        )
+    )
+    return summarize_load(latencies, errors, time.perf_counter() - started)
+
+
+def summarize_load(latencies, errors, elapsed):
+    """Latency percentiles (ms), throughput (requests/s) and error counts."""
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_ms": None,
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            "mean": round(statistics.fmean(latencies), 3),
+            **{f"p{p}": round(_percentile(latencies, p), 3) for p in PERCENTILES},
+            "max": round(latencies[-1], 3),
+        }
+    return summary
+
+
+def benchmark_servers(
+    servers=("waitress", "uvicorn"),
+    paths=DEFAULT_PATHS,
+    connections=1000,
+    duration=10.0,
+    warmup=2.0,
+    workers=1,
+    threads=8,
+    progress=None,
+):
+    """
+    Serve the project with each of ``servers`` in turn (against the configured
+    database) and load it with ``connections`` concurrent connections.
+    """
+    raise_open_files_limit(connections)
+    results = {
+        "connections": connections,
+        "duration": duration,
+        "paths": list(paths),
+        "workers": workers,
+        "threads": threads,
+        "servers": {},
+    }
+    for server in servers:
+        if progress:
+            progress(server)
+        port = free_port()
+        process = start_server(server, port, workers=workers, threads=threads)
+        try:
+            if warmup:
+                asyncio.run(run_load("127.0.0.1", port, paths, min(connections, 50), warmup))
+            results["servers"][server] = asyncio.run(
+                run_load("127.0.0.1", port, paths, connections, duration)
+            )
+        finally:
+            stop_server(process)
+    return results
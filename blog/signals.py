@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+)
+from django.db.models import QuerySet
+from django.dispatch import receiver
+
+from tag.models import Tag
+from .counters import (
+    adjust_blog_counts,
+    adjust_tag_counts,
+    recount_tags,
+    release_blog_post_tags,
+    release_post_tags,
+)
+from .models import Blog, Post
+from .response_cache import bump_generation, model_label
+from .search import index_posts
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is None or {"title", "content"} & set(update_fields):
+        index_posts([instance], using=using)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_responses(sender, **kwargs):
+    bump_generation(model_label(sender))
+
+
+@receiver(m2m_changed, sender=Tag.posts.through)
+def invalidate_post_tag_responses(sender, action, **kwargs):
+    # Tag links never touch Post.updated_at, so they get their own generation.
+    if action.startswith("post_"):
+        bump_generation(model_label(sender))
+
+
+@receiver(post_init, sender=Post)
+def remember_counted_blog(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred blog_id is not fetched.
+    instance._counted_blog_id = instance.__dict__.get("blog_id")
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    previous = instance._counted_blog_id
+    if created:
+        adjust_blog_counts({instance.blog_id: 1})
+    elif previous is not None and previous != instance.blog_id:
+        adjust_blog_counts({previous: -1, instance.blog_id: 1})
+    instance._counted_blog_id = instance.blog_id
+
+
+def _deleted_with_blog(origin):
+    """True when posts are being deleted by the cascade of a blog (or its user)."""
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return not issubclass(model, Post)
+
+
+@receiver(pre_delete, sender=Post)
+def release_deleted_post_tags(sender, instance, origin=None, **kwargs):
+    # A deleted blog releases all its posts at once in release_deleted_blog_tags.
+    if not _deleted_with_blog(origin):
+        release_post_tags([instance.pk])
+
+
+@receiver(pre_delete, sender=Blog)
+def release_deleted_blog_tags(sender, instance, **kwargs):
+    # Post pre_delete signals come first, but no row is deleted until all are sent.
+    release_blog_post_tags([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, origin=None, **kwargs):
+    # The blog row goes with its posts; there is no counter left to update.
+    if not _deleted_with_blog(origin):
+        adjust_blog_counts({instance.blog_id: -1})
+
+
+@receiver(m2m_changed, sender=Tag.posts.through)
+def count_post_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    # reverse=True: ``post.tags`` changed and pk_set holds tag ids.
+    if action == "post_add" and pk_set:
+        if reverse:
+            adjust_tag_counts({pk: 1 for pk in pk_set})
+        else:
+            adjust_tag_counts({instance.pk: len(pk_set)})
+    elif action == "post_remove" and pk_set:
+        # pk_set may name links that did not exist, so recount instead.
+        recount_tags(pk_set if reverse else [instance.pk])
+    elif action == "pre_clear" and reverse:
+        instance._cleared_tag_ids = list(instance.tags.values_list("pk", flat=True))
+    elif action == "post_clear":
+        if reverse:
+            recount_tags(instance.__dict__.pop("_cleared_tag_ids", []))
+        else:
+            recount_tags([instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_responses(sender, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which no public response shows.
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    bump_generation(model_label(sender))
@@ -1,6 +1,10 @@
 from blog.tests.factories import UserFactory, BlogFactory, PostFactory, TagFactory
 from Core.tests import GraphQLTestCase
+from Core.dataloaders import DataLoaderMiddleware
 from unittest.mock import Mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from user.token_cache import token_cache
 from blog.models import Blog, Post
 from tag.models import Tag
 
@@ -17,16 +21,22 @@ class TestBlogQuery(GraphQLTestCase):
         query = """
         query {
             blogs {
-                id
-                title
-                description
+                totalCount
+                edges {
+                    node {
+                        id
+                        title
+                        description
+                    }
+                }
             }
         }
         """
         result = self.client.execute(query)
         self.assertIsNone(result.get("errors"), result.get("errors"))
-        blogs = result["data"]["blogs"]
+        blogs = result["data"]["blogs"]["edges"]
         self.assertEqual(len(blogs), 2)
+        self.assertEqual(result["data"]["blogs"]["totalCount"], 2)
 
     def test_query_blog_by_id_found(self):
         query = f"""
@@ -86,15 +96,19 @@ class TestPostQuery(GraphQLTestCase):
         query = """
         query {
             posts {
-                id
-                title
-                content
+                edges {
+                    node {
+                        id
+                        title
+                        content
+                    }
+                }
             }
         }
         """
         result = self.client.execute(query)
         self.assertIsNone(result.get("errors"), result.get("errors"))
-        posts = result["data"]["posts"]
+        posts = result["data"]["posts"]["edges"]
         self.assertGreaterEqual(len(posts), 2)
 
     def test_query_post_by_id_found(self):
@@ -130,14 +144,18 @@ class TestPostQuery(GraphQLTestCase):
         query = f"""
         query {{
             postsByBlog(blogId: {self.blog.id}) {{
-                id
-                title
+                edges {{
+                    node {{
+                        id
+                        title
+                    }}
+                }}
             }}
         }}
         """
         result = self.client.execute(query)
         self.assertIsNone(result.get("errors"), result.get("errors"))
-        posts = result["data"]["postsByBlog"]
+        posts = [edge["node"] for edge in result["data"]["postsByBlog"]["edges"]]
         self.assertGreaterEqual(len(posts), 2)
 
     def test_query_posts_by_title(self):
@@ -513,3 +531,309 @@ class TestPostTagMutation(GraphQLTestCase):
         self.assertTrue(result["data"]["removeTagFromPost"]["success"])
         self.assertFalse(self.post.tags.filter(id=self.tag.id).exists())
 
+
+
+class TestRelationBatching(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tags = [TagFactory(name=f"tag{i}") for i in range(3)]
+        for _ in range(4):
+            blog = BlogFactory()
+            for _ in range(3):
+                post = PostFactory(blog=blog)
+                post.tags.set(self.tags)
+
+    def test_nested_relations_use_one_query_per_level(self):
+        query = """
+        query {
+            posts {
+                edges {
+                    node {
+                        id
+                        blog {
+                            id
+                            user {
+                                username
+                            }
+                        }
+                        tags {
+                            name
+                        }
+                    }
+                }
+            }
+        }
+        """
+        with self.assertNumQueries(4):
+            result = self.client.execute(
+                query, middleware=[DataLoaderMiddleware()]
+            )
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        posts = [edge["node"] for edge in result["data"]["posts"]["edges"]]
+        self.assertEqual(len(posts), 12)
+        for post in posts:
+            self.assertEqual(len(post["tags"]), 3)
+            self.assertIsNotNone(post["blog"]["user"]["username"])
+
+    def test_reverse_relations_are_batched(self):
+        query = """
+        query {
+            tags {
+                edges {
+                    node {
+                        name
+                        posts {
+                            id
+                            tags {
+                                id
+                            }
+                        }
+                    }
+                }
+            }
+        }
+        """
+        with self.assertNumQueries(3):
+            result = self.client.execute(
+                query, middleware=[DataLoaderMiddleware()]
+            )
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        for edge in result["data"]["tags"]["edges"]:
+            self.assertEqual(len(edge["node"]["posts"]), 12)
+
+
+class TestKeysetPagination(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        blog = BlogFactory()
+        self.posts = [PostFactory(blog=blog) for _ in range(5)]
+        published_at = self.posts[0].published_at
+        # Equal timestamps force the id tie-breaker to be used.
+        Post.objects.filter(id__in=[p.id for p in self.posts[:3]]).update(
+            published_at=published_at
+        )
+
+    def _page(self, arguments):
+        query = f"""
+        query {{
+            posts({arguments}) {{
+                edges {{
+                    cursor
+                    node {{
+                        id
+                    }}
+                }}
+                pageInfo {{
+                    hasNextPage
+                    hasPreviousPage
+                    startCursor
+                    endCursor
+                }}
+            }}
+        }}
+        """
+        result = self.client.execute(query)
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        return result["data"]["posts"]
+
+    def _ids(self, page):
+        return [int(edge["node"]["id"]) for edge in page["edges"]]
+
+    def test_forward_pages_cover_every_post_once(self):
+        expected = list(
+            Post.objects.order_by("-published_at", "-id").values_list("id", flat=True)
+        )
+        seen = []
+        page = self._page("first: 2")
+        seen += self._ids(page)
+        while page["pageInfo"]["hasNextPage"]:
+            page = self._page(f'first: 2, after: "{page["pageInfo"]["endCursor"]}"')
+            seen += self._ids(page)
+        self.assertEqual(seen, expected)
+
+    def test_backward_page(self):
+        expected = list(
+            Post.objects.order_by("-published_at", "-id").values_list("id", flat=True)
+        )
+        last_page = self._page("last: 2")
+        self.assertEqual(self._ids(last_page), expected[-2:])
+        self.assertTrue(last_page["pageInfo"]["hasPreviousPage"])
+
+        before = last_page["pageInfo"]["startCursor"]
+        page = self._page(f'last: 2, before: "{before}"')
+        self.assertEqual(self._ids(page), expected[-4:-2])
+
+    def test_total_count_is_not_queried_unless_selected(self):
+        with self.assertNumQueries(1):
+            self._page("first: 2")
+
+    def test_invalid_cursor(self):
+        result = self.client.execute('query { posts(after: "nope") { edges { cursor } } }')
+        self.assertIsNotNone(result.get("errors"))
+        self.assertIn("Invalid cursor", result["errors"][0]["message"])
+
+
+class TestBatchedPostMutations(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = UserFactory(password="password")
+        self.blog = BlogFactory(user=self.user)
+        self.posts = PostFactory.create_batch(5, blog=self.blog)
+        self.tags = [TagFactory(name=f"tag{i}") for i in range(4)]
+
+    def _get_authenticated_context(self, user):
+        """Helper method to get authenticated context"""
+        login_query = f"""
+        mutation {{
+            loginUser(username: "{user.username}", password: "password") {{
+                token
+            }}
+        }}
+        """
+        login_result = self.client.execute(login_query)
+        token = login_result["data"]["loginUser"]["token"]
+        context = Mock()
+        context.headers = {"Authorization": f"Bearer {token}"}
+        return context
+
+    def _set_tags(self, posts, tags, mode):
+        query = f"""
+        mutation {{
+            setPostTags(postIds: {[p.id for p in posts]}, tagIds: {[t.id for t in tags]}, mode: {mode}) {{
+                posts {{
+                    id
+                    tags {{
+                        name
+                    }}
+                }}
+                success
+            }}
+        }}
+        """
+        return self.client.execute(
+            query, context_value=self._get_authenticated_context(self.user)
+        )
+
+    def _tag_ids(self, post):
+        return set(post.tags.values_list("id", flat=True))
+
+    def test_create_posts(self):
+        context = self._get_authenticated_context(self.user)
+        query = f"""
+        mutation {{
+            createPosts(posts: [
+                {{blogId: {self.blog.id}, title: "First post", content: "Body", tagIds: [{self.tags[0].id}]}},
+                {{blogId: {self.blog.id}, title: "Second post", content: "Body"}},
+                {{blogId: {self.blog.id}, title: "", content: "Body"}}
+            ]) {{
+                posts {{
+                    title
+                    tags {{
+                        name
+                    }}
+                }}
+                errors {{
+                    index
+                    field
+                    messages
+                }}
+                success
+            }}
+        }}
+        """
+        result = self.client.execute(query, context_value=context)
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        data = result["data"]["createPosts"]
+        self.assertFalse(data["success"])
+        self.assertEqual([p["title"] for p in data["posts"]], ["First post", "Second post"])
+        self.assertEqual(data["posts"][0]["tags"], [{"name": "tag0"}])
+        self.assertEqual(data["errors"][0]["index"], 2)
+        self.assertEqual(data["errors"][0]["field"], "title")
+        self.assertEqual(Post.objects.filter(blog=self.blog).count(), 7)
+
+    def test_create_posts_in_foreign_blog_is_rejected(self):
+        context = self._get_authenticated_context(self.user)
+        other_blog = BlogFactory()
+        query = f"""
+        mutation {{
+            createPosts(posts: [{{blogId: {other_blog.id}, title: "Intruder", content: "Body"}}]) {{
+                errors {{
+                    index
+                    messages
+                }}
+                success
+            }}
+        }}
+        """
+        result = self.client.execute(query, context_value=context)
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        self.assertFalse(result["data"]["createPosts"]["success"])
+        self.assertFalse(Post.objects.filter(blog=other_blog).exists())
+
+    def test_update_posts(self):
+        context = self._get_authenticated_context(self.user)
+        first, second = self.posts[:2]
+        query = f"""
+        mutation {{
+            updatePosts(posts: [
+                {{id: {first.id}, title: "Renamed post"}},
+                {{id: {second.id}, tagIds: [{self.tags[1].id}]}}
+            ]) {{
+                posts {{
+                    id
+                    title
+                }}
+                success
+            }}
+        }}
+        """
+        result = self.client.execute(query, context_value=context)
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        self.assertTrue(result["data"]["updatePosts"]["success"])
+        first.refresh_from_db()
+        self.assertEqual(first.title, "Renamed post")
+        self.assertEqual(self._tag_ids(second), {self.tags[1].id})
+
+    def test_set_post_tags_modes(self):
+        posts = self.posts[:2]
+        result = self._set_tags(posts, self.tags[:2], "REPLACE")
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        self.assertTrue(result["data"]["setPostTags"]["success"])
+
+        self._set_tags(posts, self.tags[2:], "ADD")
+        for post in posts:
+            self.assertEqual(self._tag_ids(post), {t.id for t in self.tags})
+
+        result = self._set_tags(posts, self.tags[:3], "REMOVE")
+        for post in posts:
+            self.assertEqual(self._tag_ids(post), {self.tags[3].id})
+        returned = result["data"]["setPostTags"]["posts"]
+        self.assertEqual([p["tags"] for p in returned], [[{"name": "tag3"}]] * 2)
+
+    def test_set_post_tags_query_count_is_constant(self):
+        counts = []
+        for posts in (self.posts[:1], self.posts):
+            context = self._get_authenticated_context(self.user)
+            token_cache.clear()
+            query = f"""
+            mutation {{
+                setPostTags(postIds: {[p.id for p in posts]}, tagIds: {[t.id for t in self.tags]}) {{
+                    success
+                }}
+            }}
+            """
+            with CaptureQueriesContext(connection) as queries:
+                result = self.client.execute(query, context_value=context)
+            self.assertIsNone(result.get("errors"), result.get("errors"))
+            counts.append(len(queries.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_set_post_tags_is_all_or_nothing(self):
+        foreign = PostFactory(blog=BlogFactory())
+        result = self._set_tags([self.posts[0], foreign], self.tags, "ADD")
+        self.assertIsNotNone(result.get("errors"))
+        self.assertEqual(self._tag_ids(self.posts[0]), set())
+
+        result = self._set_tags([self.posts[0]], [self.tags[0], Tag(id=9999)], "ADD")
+        self.assertIsNotNone(result.get("errors"))
+        self.assertEqual(self._tag_ids(self.posts[0]), set())
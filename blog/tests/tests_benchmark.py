@@ -0,0 +1,54 @@
+import copy
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from blog.benchmark import GRAPHQL_QUERIES, compare_results, run_benchmarks
+from blog.models import Post
+
+
+class TestRunBenchmarks(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_measures_every_scenario_without_errors(self):
+        results = run_benchmarks(sizes=[40], requests=3, warmup=1)
+        dataset = results["datasets"]["40"]
+        self.assertEqual(dataset["rows"]["posts"], 40)
+        for field in GRAPHQL_QUERIES:
+            self.assertIn(f"graphql:{field}", dataset["scenarios"])
+        for name, summary in dataset["scenarios"].items():
+            self.assertEqual(summary["errors"], 0, name)
+            self.assertEqual(summary["requests"], 3)
+            self.assertGreater(summary["queries"]["max"], 0, name)
+            self.assertLessEqual(summary["latency_ms"]["p50"], summary["latency_ms"]["p99"])
+
+    def test_grows_the_dataset_between_sizes(self):
+        results = run_benchmarks(sizes=[30, 10], requests=1, warmup=0, only=["rest:posts"])
+        self.assertEqual(list(results["datasets"]), ["10", "30"])
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(
+            set(results["datasets"]["30"]["scenarios"]),
+            {"rest:posts.list", "rest:posts.retrieve"},
+        )
+
+    def test_query_counts_do_not_grow_with_the_dataset(self):
+        results = run_benchmarks(sizes=[20, 60], requests=1, warmup=1)
+        small, large = (results["datasets"][size]["scenarios"] for size in ("20", "60"))
+        for name, summary in large.items():
+            self.assertEqual(summary["queries"]["max"], small[name]["queries"]["max"], name)
+
+
+class TestCompareResults(TestCase):
+    def results(self, queries=2, p95=10.0):
+        summary = {"queries": {"max": queries}, "latency_ms": {"p95": p95}}
+        return {"datasets": {"100": {"scenarios": {"rest:posts.list": summary}}}}
+
+    def test_reports_more_queries_and_slower_p95(self):
+        regressions = compare_results(self.results(), self.results(queries=3, p95=13.0))
+        self.assertEqual(len(regressions), 2)
+
+    def test_ignores_noise_within_tolerance_and_improvements(self):
+        baseline = self.results()
+        self.assertEqual(compare_results(baseline, self.results(queries=1, p95=11.0)), [])
+        self.assertEqual(compare_results(baseline, copy.deepcopy(baseline)), [])
@@ -0,0 +1,131 @@
+import json
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Blog, Post
+from blog.tests.factories import BlogFactory, PostFactory, TagFactory, UserFactory
+
+
+class TestPostBulkEndpoint(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = UserFactory()
+        self.blog = BlogFactory(user=self.user)
+        self.tags = [TagFactory(name=f"tag{i}") for i in range(3)]
+        self.url = reverse("post-bulk")
+        self.client.force_login(self.user)
+
+    def _send(self, method, payload, content_type="application/json"):
+        body = payload if isinstance(payload, str) else json.dumps(payload)
+        return getattr(self.client, method)(self.url, body, content_type=content_type)
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self._send("post", [{"title": "A", "content": "B"}])
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_create_posts_in_users_blog(self):
+        items = [
+            {"title": f"Post {i}", "content": "Body", "tags": [self.tags[i].id]}
+            for i in range(3)
+        ]
+        response = self._send("post", items)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertEqual(response.data["errors"], [])
+        self.assertEqual(Post.objects.filter(blog=self.blog).count(), 3)
+        post = Post.objects.get(title="Post 1")
+        self.assertEqual(list(post.tags.values_list("id", flat=True)), [self.tags[1].id])
+
+    def test_create_creates_blog_when_missing(self):
+        user = UserFactory()
+        self.client.force_login(user)
+        response = self._send("post", [{"title": "First", "content": "Body"}])
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Blog.objects.filter(user=user).exists())
+
+    def test_create_query_count_does_not_grow_with_items(self):
+        counts = []
+        for size in (10, 150):
+            items = [{"title": f"Post {i}", "content": "Body"} for i in range(size)]
+            with CaptureQueriesContext(connection) as context:
+                self._send("post", items)
+            counts.append(len(context.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_create_reports_invalid_items_by_index(self):
+        items = [
+            {"title": "Valid", "content": "Body"},
+            {"content": "No title"},
+            {"title": "Bad tag", "content": "Body", "tags": [9999]},
+            "not an object",
+        ]
+        response = self._send("post", items)
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1, 2, 3])
+        self.assertIn("title", response.data["errors"][0]["errors"])
+        self.assertIn("9999", str(response.data["errors"][1]["errors"]["tags"][0]))
+
+    def test_create_accepts_ndjson(self):
+        body = "\n".join(
+            json.dumps({"title": f"Line {i}", "content": "Body"}) for i in range(3)
+        )
+        response = self._send("post", body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Post.objects.filter(blog=self.blog).count(), 3)
+
+    def test_ndjson_parse_error_reports_line(self):
+        body = json.dumps({"title": "Ok", "content": "Body"}) + "\n{broken"
+        response = self._send("post", body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("2", str(response.data))
+
+    def test_rejects_non_list_payload(self):
+        response = self._send("post", {"title": "A", "content": "B"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Post.objects.count(), 0)
+
+    def test_update_posts(self):
+        posts = PostFactory.create_batch(3, blog=self.blog)
+        items = [
+            {"id": posts[0].id, "title": "Renamed"},
+            {"id": posts[1].id, "tags": [t.id for t in self.tags]},
+        ]
+        response = self._send("patch", items)
+        self.assertEqual(response.status_code, 200)
+        posts[0].refresh_from_db()
+        self.assertEqual(posts[0].title, "Renamed")
+        self.assertEqual(posts[1].tags.count(), 3)
+        self.assertEqual(posts[2].tags.count(), 0)
+
+    def test_update_rejects_posts_of_other_users(self):
+        own = PostFactory(blog=self.blog)
+        foreign = PostFactory(blog=BlogFactory(user=UserFactory()))
+        items = [
+            {"id": own.id, "title": "Mine now"},
+            {"id": foreign.id, "title": "Not mine either"},
+            {"id": 999999, "title": "Missing"},
+            {"title": "No id"},
+        ]
+        response = self._send("patch", items)
+        self.assertEqual(response.status_code, 207, response.data)
+        self.assertEqual([e["index"] for e in response.data["errors"]], [1, 2, 3])
+        foreign.refresh_from_db()
+        self.assertNotEqual(foreign.title, "Not mine either")
+
+    def test_delete_posts(self):
+        posts = PostFactory.create_batch(3, blog=self.blog)
+        response = self._send("delete", [posts[0].id, {"id": posts[1].id}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.data["results"]), sorted([posts[0].id, posts[1].id]))
+        self.assertEqual(list(Post.objects.values_list("id", flat=True)), [posts[2].id])
+
+    def test_delete_with_only_foreign_posts_fails(self):
+        foreign = PostFactory(blog=BlogFactory(user=UserFactory()))
+        response = self._send("delete", [foreign.id])
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Post.objects.filter(id=foreign.id).exists())
@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from blog.tests.factories import BlogFactory, PostFactory, TagFactory, UserFactory
+from blog.utils import set_posts_tags
+from user.token_cache import token_cache
+
+
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = UserFactory()
+        self.blog = BlogFactory(user=self.user)
+        self.post = PostFactory(blog=self.blog)
+        self.client = APIClient()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.list_url = reverse("post-list")
+        self.detail_url = reverse("post-detail", args=[self.post.id])
+
+    def test_matching_etag_costs_one_aggregate_query(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_on_retrieve(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_updates_and_deletes_change_the_etag(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        other = PostFactory(blog=self.blog)
+        changed = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+
+        other.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=changed["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+    def test_tag_changes_change_the_etag(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        set_posts_tags([self.post], [TagFactory().id])
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_blog_etag_follows_the_owner(self):
+        url = reverse("blog-detail", args=[self.blog.id])
+        etag = self.client.get(url)["ETag"]
+        self.user.username = "renamed"
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["user"]["username"], "renamed")
+
+    def test_missing_objects_are_not_validated(self):
+        response = self.client.get(reverse("post-detail", args=[self.post.id + 1000]))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response)
+
+    def test_malformed_pks_are_not_found(self):
+        for name in ("post-detail", "blog-detail"):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=["abc"]))
+                self.assertEqual(response.status_code, 404)
+                self.assertNotIn("ETag", response)
@@ -0,0 +1,29 @@
+import unittest
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from blog.connection_load import run_connection_load
+
+
+class TestConnectionLoad(TransactionTestCase):
+    def test_run_connection_load(self):
+        results = run_connection_load(threads=4, duration=0.3, hold=0.005)
+        self.assertGreater(results["requests"], 0)
+        self.assertEqual(results["errors"], {"database": 0})
+        if connection.vendor != "postgresql":
+            self.assertIsNone(results["peak_server_connections"])
+
+    @unittest.skipUnless(
+        connection.vendor == "postgresql" and connection.settings_dict["OPTIONS"].get("pool"),
+        "Needs PostgreSQL with DATABASE_POOL.",
+    )
+    def test_server_connections_stay_within_the_pool(self):
+        max_size = connection.pool.max_size
+        results = run_connection_load(threads=max_size * 4, duration=1.0, hold=0.01)
+        self.assertEqual(results["errors"], {"database": 0})
+        self.assertLessEqual(
+            results["peak_server_connections"] - results["baseline_server_connections"],
+            max_size,
+        )
+        self.assertLessEqual(results["peak_pool_size"], max_size)
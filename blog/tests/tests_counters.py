@@ -0,0 +1,149 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from graphene.test import Client
+
+from blog.bulk import bulk_create_posts, bulk_delete_posts
+from blog.models import Blog, Post
+from blog.tests.factories import BlogFactory, PostFactory, TagFactory, UserFactory
+from blog.utils import add_posts_tags, remove_posts_tags, set_posts_tags
+from Core.schema import schema
+from tag.models import Tag
+
+
+class TestPostCounters(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.blog = BlogFactory(user=self.user)
+        self.tags = [TagFactory(name=f"tag{i}") for i in range(3)]
+
+    def assertCounts(self, blog=None, tags=None):
+        if blog is not None:
+            self.assertEqual(Blog.objects.get(pk=self.blog.pk).post_count, blog)
+        if tags is not None:
+            counts = dict(Tag.objects.values_list("name", "post_count"))
+            self.assertEqual([counts[tag.name] for tag in self.tags], tags)
+
+    def test_create_and_delete_posts(self):
+        first = PostFactory(blog=self.blog)
+        PostFactory(blog=self.blog)
+        self.assertCounts(blog=2)
+        first.delete()
+        self.assertCounts(blog=1)
+
+    def test_moving_a_post_moves_the_count(self):
+        post = PostFactory(blog=self.blog)
+        other = BlogFactory()
+        post.blog = other
+        post.save()
+        self.assertCounts(blog=0)
+        self.assertEqual(Blog.objects.get(pk=other.pk).post_count, 1)
+
+    def test_tag_changes_from_either_side(self):
+        post = PostFactory(blog=self.blog)
+        post.tags.add(self.tags[0], self.tags[1])
+        self.tags[2].posts.add(post)
+        self.assertCounts(tags=[1, 1, 1])
+        post.tags.remove(self.tags[0], self.tags[0])
+        self.tags[1].posts.remove(post)
+        self.assertCounts(tags=[0, 0, 1])
+        post.tags.clear()
+        self.assertCounts(tags=[0, 0, 0])
+
+    def test_removing_a_missing_link_keeps_the_count(self):
+        post = PostFactory(blog=self.blog)
+        post.tags.remove(self.tags[0])
+        self.assertCounts(tags=[0, 0, 0])
+
+    def test_deleting_a_post_releases_its_tags(self):
+        post = PostFactory(blog=self.blog)
+        post.tags.add(*self.tags)
+        post.delete()
+        self.assertCounts(blog=0, tags=[0, 0, 0])
+
+    def test_batched_tag_helpers(self):
+        posts = [PostFactory(blog=self.blog) for _ in range(4)]
+        ids = [tag.id for tag in self.tags]
+        set_posts_tags(posts, ids[:2])
+        add_posts_tags(posts[:2], [ids[2]])
+        remove_posts_tags(posts[:1], [ids[0]])
+        self.assertCounts(tags=[3, 4, 2])
+
+    def test_bulk_create_and_delete(self):
+        items = [
+            {"title": f"Bulk post {i}", "content": "Body", "tags": [self.tags[0].id]}
+            for i in range(5)
+        ]
+        posts, errors = bulk_create_posts(self.user, items, blog=self.blog)
+        self.assertEqual(errors, [])
+        self.assertCounts(blog=5, tags=[5, 0, 0])
+
+        bulk_delete_posts(self.user, [post.id for post in posts[:3]])
+        self.assertCounts(blog=2, tags=[2, 0, 0])
+
+    def test_bulk_delete_counts_in_constant_queries(self):
+        def deletion_queries(size):
+            posts = [PostFactory(blog=self.blog) for _ in range(size)]
+            add_posts_tags(posts, [tag.id for tag in self.tags])
+            with CaptureQueriesContext(connection) as ctx:
+                bulk_delete_posts(self.user, [post.id for post in posts])
+            return len(ctx.captured_queries)
+
+        self.assertEqual(deletion_queries(2), deletion_queries(20))
+        self.assertCounts(blog=0, tags=[0, 0, 0])
+
+    def test_deleting_a_blog_or_its_user_releases_its_tags(self):
+        other = BlogFactory()
+        for blog in (self.blog, other):
+            posts = [PostFactory(blog=blog) for _ in range(3)]
+            add_posts_tags(posts, [tag.id for tag in self.tags[:2]])
+        self.assertCounts(tags=[6, 6, 0])
+        self.blog.delete()
+        self.assertCounts(tags=[3, 3, 0])
+        other.user.delete()
+        self.assertCounts(tags=[0, 0, 0])
+
+    def test_deleting_a_blog_counts_in_constant_queries(self):
+        def deletion_counter_updates(size):
+            blog = BlogFactory()
+            posts = [PostFactory(blog=blog) for _ in range(size)]
+            add_posts_tags(posts, [tag.id for tag in self.tags])
+            with CaptureQueriesContext(connection) as ctx:
+                blog.delete()
+            return [
+                query["sql"] for query in ctx.captured_queries
+                if query["sql"].startswith("UPDATE") and "post_count" in query["sql"]
+            ]
+
+        self.assertEqual(len(deletion_counter_updates(2)), 1)
+        self.assertEqual(len(deletion_counter_updates(20)), 1)
+        self.assertCounts(tags=[0, 0, 0])
+
+    def test_queryset_delete_of_posts_still_counts(self):
+        posts = [PostFactory(blog=self.blog) for _ in range(3)]
+        add_posts_tags(posts, [self.tags[0].id])
+        Post.objects.filter(pk__in=[post.pk for post in posts[:2]]).delete()
+        self.assertCounts(blog=1, tags=[1, 0, 0])
+
+    def test_rebuild_command(self):
+        post = PostFactory(blog=self.blog)
+        post.tags.add(self.tags[0])
+        Blog.objects.update(post_count=42)
+        Tag.objects.update(post_count=7)
+        out = StringIO()
+        call_command("rebuild_post_counts", stdout=out)
+        self.assertCounts(blog=1, tags=[1, 0, 0])
+        self.assertIn("Recounted", out.getvalue())
+
+    def test_counts_are_exposed(self):
+        PostFactory(blog=self.blog).tags.add(self.tags[0])
+        result = Client(schema).execute(
+            "{ tag(id: %d) { postCount } blogsByUser(userId: %d) { postCount } }"
+            % (self.tags[0].id, self.user.id)
+        )
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        self.assertEqual(result["data"]["tag"]["postCount"], 1)
+        self.assertEqual(result["data"]["blogsByUser"][0]["postCount"], 1)
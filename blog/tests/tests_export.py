@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+
+from blog.export import export
+from blog.tests.factories import BlogFactory, PostFactory, TagFactory, UserFactory
+
+
+def read(name, format="csv", columns=None, **options):
+    text, content_type, filename = export(name, format, columns, **options)
+    return "".join(text)
+
+
+class TestExport(TestCase):
+    def setUp(self):
+        self.blog = BlogFactory(title="Exported blog")
+        self.posts = [PostFactory(blog=self.blog, title=f"Post number {i}") for i in range(5)]
+        TagFactory(name="python", posts=self.posts[:2])
+        TagFactory(name="django", posts=self.posts[:1])
+
+    def test_csv_leaves_out_content_by_default(self):
+        rows = list(csv.DictReader(io.StringIO(read("posts"))))
+        self.assertEqual(len(rows), 5)
+        self.assertNotIn("content", rows[0])
+        self.assertEqual(rows[0]["blog"], "Exported blog")
+        self.assertEqual(rows[0]["tags"], "django|python")
+        self.assertEqual(rows[2]["tags"], "")
+
+    def test_selected_columns_as_jsonl(self):
+        lines = read("posts", "jsonl", ["id", "content", "tags"]).splitlines()
+        first = json.loads(lines[0])
+        self.assertEqual(list(first), ["id", "content", "tags"])
+        self.assertEqual(first["content"], self.posts[0].content)
+        self.assertEqual(first["tags"], ["django", "python"])
+
+    def test_columnar_chunks(self):
+        lines = read("tags", "columnar", ["name"], chunk_size=1).splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines], [{"name": ["python"]}, {"name": ["django"]}]
+        )
+        lines = read("posts", "columnar", ["title"], chunk_size=3).splitlines()
+        self.assertEqual([len(json.loads(line)["title"]) for line in lines], [3, 2])
+
+    def test_queries_per_chunk(self):
+        # One cursor for the rows, one tag lookup per chunk of 2 posts.
+        with self.assertNumQueries(1 + 3):
+            read("posts", chunk_size=2)
+        with self.assertNumQueries(1):
+            read("posts", columns=["id", "title"], chunk_size=2)
+
+    def test_unknown_columns_and_formats(self):
+        with self.assertRaisesMessage(ValueError, "Unknown columns: password"):
+            export("blogs", "csv", ["title", "password"])
+        with self.assertRaisesMessage(ValueError, "Unknown format"):
+            export("blogs", "xlsx")
+
+
+class TestExportCommand(TestCase):
+    def test_writes_file(self):
+        PostFactory(title="From the command")
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory, "posts.jsonl")
+            call_command(
+                "export_data", "posts", format="jsonl", columns="id,title",
+                output=str(output), stderr=io.StringIO(),
+            )
+            rows = [json.loads(line) for line in output.read_text().splitlines()]
+        self.assertEqual(rows, [{"id": rows[0]["id"], "title": "From the command"}])
+
+    def test_unknown_column(self):
+        with self.assertRaises(CommandError):
+            call_command("export_data", "tags", columns="nope", stdout=io.StringIO())
+
+
+class TestAdminStreamExport(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(UserFactory(is_staff=True, is_superuser=True))
+        self.blog = BlogFactory(title="Filtered blog")
+        PostFactory(blog=self.blog, title="Inside the filter")
+        PostFactory(title="Outside the filter")
+
+    def test_streams_the_filtered_changelist(self):
+        response = self.client.get(
+            "/admin/blog/post/stream-export/",
+            {"format": "jsonl", "columns": "title", "blog__id__exact": self.blog.pk},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="posts.jsonl"')
+        body = b"".join(response.streaming_content).decode()
+        self.assertEqual(body, '{"title": "Inside the filter"}\n')
+
+    def test_changelist_links(self):
+        response = self.client.get("/admin/tag/tag/")
+        self.assertContains(response, "/admin/tag/tag/stream-export/?&amp;format=csv")
+
+    def test_bad_column_and_permission(self):
+        response = self.client.get("/admin/blog/blog/stream-export/", {"columns": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_login(UserFactory(is_staff=True))
+        response = self.client.get("/admin/blog/blog/stream-export/")
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,209 @@
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import skipIf
+
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from blog.importer import build_post, default_job, import_chunk, import_posts
+from blog.models import ImportedChunk, Post
+from blog.response_cache import get_generations, model_label
+from blog.tests.factories import BlogFactory, TagFactory
+from tag.autocomplete import autocomplete_tags
+from tag.models import Tag
+
+
+class ImportFiles:
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, text):
+        path = Path(self.directory.name, name)
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    def jsonl(self, rows, name="posts.jsonl"):
+        return self.write(name, "".join(json.dumps(row) + "\n" for row in rows))
+
+
+class TestBuildPost(TestCase):
+    def test_valid_row(self):
+        post, blog_key, tags = build_post(
+            '{"blog_id": "3", "title": "A valid title", "content": "Text", '
+            '"published_at": "2024-01-02T03:04:05", "tags": ["python", "python", " django "]}'
+        )
+        self.assertEqual(blog_key, ("id", 3))
+        self.assertEqual(tags, ["python", "django"])
+        self.assertEqual(post.published_at.isoformat()[:19], "2024-01-02T03:04:05")
+        self.assertEqual(post.updated_at, post.published_at)
+
+    def test_invalid_rows(self):
+        cases = {
+            "not json": "non_field_errors",
+            "[1, 2]": "non_field_errors",
+            '{"blog": "B", "title": "Hi", "content": "Text"}': "title",
+            '{"blog": "B", "title": "A valid title", "content": "Text", "published_at": "yesterday"}':
+                "published_at",
+            '{"title": "A valid title", "content": "Text"}': "blog",
+        }
+        for row, field in cases.items():
+            with self.subTest(row=row), self.assertRaises(ValidationError) as raised:
+                build_post(row)
+            self.assertIn(field, raised.exception.message_dict)
+
+
+class TestImportPosts(ImportFiles, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.blog = BlogFactory(title="Imported blog")
+        self.python = TagFactory(name="python")
+
+    def test_csv_by_blog_title(self):
+        path = self.write(
+            "posts.csv",
+            "blog,title,content,tags\n"
+            "Imported blog,First imported post,Text,python\n"
+            "Imported blog,Second imported post,Text,\n",
+        )
+        summary = import_posts(path, chunk_size=1)
+        self.assertEqual((summary["chunks"], summary["imported"], summary["errors"]), (2, 2, 0))
+        self.assertEqual(
+            list(self.blog.posts.order_by("title").values_list("title", flat=True)),
+            ["First imported post", "Second imported post"],
+        )
+        self.blog.refresh_from_db()
+        self.python.refresh_from_db()
+        self.assertEqual((self.blog.post_count, self.python.post_count), (2, 1))
+        self.assertEqual(list(self.python.posts.values_list("title", flat=True)), ["First imported post"])
+
+    def test_rejected_rows_are_reported(self):
+        path = self.jsonl([
+            {"blog_id": self.blog.pk, "title": "Kept post title", "content": "Text"},
+            {"blog": "Missing blog", "title": "Unknown blog post", "content": "Text"},
+            {"blog_id": self.blog.pk, "title": "Unknown tag post", "content": "Text", "tags": ["rust"]},
+        ])
+        results = []
+        summary = import_posts(path, on_chunk=results.append)
+        self.assertEqual((summary["imported"], summary["errors"]), (1, 2))
+        self.assertEqual(
+            results[0]["errors"],
+            [
+                {"line": 2, "errors": {"blog": ["Blog not found: Missing blog"]}},
+                {"line": 3, "errors": {"tags": ["Tags not found: rust"]}},
+            ],
+        )
+        self.assertFalse(Tag.objects.filter(name="rust").exists())
+
+    def test_create_tags(self):
+        path = self.jsonl([
+            {"blog_id": self.blog.pk, "title": "Tagged post title", "content": "Text",
+             "tags": ["python", "rust"]},
+        ])
+        self.assertEqual(autocomplete_tags("ru", 5), [])
+        generation = get_generations([model_label(Tag)])
+        summary = import_posts(path, create_tags=True)
+        self.assertEqual(summary["imported"], 1)
+        self.assertEqual(Tag.objects.get(name="rust").post_count, 1)
+        # bulk_create sends no post_save, so the importer invalidates by itself.
+        self.assertEqual([tag.name for tag in autocomplete_tags("ru", 5)], ["rust"])
+        self.assertGreater(get_generations([model_label(Tag)]), generation)
+
+    def test_queries_per_chunk(self):
+        rows = [
+            (line, json.dumps({"blog": "Imported blog", "title": f"Imported post {line}",
+                               "content": "Text", "tags": ["python"]}))
+            for line in range(1, 51)
+        ]
+        # The savepoint, the blog and tag lookups, the posts, their tags, the
+        # search index, the checkpoint and one UPDATE per counter, whatever
+        # the chunk size.
+        with self.assertNumQueries(10):
+            import_chunk("job", 0, rows)
+        self.assertEqual(Post.objects.count(), 50)
+
+    def test_resumes_after_the_last_imported_chunk(self):
+        path = self.jsonl([
+            {"blog_id": self.blog.pk, "title": f"Resumed post {i}", "content": "Text"} for i in range(3)
+        ])
+        ImportedChunk.objects.create(job="resumed", index=0, rows=1, imported=1)
+        summary = import_posts(path, job="resumed", chunk_size=1)
+        self.assertEqual((summary["resumed_after"], summary["chunks"], summary["imported"]), (1, 2, 2))
+        self.assertEqual(
+            sorted(self.blog.posts.values_list("title", flat=True)), ["Resumed post 1", "Resumed post 2"]
+        )
+
+        summary = import_posts(path, job="resumed", chunk_size=1)
+        self.assertEqual((summary["chunks"], summary["imported"]), (0, 0))
+        self.assertEqual(self.blog.posts.count(), 2)
+
+    def test_a_chunk_recorded_meanwhile_is_skipped(self):
+        ImportedChunk.objects.create(job="race", index=0, rows=1, imported=1)
+        row = json.dumps({"blog_id": self.blog.pk, "title": "Raced post title", "content": "Text"})
+        result = import_chunk("race", 0, [(1, row)])
+        self.assertTrue(result["skipped"])
+        self.assertFalse(Post.objects.exists())
+
+    def test_editing_the_file_changes_the_job(self):
+        path = self.write("posts.csv", "blog,title,content\nB,First title,Text\n")
+        job = default_job(path, 500)
+        self.assertEqual(default_job(path, 500), job)
+        self.assertNotEqual(default_job(path, 100), job)
+        # Same size, other content.
+        self.write("posts.csv", "blog,title,content\nB,Other title,Text\n")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertNotEqual(default_job(path, 500), job)
+
+    @skipIf(connection.vendor != "sqlite", "SQLite only")
+    def test_workers_need_postgresql(self):
+        path = self.jsonl([])
+        with self.assertRaisesMessage(ValueError, "needs PostgreSQL"):
+            import_posts(path, workers=2)
+
+
+class TestImportCommand(ImportFiles, TestCase):
+    def test_errors_file_and_restart(self):
+        blog = BlogFactory(title="Command blog")
+        path = self.jsonl([
+            {"blog_id": blog.pk, "title": "Command post title", "content": "Text"},
+            {"blog_id": blog.pk, "title": "No", "content": "Text"},
+        ])
+        errors = Path(self.directory.name, "errors.jsonl")
+        stdout = io.StringIO()
+        call_command("import_posts", path, errors=str(errors), stdout=stdout, stderr=io.StringIO())
+        self.assertIn("1 of 2 rows imported in 1 chunks, 1 rejected", stdout.getvalue())
+        self.assertEqual(json.loads(errors.read_text())["line"], 2)
+
+        stdout = io.StringIO()
+        call_command("import_posts", path, stdout=stdout, stderr=io.StringIO())
+        self.assertIn("0 of 0 rows imported in 0 chunks, 0 rejected, resumed after 1 chunks", stdout.getvalue())
+
+        call_command("import_posts", path, restart=True, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(blog.posts.count(), 2)
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            call_command("import_posts", "/nonexistent/posts.csv", stdout=io.StringIO())
+
+
+@skipIf(connection.vendor == "sqlite", "Several workers need PostgreSQL")
+class TestImportInProcesses(ImportFiles, TransactionTestCase):
+    def test_workers_import_every_chunk(self):
+        blog = BlogFactory(title="Parallel blog")
+        path = self.jsonl([
+            {"blog_id": blog.pk, "title": f"Parallel post {i}", "content": "Text", "tags": ["shared"]}
+            for i in range(40)
+        ])
+        summary = import_posts(path, chunk_size=5, workers=3, create_tags=True)
+        self.assertEqual((summary["chunks"], summary["imported"]), (8, 40))
+        blog.refresh_from_db()
+        self.assertEqual(blog.post_count, 40)
+        self.assertEqual(Tag.objects.get(name="shared").post_count, 40)
+        self.assertEqual(ImportedChunk.objects.filter(job=summary["job"]).count(), 8)
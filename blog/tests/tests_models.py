@@ -1,6 +1,6 @@
 from django.test import TestCase
 from blog.tests.factories import BlogFactory, PostFactory
-from blog.models import Post
+from blog.models import Blog, Post
 
 class TestBlogCreation(TestCase):
     def test_blog_creation(self):
@@ -32,4 +32,18 @@ class TestBlogModel(TestCase):
         self.assertEqual(filtered_posts.count(), 1)
         self.assertEqual(filtered_posts[0].id, post1.id)
         self.assertEqual(filtered_posts2.count(), 1)
-        self.assertEqual(filtered_posts2[0].id, post2.id)
\ No newline at end of file
+        self.assertEqual(filtered_posts2[0].id, post2.id)
+    def test_filter_posts_by_title(self):
+        PostFactory(title="Learning GraphQL fast")
+        PostFactory(title="Django tips")
+        found = Post.filter_posts_by_title(Post.objects.all(), "graphql")
+        self.assertEqual([post.title for post in found], ["Learning GraphQL fast"])
+        self.assertFalse(Post.filter_posts_by_title(Post.objects.all(), None).exists())
+
+    def test_filter_blogs_by_title_prefix(self):
+        BlogFactory(title="Cooking at home")
+        BlogFactory(title="Home cooking")
+        contains = Blog.filter_blogs_by_title(Blog.objects.all(), "cooking")
+        prefix = Blog.filter_blogs_by_title(Blog.objects.all(), "cooking", prefix=True)
+        self.assertEqual(contains.count(), 2)
+        self.assertEqual([blog.title for blog in prefix], ["Cooking at home"])
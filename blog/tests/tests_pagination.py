@@ -0,0 +1,68 @@
+import json
+from django.test import TestCase
+from rest_framework.test import APIClient
+from blog.tests.factories import BlogFactory, PostFactory, TagFactory
+from blog.models import Post
+
+
+class TestKeysetPagination(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        blog = BlogFactory()
+        self.posts = [PostFactory(blog=blog) for _ in range(5)]
+        Post.objects.filter(id__in=[p.id for p in self.posts[:3]]).update(
+            published_at=self.posts[0].published_at
+        )
+        self.expected = list(
+            Post.objects.order_by("-published_at", "-id").values_list("id", flat=True)
+        )
+
+    def test_next_links_walk_every_post_once(self):
+        seen = []
+        url = "/cms/api/posts/?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [post["id"] for post in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_link(self):
+        first = self.client.get("/cms/api/posts/?page_size=2")
+        second = self.client.get(first.data["next"])
+        self.assertIsNotNone(second.data["previous"])
+
+        previous = self.client.get(second.data["previous"])
+        self.assertEqual(
+            [post["id"] for post in previous.data["results"]], self.expected[:2]
+        )
+        self.assertIsNone(first.data["previous"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/cms/api/posts/?after=nope")
+        self.assertEqual(response.status_code, 400)
+
+    def test_tags_are_ordered_by_name(self):
+        for name in ["gamma", "alpha", "beta"]:
+            TagFactory(name=name)
+        response = self.client.get("/cms/api/tags/")
+        names = [tag["name"] for tag in response.data["results"]]
+        self.assertEqual(names, ["alpha", "beta", "gamma"])
+
+
+class TestStreamingList(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        blog = BlogFactory()
+        self.posts = [PostFactory(blog=blog) for _ in range(3)]
+
+    def test_stream_returns_ndjson_rows(self):
+        response = self.client.get("/cms/api/posts/?stream=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(
+            sorted(row["id"] for row in rows), sorted(p.id for p in self.posts)
+        )
+        self.assertIn("content", rows[0])
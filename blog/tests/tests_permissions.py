@@ -1,4 +1,6 @@
-from django.test import TestCase
+import json
+
+from django.test import Client, TestCase
 from blog.tests.factories import UserFactory, BlogFactory, PostFactory
 from blog.permissions import can_view_post, can_add_post, can_edit_post
 
@@ -54,3 +56,29 @@ class TestPermissions(TestCase):
     def test_anonymous_user_can_edit_blog(self):
         blog = BlogFactory(user=UserFactory())
         self.assertFalse(can_edit_post(None, blog))
+
+
+class TestPostViewSetPermissions(TestCase):
+    def setUp(self):
+        self.owner = UserFactory()
+        self.post = PostFactory(blog=BlogFactory(user=self.owner), title="Owned post")
+        self.url = f"/cms/api/posts/{self.post.pk}/"
+        self.client = Client()
+
+    def _send(self, method):
+        body = json.dumps({"title": "Edited post title", "content": "Edited", "tags": []})
+        return getattr(self.client, method)(self.url, body, content_type="application/json")
+
+    def test_non_owners_cannot_write(self):
+        self.client.force_login(UserFactory())
+        for method in ("put", "patch", "delete"):
+            with self.subTest(method=method):
+                self.assertEqual(self._send(method).status_code, 403)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.title, "Owned post")
+
+    def test_owner_can_write(self):
+        self.client.force_login(self.owner)
+        for method, expected in (("put", 200), ("patch", 200), ("delete", 204)):
+            with self.subTest(method=method):
+                self.assertEqual(self._send(method).status_code, expected)
@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from blog.prefetch import build_plan
+from blog.serializers import BlogSerializer, PostSerializer
+from blog.models import Blog, Post
+from blog.tests.factories import BlogFactory, PostFactory, TagFactory
+
+
+class TestBuildPlan(TestCase):
+    def test_nested_serializer_is_selected(self):
+        plan = build_plan(BlogSerializer(), Blog)
+        self.assertEqual(plan.select_related, ["user"])
+        self.assertIn("user__username", plan.only)
+        self.assertEqual(plan.prefetch_related, [])
+
+    def test_many_relation_is_prefetched(self):
+        plan = build_plan(PostSerializer(), Post)
+        self.assertEqual(plan.select_related, [])
+        self.assertEqual(
+            [p.prefetch_through for p in plan.prefetch_related], ["tags"]
+        )
+        self.assertIn("blog", plan.only)
+
+
+class TestListQueryCounts(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tags = [TagFactory(name=f"tag{i}") for i in range(3)]
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def _seed(self, blogs):
+        for _ in range(blogs):
+            blog = BlogFactory()
+            for _ in range(2):
+                PostFactory(blog=blog).tags.set(self.tags)
+
+    def test_blog_list_does_not_grow_with_rows(self):
+        self._seed(1)
+        small = self._count_queries("/cms/api/blogs/")
+        self._seed(5)
+        self.assertEqual(self._count_queries("/cms/api/blogs/"), small)
+
+    def test_post_list_does_not_grow_with_rows(self):
+        self._seed(1)
+        small = self._count_queries("/cms/api/posts/")
+        self._seed(5)
+        self.assertEqual(self._count_queries("/cms/api/posts/"), small)
+        self.assertEqual(small, 2)
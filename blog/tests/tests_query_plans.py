@@ -0,0 +1,63 @@
+from unittest import skipIf
+
+from django.db import connection
+from django.test import TestCase
+
+from blog.models import Blog, Post
+from blog.query_plans import compare_plans, hot_queries
+from blog.seed import seed_dataset
+from tag.models import Tag
+
+
+class TestSeedDataset(TestCase):
+    def test_seeds_posts_tags_and_counters(self):
+        rows = seed_dataset(300, blogs=5, tags=12, tags_per_post=2, batch_size=100)
+        self.assertEqual(rows["posts"], Post.objects.count())
+        self.assertEqual(rows["post_tags"], 600)
+        self.assertEqual(sum(Blog.objects.values_list("post_count", flat=True)), 300)
+        self.assertEqual(sum(Tag.objects.values_list("post_count", flat=True)), 600)
+
+    def test_is_deterministic(self):
+        seed_dataset(50, blogs=3, tags=10, seed=7)
+        first = list(Post.objects.order_by("id").values_list("title", flat=True))
+        Post.objects.all().delete()
+        seed_dataset(50, blogs=3, tags=10, seed=7)
+        second = list(Post.objects.order_by("id").values_list("title", flat=True))
+        self.assertEqual(first, second)
+
+
+class TestComparePlans(TestCase):
+    def setUp(self):
+        seed_dataset(500, blogs=5, tags=20)
+
+    def index_names(self, table):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+        return set(constraints)
+
+    def test_reports_before_and_after_for_every_query(self):
+        results = compare_plans(repeat=1)
+        self.assertEqual(set(results), set(hot_queries()))
+        for phases in results.values():
+            for phase in ("before", "after"):
+                self.assertTrue(phases[phase]["plan"])
+                self.assertGreaterEqual(phases[phase]["median_ms"], 0)
+
+    def test_keyset_page_uses_the_new_index(self):
+        results = compare_plans(repeat=1)
+        self.assertNotIn("post_published_id_idx", results["posts_first_page"]["before"]["plan"])
+        self.assertIn("post_published_id_idx", results["posts_first_page"]["after"]["plan"])
+
+    def test_restores_indexes(self):
+        compare_plans(repeat=1)
+        self.assertIn("post_blog_published_id_idx", self.index_names("blog_post"))
+        self.assertNotIn("blog_post_blog_id_before_idx", self.index_names("blog_post"))
+        self.assertIn("tag_tag_posts_post_tag_idx", self.index_names("tag_tag_posts"))
+
+    @skipIf(connection.vendor != "postgresql", "Trigram indexes are PostgreSQL only")
+    def test_title_search_uses_the_trigram_index(self):
+        with connection.cursor() as cursor:
+            # Too few rows for the planner to prefer the index on its own.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = hot_queries()["posts_by_title"].explain()
+        self.assertIn("blog_post_title_upper_trgm", plan)
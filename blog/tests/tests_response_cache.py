@@ -0,0 +1,140 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from blog.bulk import bulk_create_posts
+from blog.checks import check_response_cache
+from blog.response_cache import _bump, get_generations
+from blog.tests.factories import BlogFactory, PostFactory, TagFactory, UserFactory
+from blog.utils import set_posts_tags
+
+
+class TestPublicResponseCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = UserFactory()
+        self.blog = BlogFactory(user=self.user)
+        self.tag = TagFactory(name="python")
+        self.post = PostFactory(blog=self.blog, title="Original title")
+        self.post.tags.add(self.tag)
+        self.list_url = reverse("post-list")
+        self.detail_url = reverse("post-detail", args=[self.post.id])
+
+    def test_repeated_requests_skip_the_database(self):
+        first = self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertIn("Last-Modified", second)
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_if_modified_since_returns_not_modified(self):
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get(self.list_url)
+        other = PostFactory(blog=BlogFactory())
+        response = self.client.get(self.list_url, {"blog_id": other.blog_id})
+        self.assertEqual([post["id"] for post in response.json()["results"]], [other.id])
+
+    def test_saving_a_post_invalidates(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        self.post.title = "Changed title"
+        self.post.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Changed title")
+
+    def test_changing_tags_invalidates(self):
+        self.client.get(self.detail_url)
+        other = TagFactory(name="django")
+        set_posts_tags([self.post], [other.id])
+        self.assertEqual(self.client.get(self.detail_url).json()["tags"], [other.id])
+
+    def test_deleting_a_tag_invalidates_posts(self):
+        self.client.get(self.detail_url)
+        self.tag.delete()
+        self.assertEqual(self.client.get(self.detail_url).json()["tags"], [])
+
+    def test_bulk_create_invalidates(self):
+        self.client.get(self.list_url)
+        items = [{"title": "Bulk title", "content": "Body"}]
+        bulk_create_posts(self.user, items, blog=self.blog)
+        titles = [post["title"] for post in self.client.get(self.list_url).json()["results"]]
+        self.assertIn("Bulk title", titles)
+
+    def test_renaming_a_user_invalidates_blogs(self):
+        url = reverse("blog-detail", args=[self.blog.id])
+        self.client.get(url)
+        self.user.username = "renamed"
+        self.user.save()
+        self.assertEqual(self.client.get(url).json()["user"]["username"], "renamed")
+
+    def test_authenticated_requests_are_not_cached(self):
+        anonymous = self.client.get(self.list_url)
+        self.client.force_login(self.user)
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], anonymous["ETag"])
+
+    def test_errors_are_not_cached(self):
+        url = reverse("post-detail", args=[self.post.id + 1000])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertNotIn("ETag", self.client.get(url))
+
+
+class TestGenerations(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_bumps_are_not_lost(self):
+        # With a frozen clock, each bump adds one.
+        with mock.patch("blog.response_cache._now", return_value=1_000_000):
+            threads = [
+                threading.Thread(target=lambda: [_bump(["blog.post"]) for _ in range(50)])
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(get_generations(["blog.post"]), (1_000_000 + 8 * 50 - 1,))
+
+    def test_follows_the_clock(self):
+        with mock.patch("blog.response_cache._now", return_value=1_000_000):
+            _bump(["blog.post"])
+        with mock.patch("blog.response_cache._now", return_value=5_000_000):
+            _bump(["blog.post"])
+        self.assertEqual(get_generations(["blog.post"]), (5_000_000,))
+
+
+class TestResponseCacheCheck(SimpleTestCase):
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_per_process_cache_with_several_workers(self):
+        with override_settings(WEB_CONCURRENCY=4):
+            self.assertEqual([error.id for error in check_response_cache(None)], ["blog.E001"])
+        with override_settings(WEB_CONCURRENCY=1):
+            self.assertEqual(check_response_cache(None), [])
+
+    @override_settings(
+        WEB_CONCURRENCY=4,
+        CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://localhost:6379/0",
+        }},
+    )
+    def test_shared_cache_with_several_workers(self):
+        self.assertEqual(check_response_cache(None), [])
@@ -0,0 +1,114 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from blog.bulk import bulk_create_posts
+from blog.models import Post
+from blog.search import plain_text, search_posts
+from blog.tests.factories import BlogFactory, PostFactory, UserFactory
+from Core.tests import GraphQLTestCase
+
+
+def _titles(queryset):
+    return [post.title for post in queryset.order_by("-rank", "-id")]
+
+
+class TestPlainText(TestCase):
+    def test_strips_markup_and_entities(self):
+        content = "<p>Caf&eacute; <strong>con</strong>\n leche</p><script></script>"
+        self.assertEqual(plain_text(content), "Café con leche")
+
+    def test_handles_empty_content(self):
+        self.assertEqual(plain_text(None), "")
+
+
+class TestSearchPosts(TestCase):
+    def setUp(self):
+        self.blog = BlogFactory()
+
+    def test_matches_words_in_content_ignoring_markup(self):
+        PostFactory(blog=self.blog, title="First post", content="<p>Django <em>rocks</em></p>")
+        PostFactory(blog=self.blog, title="Second post", content="<p>Nothing here</p>")
+        self.assertEqual(_titles(search_posts(Post.objects.all(), "rocks")), ["First post"])
+        self.assertFalse(search_posts(Post.objects.all(), "em").exists())
+
+    def test_requires_every_word(self):
+        PostFactory(blog=self.blog, title="Python tips", content="Fast queries")
+        PostFactory(blog=self.blog, title="Python news", content="Slow queries")
+        self.assertEqual(
+            _titles(search_posts(Post.objects.all(), "python fast")), ["Python tips"]
+        )
+
+    def test_title_matches_rank_first(self):
+        PostFactory(blog=self.blog, title="About cooking", content="Pasta recipes and more")
+        PostFactory(blog=self.blog, title="Pasta night", content="Tonight we cook")
+        self.assertEqual(
+            _titles(search_posts(Post.objects.all(), "pasta")),
+            ["Pasta night", "About cooking"],
+        )
+
+    def test_quotes_are_escaped(self):
+        PostFactory(blog=self.blog, title="Quoted words", content="say hello")
+        self.assertFalse(search_posts(Post.objects.all(), '"hello OR').exists())
+
+    def test_blank_query_matches_nothing(self):
+        PostFactory(blog=self.blog)
+        self.assertFalse(search_posts(Post.objects.all(), "   ").exists())
+
+    def test_index_follows_updates_and_deletes(self):
+        post = PostFactory(blog=self.blog, title="Original title", content="apples")
+        post.content = "oranges"
+        post.save()
+        self.assertFalse(search_posts(Post.objects.all(), "apples").exists())
+        self.assertTrue(search_posts(Post.objects.all(), "oranges").exists())
+        post.delete()
+        self.assertFalse(search_posts(Post.objects.all(), "oranges").exists())
+
+    def test_bulk_created_posts_are_indexed(self):
+        items = [{"title": f"Bulk post {i}", "content": "<b>searchable</b>"} for i in range(3)]
+        bulk_create_posts(self.blog.user, items, blog=self.blog)
+        self.assertEqual(search_posts(Post.objects.all(), "searchable").count(), 3)
+
+
+class TestPostSearchEndpoint(TestCase):
+    def setUp(self):
+        self.client = Client()
+        blog = BlogFactory(user=UserFactory())
+        for i in range(5):
+            PostFactory(blog=blog, title=f"Search hit {i}", content="needle")
+        PostFactory(blog=blog, title="Another post", content="haystack")
+        self.url = reverse("post-list")
+
+    def test_q_filters_and_paginates(self):
+        response = self.client.get(self.url, {"q": "needle", "page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        titles = [post["title"] for post in response.data["results"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            titles += [post["title"] for post in response.data["results"]]
+        self.assertEqual(sorted(titles), [f"Search hit {i}" for i in range(5)])
+
+
+class TestSearchPostsQuery(GraphQLTestCase):
+    def test_search_posts(self):
+        blog = BlogFactory()
+        PostFactory(blog=blog, title="GraphQL search", content="<p>needle</p>")
+        PostFactory(blog=blog, title="Unrelated post", content="haystack")
+        query = """
+        query {
+            searchPosts(query: "needle", first: 10) {
+                edges {
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+        """
+        result = self.client.execute(query)
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        edges = result["data"]["searchPosts"]["edges"]
+        self.assertEqual([edge["node"]["title"] for edge in edges], ["GraphQL search"])
+
+    def test_search_posts_requires_query(self):
+        result = self.client.execute('query { searchPosts(query: " ") { edges { node { id } } } }')
+        self.assertIsNotNone(result.get("errors"))
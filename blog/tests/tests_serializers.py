@@ -0,0 +1,74 @@
+from django.db.models.signals import m2m_changed
+from django.test import TestCase
+from blog.serializers import PostSerializer
+from blog.tests.factories import BlogFactory, PostFactory, TagFactory
+from tag.models import Tag
+
+
+class TestPostSerializerTags(TestCase):
+    def setUp(self):
+        self.blog = BlogFactory()
+        self.tags = [TagFactory(name=f"tag{i}") for i in range(30)]
+
+    def _data(self, tag_ids):
+        return {"title": "A post title", "content": "Some content", "tags": tag_ids}
+
+    def test_validates_all_tags_with_one_query(self):
+        serializer = PostSerializer(data=self._data([t.id for t in self.tags]))
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_reports_every_missing_tag(self):
+        serializer = PostSerializer(data=self._data([self.tags[0].id, 9998, 9999]))
+        self.assertFalse(serializer.is_valid())
+        message = str(serializer.errors["tags"][0])
+        self.assertIn("9998", message)
+        self.assertIn("9999", message)
+
+    def test_rejects_non_integer_ids(self):
+        serializer = PostSerializer(data=self._data(["abc"]))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("tags", serializer.errors)
+
+    def test_create_writes_tags_in_one_insert(self):
+        serializer = PostSerializer(data=self._data([t.id for t in self.tags]))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        # savepoint, post insert, blog counter, search index, through-table
+        # insert, one tag counter update for all 30 tags, release
+        with self.assertNumQueries(7):
+            post = serializer.save(blog=self.blog)
+        self.assertEqual(post.tags.count(), 30)
+
+    def test_update_replaces_tag_set(self):
+        post = PostFactory(blog=self.blog)
+        post.tags.set(self.tags[:3])
+        serializer = PostSerializer(
+            post, data=self._data([self.tags[2].id, self.tags[5].id])
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        self.assertEqual(
+            set(post.tags.values_list("id", flat=True)),
+            {self.tags[2].id, self.tags[5].id},
+        )
+
+    def test_m2m_changed_signals_are_sent(self):
+        post = PostFactory(blog=self.blog)
+        post.tags.set(self.tags[:2])
+        received = []
+
+        def receiver(sender, action, pk_set, **kwargs):
+            received.append((action, pk_set))
+
+        m2m_changed.connect(receiver, sender=Tag.posts.through)
+        try:
+            serializer = PostSerializer(
+                post, data=self._data([self.tags[1].id, self.tags[2].id])
+            )
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            serializer.save()
+        finally:
+            m2m_changed.disconnect(receiver, sender=Tag.posts.through)
+
+        self.assertIn(("post_remove", {self.tags[0].id}), received)
+        self.assertIn(("post_add", {self.tags[2].id}), received)
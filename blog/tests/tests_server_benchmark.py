@@ -0,0 +1,49 @@
+import asyncio
+from urllib.parse import urlsplit
+
+from django.core.cache import cache
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from blog.server_benchmark import _read_response, run_load, server_command
+from blog.tests.factories import BlogFactory, PostFactory
+
+
+class TestLoad(LiveServerTestCase):
+    def setUp(self):
+        cache.clear()
+        PostFactory(blog=BlogFactory())
+
+    def test_run_load(self):
+        url = urlsplit(self.live_server_url)
+        summary = asyncio.run(
+            run_load(url.hostname, url.port, connections=3, duration=0.5, timeout=10)
+        )
+        self.assertGreater(summary["requests"], 0)
+        self.assertEqual(summary["errors"], {"connection": 0, "status": 0})
+        self.assertLessEqual(summary["latency_ms"]["p50"], summary["latency_ms"]["max"])
+
+
+class TestServerBenchmarkHelpers(SimpleTestCase):
+    def read(self, data):
+        async def read():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            return await _read_response(reader), await reader.read()
+
+        return asyncio.run(read())
+
+    def test_reads_chunked_and_sized_bodies(self):
+        chunked = (
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"3\r\nabc\r\n0\r\n\r\n"
+        )
+        self.assertEqual(self.read(chunked + b"next"), ((200, True), b"next"))
+        sized = b"HTTP/1.1 404 Not Found\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{}"
+        self.assertEqual(self.read(sized), ((404, False), b""))
+
+    def test_server_commands(self):
+        self.assertIn("Core.wsgi:application", server_command("waitress", 8000))
+        self.assertIn("Core.asgi:application", server_command("uvicorn", 8000, workers=4))
+        with self.assertRaises(ValueError):
+            server_command("gunicorn", 8000)
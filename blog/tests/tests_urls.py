@@ -54,8 +54,8 @@ class TestUrls(TestCase):
         url = reverse("post-list")
         response = self.client.get(url, {"blog_id": self.blog.id})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["id"], self.post.id)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], self.post.id)
 
     def test_get_posts_by_invalid_blog_id(self):
         self.client.force_login(self.user)
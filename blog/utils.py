@@ -0,0 +1,127 @@
+from django.db import router, transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed
+from tag.models import Tag
+from .counters import batched_counters
+from .models import Blog
+
+PostTag = Tag.posts.through
+
+
+def _send_m2m_changed(action, post, tag_ids, using):
+    m2m_changed.send(
+        sender=PostTag,
+        action=action,
+        instance=post,
+        reverse=True,
+        model=Tag,
+        pk_set=set(tag_ids),
+        using=using,
+    )
+
+
+def _apply_tag_changes(posts, additions, removals):
+    """
+    Write the ``{post_id: tag_ids}`` additions and removals with one delete
+    and one bulk insert, sending the same m2m_changed signals as
+    ``post.tags.add``/``remove``.
+    """
+    using = router.db_for_write(PostTag)
+    posts = [post for post in posts if additions.get(post.pk) or removals.get(post.pk)]
+
+    with transaction.atomic(using=using, savepoint=False), batched_counters():
+        for post in posts:
+            if removals.get(post.pk):
+                _send_m2m_changed("pre_remove", post, removals[post.pk], using)
+        condition = Q()
+        for post_id, tag_ids in removals.items():
+            if tag_ids:
+                condition |= Q(post_id=post_id, tag_id__in=tag_ids)
+        if condition:
+            PostTag.objects.using(using).filter(condition).delete()
+        for post in posts:
+            if removals.get(post.pk):
+                _send_m2m_changed("post_remove", post, removals[post.pk], using)
+
+        for post in posts:
+            if additions.get(post.pk):
+                _send_m2m_changed("pre_add", post, additions[post.pk], using)
+        PostTag.objects.using(using).bulk_create(
+            [
+                PostTag(post_id=post_id, tag_id=tag_id)
+                for post_id, tag_ids in additions.items()
+                for tag_id in tag_ids
+            ],
+            ignore_conflicts=True,
+        )
+        for post in posts:
+            if additions.get(post.pk):
+                _send_m2m_changed("post_add", post, additions[post.pk], using)
+
+    for post in posts:
+        getattr(post, "_prefetched_objects_cache", {}).pop("tags", None)
+
+
+def _existing_tags(posts):
+    existing = {post.pk: set() for post in posts}
+    rows = PostTag.objects.filter(post_id__in=existing.keys()).values_list(
+        "post_id", "tag_id"
+    )
+    for post_id, tag_id in rows:
+        existing[post_id].add(tag_id)
+    return existing
+
+
+def set_tags_by_post(tags_by_post, created=False):
+    """
+    Make ``tags_by_post[post]`` the exact tag set of each post. Pass
+    ``created=True`` for posts that cannot have tags yet to skip the lookup.
+    """
+    posts = list(tags_by_post)
+    wanted = {post.pk: set(tag_ids) for post, tag_ids in tags_by_post.items()}
+    if created:
+        existing = {post.pk: set() for post in posts}
+    else:
+        existing = _existing_tags(posts)
+    _apply_tag_changes(
+        posts,
+        additions={pk: wanted[pk] - current for pk, current in existing.items()},
+        removals={pk: current - wanted[pk] for pk, current in existing.items()},
+    )
+
+
+def set_posts_tags(posts, tag_ids, created=False):
+    """Make ``tag_ids`` the exact tag set of every post in ``posts``."""
+    set_tags_by_post({post: tag_ids for post in posts}, created=created)
+
+
+def add_posts_tags(posts, tag_ids):
+    """Add ``tag_ids`` to every post in ``posts`` with one insert."""
+    tag_ids = set(tag_ids)
+    existing = _existing_tags(posts)
+    _apply_tag_changes(
+        posts,
+        additions={pk: tag_ids - current for pk, current in existing.items()},
+        removals={},
+    )
+
+
+def remove_posts_tags(posts, tag_ids):
+    """Remove ``tag_ids`` from every post in ``posts`` with one delete."""
+    tag_ids = set(tag_ids)
+    existing = _existing_tags(posts)
+    _apply_tag_changes(
+        posts,
+        additions={},
+        removals={pk: tag_ids & current for pk, current in existing.items()},
+    )
+
+
+def get_or_create_user_blog(user):
+    if hasattr(user, "blog"):
+        return user.blog
+    return Blog.objects.create(
+        title=f"Blog de {user.username}",
+        description="Blog personal",
+        user=user,
+    )
@@ -1,23 +1,45 @@
-from rest_framework import viewsets
+from django.conf import settings
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from Core.async_views import AsyncViewSetMixin
 from .models import Blog, Post
 from .serializers import (
     BlogSerializer,
     PostSerializer,
 )
 from .mixins import (
+    AsyncReadActionsMixin,
     PublicReadOnlyMixin,
+    PublicResponseCacheMixin,
+    ConditionalGetMixin,
     BlogOwnerPermissionMixin,
     PostEditorMixin,
     LimitBlogChoicesToOwnerMixin,
     PostOwnerQuerysetViewSetMixin,
+    StreamingListMixin,
+    SerializerPrefetchMixin,
 )
+from .constants import (
+    BLOG_ORDERING,
+    POST_ORDERING,
+    POST_SEARCH_ORDERING,
+    POST_BULK_INVALID_PAYLOAD,
+    POST_BULK_TOO_MANY_ITEMS,
+    POST_BULK_MAX_ITEMS,
+)
+from .bulk import bulk_create_posts, bulk_update_posts, bulk_delete_posts
+from .parsers import NDJSONParser
+from .search import search_posts
+from .utils import get_or_create_user_blog
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework.exceptions import ValidationError
 
 @extend_schema_view(
     list=extend_schema(
         summary="Listar blogs",
-        description="Obtiene una lista de todos los blogs disponibles. Los blogs son públicos para lectura.",
+        description="Obtiene una lista paginada por cursor de los blogs disponibles. Los blogs son públicos para lectura. Con ?stream=1 devuelve todos los blogs en NDJSON.",
         tags=["Blogs"],
     ),
     create=extend_schema(
@@ -42,14 +64,24 @@ from rest_framework.exceptions import ValidationError
     ),
 )
 class BlogViewSet(
+    AsyncViewSetMixin,
+    AsyncReadActionsMixin,
     BlogOwnerPermissionMixin,
     PublicReadOnlyMixin,
+    PublicResponseCacheMixin,
+    ConditionalGetMixin,
+    StreamingListMixin,
+    SerializerPrefetchMixin,
     viewsets.ModelViewSet,
     LimitBlogChoicesToOwnerMixin,
 ):
 
     queryset = Blog.objects.all()
     serializer_class = BlogSerializer
+    keyset_ordering = BLOG_ORDERING
+    cache_models = ("blog.blog", settings.AUTH_USER_MODEL.lower())
+    # post_count changes through UPDATE, which bumps blog.blog but not updated_at.
+    validator_models = ("blog.blog", settings.AUTH_USER_MODEL.lower())
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -58,7 +90,7 @@ class BlogViewSet(
 @extend_schema_view(
     list=extend_schema(
         summary="Listar posts",
-        description="Obtiene una lista de posts. Se pueden filtrar por blog.",
+        description="Obtiene una lista paginada por cursor de posts. Se pueden filtrar por blog. Con ?q= busca en el título y el contenido y ordena por relevancia. Con ?stream=1 devuelve todos los posts en NDJSON.",
         tags=["Posts"],
     ),
     create=extend_schema(
@@ -81,21 +113,46 @@ class BlogViewSet(
         description="Elimina un post. Solo el propietario puede eliminar.",
         tags=["Posts"],
     ),
+    bulk=extend_schema(
+        summary="Operaciones masivas de posts",
+        description=(
+            "Crea (POST), actualiza (PATCH) o elimina (DELETE) varios posts en una "
+            "sola transacción. Acepta una lista JSON o un flujo NDJSON y devuelve "
+            "los errores de cada elemento por su índice. Requiere autenticación."
+        ),
+        tags=["Posts"],
+    ),
 )
 class PostViewSet(
-    BlogOwnerPermissionMixin,
+    AsyncViewSetMixin,
+    AsyncReadActionsMixin,
     PublicReadOnlyMixin,
     PostOwnerQuerysetViewSetMixin,
     PostEditorMixin,
+    PublicResponseCacheMixin,
+    ConditionalGetMixin,
+    StreamingListMixin,
+    SerializerPrefetchMixin,
     viewsets.ModelViewSet,
 ):
 
     queryset = Post.objects.all()
     serializer_class = PostSerializer
+    # Post responses list tag ids; deleting a tag drops its rows without m2m_changed.
+    cache_models = ("blog.post", "tag.tag_posts", "tag.tag")
+    validator_models = ("tag.tag_posts", "tag.tag")
+
+    @property
+    def keyset_ordering(self):
+        request = getattr(self, "request", None)
+        if request is not None and request.query_params.get("q", "").strip():
+            return POST_SEARCH_ORDERING
+        return POST_ORDERING
 
     def get_queryset(self):
         qs = super().get_queryset()
         blog_id = self.request.query_params.get("blog_id")
+        query = self.request.query_params.get("q", "").strip()
 
         if blog_id is not None:
             try:
@@ -107,5 +164,43 @@ class PostViewSet(
 
             qs = qs.filter(blog_id=blog_id_int)
 
+        if query:
+            qs = search_posts(qs, query)
+
         return qs
 
+    @action(
+        detail=False,
+        methods=["post", "patch", "delete"],
+        url_path="bulk",
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"detail": POST_BULK_INVALID_PAYLOAD})
+        if len(items) > POST_BULK_MAX_ITEMS:
+            raise ValidationError(
+                {"detail": POST_BULK_TOO_MANY_ITEMS.format(limit=POST_BULK_MAX_ITEMS)}
+            )
+
+        if request.method == "POST":
+            blog = get_or_create_user_blog(request.user)
+            posts, errors = bulk_create_posts(request.user, items, blog=blog)
+            results = PostSerializer(posts, many=True).data
+            success_status = status.HTTP_201_CREATED
+        elif request.method == "PATCH":
+            posts, errors = bulk_update_posts(request.user, items)
+            results = PostSerializer(posts, many=True).data
+            success_status = status.HTTP_200_OK
+        else:
+            results, errors = bulk_delete_posts(request.user, items)
+            success_status = status.HTTP_200_OK
+
+        if not errors:
+            response_status = success_status
+        elif results:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({"results": results, "errors": errors}, status=response_status)
@@ -0,0 +1 @@
+pytest_plugins = ["Core.pytest_query_budget"]
@@ -1,18 +1,30 @@
 from django.contrib import admin
 from .models import Tag
+from import_export import resources
 from import_export.admin import ImportExportModelAdmin
+from blog.mixins import StreamingExportAdminMixin
 
 
-class TagAdmin(ImportExportModelAdmin):
+class TagResource(resources.ModelResource):
+    class Meta:
+        model = Tag
+        # Counters are maintained by blog.counters, never imported.
+        exclude = ("post_count",)
+
+
+class TagAdmin(StreamingExportAdminMixin, ImportExportModelAdmin):
+    resource_classes = [TagResource]
+    export_name = "tags"
     list_display = ["name", "get_posts_count"]
     search_fields = ["name"]
     list_per_page = 50
     ordering = ["name"]
 
     def get_posts_count(self, obj):
-        return obj.posts.count()
+        return obj.post_count
 
     get_posts_count.short_description = "Posts counter"
+    get_posts_count.admin_order_field = "post_count"
 
 
 admin.site.register(Tag, TagAdmin)
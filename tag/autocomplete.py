@@ -0,0 +1,64 @@
+import threading
+from bisect import bisect_left
+
+from django.db import connections, router
+from django.db.models.functions import Upper
+
+from .constants import TAG_AUTOCOMPLETE_MAX_LIMIT
+from .models import Tag
+
+
+def _key(name):
+    return name.upper()
+
+
+class PrefixIndex:
+    """
+    Tag names sorted by their upper-cased form so that a prefix lookup is a
+    binary search plus a short scan. Used where the database has no
+    pattern-matching index (SQLite); rebuilt lazily after any tag change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+        self._keys = None
+
+    def invalidate(self):
+        with self._lock:
+            self._entries = None
+            self._keys = None
+
+    def _load(self, using):
+        with self._lock:
+            if self._entries is None:
+                rows = Tag.objects.using(using).values_list("id", "name")
+                self._entries = sorted(
+                    (_key(name), pk, name) for pk, name in rows.iterator()
+                )
+                self._keys = [entry[0] for entry in self._entries]
+            return self._entries, self._keys
+
+    def search(self, prefix, limit, using):
+        entries, keys = self._load(using)
+        prefix = _key(prefix)
+        matches = []
+        for index in range(bisect_left(keys, prefix), len(entries)):
+            key, pk, name = entries[index]
+            if not key.startswith(prefix) or len(matches) == limit:
+                break
+            matches.append(Tag.from_db(using, ["id", "name"], (pk, name)))
+        return matches
+
+
+prefix_index = PrefixIndex()
+
+
+def autocomplete_tags(prefix, limit):
+    limit = max(0, min(limit, TAG_AUTOCOMPLETE_MAX_LIMIT))
+    using = router.db_for_read(Tag)
+    if connections[using].vendor == "sqlite":
+        return prefix_index.search(prefix, limit, using)
+    # Served by the UPPER(name) text_pattern_ops index on PostgreSQL.
+    tags = Tag.objects.using(using).filter(name__istartswith=prefix)
+    return list(tags.order_by(Upper("name"), "id")[:limit])
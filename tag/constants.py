@@ -25,3 +25,9 @@ TAG_ERROR_DELETING = "Error deleting tag"
 TAG_ERROR_ADDING_TO_POST = "Error adding tag to post"
 TAG_ERROR_REMOVING_FROM_POST = "Error removing tag from post"
 
+# Keyset pagination orderings (must end with a unique column)
+TAG_ORDERING = ("name", "id")
+
+# Autocomplete
+TAG_AUTOCOMPLETE_DEFAULT_LIMIT = 10
+TAG_AUTOCOMPLETE_MAX_LIMIT = 50
@@ -0,0 +1,36 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# icontains/istartswith compare UPPER(name), so the indexes are built on
+# that expression. text_pattern_ops is the text twin of varchar_pattern_ops,
+# which is what UPPER() returns.
+INDEXES = {
+    "tag_tag_name_upper_trgm": "USING GIN (UPPER(name) gin_trgm_ops)",
+    "tag_tag_name_upper_prefix": "(UPPER(name) text_pattern_ops)",
+}
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, definition in INDEXES.items():
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON tag_tag {definition}")
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tag", "0002_alter_tag_name"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
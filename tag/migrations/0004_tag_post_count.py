@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-17 22:35
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_posts(apps, schema_editor):
+    Tag = apps.get_model("tag", "Tag")
+    links = (
+        Tag.posts.through.objects.filter(tag_id=OuterRef("pk"))
+        .order_by()
+        .values("tag_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Tag.objects.using(schema_editor.connection.alias).update(
+        post_count=Coalesce(Subquery(links, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tag', '0003_tag_name_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+# Tag.posts' auto-created through table only has (tag_id, post_id) unique and
+# single-column indexes. Loading the tags of a page of posts filters on
+# post_id and reads tag_id, which this index answers without the table.
+INDEX = "tag_tag_posts_post_tag_idx"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tag", "0004_tag_post_count"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f"CREATE INDEX IF NOT EXISTS {INDEX} ON tag_tag_posts (post_id, tag_id)",
+            f"DROP INDEX IF EXISTS {INDEX}",
+        ),
+    ]
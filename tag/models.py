@@ -18,6 +18,16 @@ class Tag(models.Model):
         help_text="Tag name (minimum 2 characters)",
         unique=True,
     )
+    # Maintained by blog.counters.
+    post_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
+
+    @staticmethod
+    def filter_tags_by_name(queryset, name, prefix=False):
+        if name is None:
+            return queryset.none()
+        if prefix:
+            return queryset.filter(name__istartswith=name)
+        return queryset.filter(name__icontains=name)
@@ -1,5 +1,6 @@
 import graphene
 from .models import Tag
+from .autocomplete import autocomplete_tags
 from user.exceptions import (
     AuthenticationError,
     PermissionDeniedError,
@@ -8,7 +9,10 @@ from user.exceptions import (
 )
 from user.utils import get_authenticated_user, is_superuser
 from blog.models import Post
-from Core.graphql_types import TagType, PostType
+from Core.graphql_types import TagType, PostType, TagConnection, PostConnection, MatchMode
+from Core.dataloaders import attach_batch
+from Core.pagination import KeysetConnectionField
+from blog.constants import POST_ORDERING
 from tag.constants import (
     AUTH_NOT_AUTHENTICATED,
     TAG_NAME_REQUIRED,
@@ -28,25 +32,40 @@ from tag.constants import (
     TAG_ERROR_DELETING,
     TAG_ERROR_ADDING_TO_POST,
     TAG_ERROR_REMOVING_FROM_POST,
+    TAG_ORDERING,
+    TAG_AUTOCOMPLETE_DEFAULT_LIMIT,
 )
 
 
 class Query(graphene.ObjectType):
-    tags = graphene.List(TagType)
+    tags = KeysetConnectionField(TagConnection, ordering=TAG_ORDERING)
     tag = graphene.Field(TagType, id=graphene.ID(required=True))
-    posts_by_tag = graphene.List(PostType, id=graphene.ID(required=True))
+    posts_by_tag = KeysetConnectionField(
+        PostConnection, ordering=POST_ORDERING, id=graphene.ID(required=True)
+    )
     tags_by_post = graphene.List(TagType, id=graphene.ID(required=True))
     tags_by_post_name = graphene.List(TagType, post_name=graphene.String(required=True))
-    tags_by_name = graphene.List(TagType, name=graphene.String(required=True))
+    tags_by_name = graphene.List(
+        TagType,
+        name=graphene.String(required=True),
+        match=MatchMode(default_value=MatchMode.CONTAINS.value),
+    )
     tags_by_name_and_post_id = graphene.List(
         TagType,
         name=graphene.String(required=True),
         post_id=graphene.ID(required=True),
+        match=MatchMode(default_value=MatchMode.CONTAINS.value),
     )
     tags_by_name_and_post_name = graphene.List(
         TagType,
         name=graphene.String(required=True),
         post_name=graphene.String(required=True),
+        match=MatchMode(default_value=MatchMode.CONTAINS.value),
+    )
+    tag_autocomplete = graphene.List(
+        TagType,
+        prefix=graphene.String(required=True),
+        limit=graphene.Int(default_value=TAG_AUTOCOMPLETE_DEFAULT_LIMIT),
     )
 
     def resolve_tags(self, info):
@@ -82,30 +101,44 @@ class Query(graphene.ObjectType):
         except Post.DoesNotExist:
             raise NotFoundError(TAG_POST_NOT_FOUND)
 
-    def resolve_tags_by_name(self, info, name):
+    def resolve_tags_by_name(self, info, name, match=MatchMode.CONTAINS):
         try:
-            return Tag.objects.filter(name__icontains=name)
+            return Tag.filter_tags_by_name(
+                Tag.objects.all(), name, prefix=match == MatchMode.PREFIX
+            )
         except Exception as e:
             raise BaseAPIException(f"{TAG_ERROR_FILTERING}: {e}")
 
-    def resolve_tags_by_name_and_post_name(self, info, name, post_name):
+    def resolve_tags_by_name_and_post_name(self, info, name, post_name, match=MatchMode.CONTAINS):
         try:
             post = Post.objects.get(title=post_name)
-            return Tag.objects.filter(name__icontains=name, posts=post)
+            return Tag.filter_tags_by_name(
+                Tag.objects.filter(posts=post), name, prefix=match == MatchMode.PREFIX
+            )
         except Post.DoesNotExist:
             raise NotFoundError(TAG_POST_NOT_FOUND)
         except Exception as e:
             raise BaseAPIException(f"{TAG_ERROR_FILTERING}: {e}")
 
-    def resolve_tags_by_name_and_post_id(self, info, name, post_id):
+    def resolve_tags_by_name_and_post_id(self, info, name, post_id, match=MatchMode.CONTAINS):
         try:
             post = Post.objects.get(id=post_id)
-            return Tag.objects.filter(name__icontains=name, posts=post)
+            return Tag.filter_tags_by_name(
+                Tag.objects.filter(posts=post), name, prefix=match == MatchMode.PREFIX
+            )
         except Post.DoesNotExist:
             raise NotFoundError(TAG_POST_NOT_FOUND)
         except Exception as e:
             raise BaseAPIException(f"{TAG_ERROR_FILTERING}: {e}")
 
+    def resolve_tag_autocomplete(self, info, prefix, limit):
+        if not prefix.strip():
+            return []
+        try:
+            return attach_batch(autocomplete_tags(prefix, limit))
+        except Exception as e:
+            raise BaseAPIException(f"{TAG_ERROR_FILTERING}: {e}")
+
 
 class CreateTag(graphene.Mutation):
     tag = graphene.Field(TagType)
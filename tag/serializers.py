@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from Core.profiling import ProfiledSerializerMixin
 from .models import Tag
 from drf_spectacular.utils import extend_schema_serializer
 from drf_spectacular.openapi import OpenApiExample
@@ -10,13 +11,14 @@ from drf_spectacular.openapi import OpenApiExample
             "Tag Example",
             summary="Ejemplo de etiqueta",
             description="Una etiqueta simple",
-            value={"id": 1, "name": "tecnología"},
+            value={"id": 1, "name": "tecnología", "post_count": 3},
         )
     ]
 )
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Tag
-        fields = ["id", "name"]
+        fields = ["id", "name", "post_count"]
+        read_only_fields = ["post_count"]
 
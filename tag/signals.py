@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blog.response_cache import bump_generation, model_label
+
+from .autocomplete import prefix_index
+from .models import Tag
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_prefix_index(sender, **kwargs):
+    prefix_index.invalidate()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_responses(sender, **kwargs):
+    bump_generation(model_label(sender))
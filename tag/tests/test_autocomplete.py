@@ -0,0 +1,72 @@
+from django.test import TestCase
+from blog.tests.factories import TagFactory
+from Core.tests import GraphQLTestCase
+from tag.autocomplete import autocomplete_tags, prefix_index
+
+
+class TestAutocompleteTags(TestCase):
+    def setUp(self):
+        prefix_index.invalidate()
+        for name in ["django", "Django-ORM", "djangocon", "docker", "python"]:
+            TagFactory(name=name)
+
+    def _names(self, prefix, limit=10):
+        return [tag.name for tag in autocomplete_tags(prefix, limit)]
+
+    def test_matches_prefix_case_insensitively(self):
+        self.assertEqual(self._names("DJANGO"), ["django", "Django-ORM", "djangocon"])
+
+    def test_respects_limit(self):
+        self.assertEqual(self._names("d", limit=2), ["django", "Django-ORM"])
+
+    def test_no_match(self):
+        self.assertEqual(self._names("rust"), [])
+
+    def test_repeated_lookups_do_not_query(self):
+        self._names("py")
+        with self.assertNumQueries(0):
+            self.assertEqual(self._names("py"), ["python"])
+
+    def test_index_follows_tag_changes(self):
+        self.assertEqual(self._names("do"), ["docker"])
+        tag = TagFactory(name="dotnet")
+        self.assertEqual(self._names("do"), ["docker", "dotnet"])
+        tag.name = "golang"
+        tag.save()
+        self.assertEqual(self._names("do"), ["docker"])
+        tag.delete()
+        self.assertEqual(self._names("go"), [])
+
+
+class TestTagAutocompleteQuery(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        prefix_index.invalidate()
+        for name in ["react", "redis", "rust"]:
+            TagFactory(name=name)
+
+    def test_tag_autocomplete(self):
+        query = """
+        query {
+            tagAutocomplete(prefix: "re", limit: 5) {
+                name
+            }
+        }
+        """
+        result = self.client.execute(query)
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        names = [tag["name"] for tag in result["data"]["tagAutocomplete"]]
+        self.assertEqual(names, ["react", "redis"])
+
+    def test_tags_by_name_prefix_mode(self):
+        query = """
+        query {
+            tagsByName(name: "r", match: PREFIX) {
+                name
+            }
+        }
+        """
+        result = self.client.execute(query)
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        names = sorted(tag["name"] for tag in result["data"]["tagsByName"])
+        self.assertEqual(names, ["react", "redis", "rust"])
@@ -16,14 +16,18 @@ class TestTagQuery(GraphQLTestCase):
         query = """
         query {
             tags {
-                id
-                name
+                edges {
+                    node {
+                        id
+                        name
+                    }
+                }
             }
         }
         """
         result = self.client.execute(query)
         self.assertIsNone(result.get("errors"), result.get("errors"))
-        tags = result["data"]["tags"]
+        tags = result["data"]["tags"]["edges"]
         self.assertGreaterEqual(len(tags), 3)
 
     def test_query_tag_by_id_found(self):
@@ -77,14 +81,18 @@ class TestTagQuery(GraphQLTestCase):
         query = f"""
         query {{
             postsByTag(id: {self.tag1.id}) {{
-                id
-                title
+                edges {{
+                    node {{
+                        id
+                        title
+                    }}
+                }}
             }}
         }}
         """
         result = self.client.execute(query)
         self.assertIsNone(result.get("errors"), result.get("errors"))
-        posts = result["data"]["postsByTag"]
+        posts = result["data"]["postsByTag"]["edges"]
         self.assertGreaterEqual(len(posts), 1)
 
     def test_query_tags_by_post(self):
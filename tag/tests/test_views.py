@@ -16,7 +16,7 @@ class TestTagViewSet(TestCase):
     def test_list_tags(self):
         response = self.client.get("/cms/api/tags/")
         self.assertEqual(response.status_code, 200)
-        self.assertGreaterEqual(len(response.data), 1)
+        self.assertGreaterEqual(len(response.data["results"]), 1)
 
     def test_create_tag(self):
         data = {"name": "new-tag"}
@@ -1,14 +1,22 @@
 from rest_framework import viewsets
+from Core.async_views import AsyncViewSetMixin
 from .models import Tag
 from .serializers import TagSerializer
-from blog.mixins import PublicReadOnlyMixin
+from blog.mixins import (
+    AsyncReadActionsMixin,
+    PublicReadOnlyMixin,
+    PublicResponseCacheMixin,
+    StreamingListMixin,
+    SerializerPrefetchMixin,
+)
+from .constants import TAG_ORDERING
 from drf_spectacular.utils import extend_schema, extend_schema_view
 
 
 @extend_schema_view(
     list=extend_schema(
         summary="Listar tags",
-        description="Obtiene una lista de todas las etiquetas disponibles.",
+        description="Obtiene una lista paginada por cursor de las etiquetas disponibles. Con ?stream=1 devuelve todas las etiquetas en NDJSON.",
         tags=["Tags"],
     ),
     create=extend_schema(
@@ -30,7 +38,17 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
         summary="Eliminar tag", description="Elimina una etiqueta.", tags=["Tags"]
     ),
 )
-class TagViewSet(PublicReadOnlyMixin, viewsets.ModelViewSet):
+class TagViewSet(
+    AsyncViewSetMixin,
+    AsyncReadActionsMixin,
+    PublicReadOnlyMixin,
+    PublicResponseCacheMixin,
+    StreamingListMixin,
+    SerializerPrefetchMixin,
+    viewsets.ModelViewSet,
+):
 
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    keyset_ordering = TAG_ORDERING
+    cache_models = ("tag.tag",)
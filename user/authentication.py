@@ -0,0 +1,20 @@
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from user.token_cache import get_token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication backed by the process-wide token cache."""
+
+    def authenticate_credentials(self, key):
+        try:
+            token = get_token(key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+
+        return (token.user, token)
@@ -23,3 +23,11 @@ USER_ERROR_DURING_LOGOUT = "Error during logout"
 USER_ERROR_DELETING = "Error deleting user"
 USER_ERROR_UPDATING_PASSWORD = "Error updating password"
 
+# Keyset pagination orderings (must end with a unique column)
+USER_ORDERING = ("-date_joined", "-id")
+
+# Token cache (per process). Deleting a token or saving/deleting its user
+# invalidates it only in the process that made the change: other workers may
+# keep accepting a revoked token for up to TOKEN_CACHE_TTL seconds.
+TOKEN_CACHE_MAX_SIZE = 10000
+TOKEN_CACHE_TTL = 60
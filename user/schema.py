@@ -14,7 +14,8 @@ from user.exceptions import (
     BaseAPIException,
     NotFoundError,
 )
-from Core.graphql_types import UserType
+from Core.graphql_types import UserType, UserConnection
+from Core.pagination import KeysetConnectionField
 from user.constants import (
     AUTH_NOT_AUTHENTICATED,
     AUTH_INVALID_CREDENTIALS,
@@ -34,11 +35,12 @@ from user.constants import (
     USER_ERROR_DURING_LOGOUT,
     USER_ERROR_DELETING,
     USER_ERROR_UPDATING_PASSWORD,
+    USER_ORDERING,
 )
 
 
 class Query(graphene.ObjectType):
-    all_users = graphene.List(UserType)
+    all_users = KeysetConnectionField(UserConnection, ordering=USER_ORDERING)
     user_by_id = graphene.Field(UserType, id=graphene.ID(required=True))
 
     def resolve_all_users(root, info):
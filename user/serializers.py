@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from Core.profiling import ProfiledSerializerMixin
 from rest_framework.exceptions import ValidationError
 from django.contrib.auth.models import User
 from user.utils import authenticate_user
@@ -17,7 +18,7 @@ from drf_spectacular.openapi import OpenApiExample
         )
     ]
 )
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = User
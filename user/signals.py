@@ -0,0 +1,20 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .token_cache import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    """Cached tokens carry their user: deactivations and deletions must not be served."""
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    token_cache.invalidate_user(instance.pk)
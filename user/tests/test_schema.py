@@ -13,9 +13,13 @@ class TestQuery(GraphQLTestCase):
         query = """
         query {
             allUsers {
-                id
-                username
-                email
+                edges {
+                    node {
+                        id
+                        username
+                        email
+                    }
+                }
             }
         }
         """
@@ -23,7 +27,7 @@ class TestQuery(GraphQLTestCase):
 
         self.assertIsNone(result.get("errors"), result.get("errors"))
 
-        users = result["data"]["allUsers"]
+        users = [edge["node"] for edge in result["data"]["allUsers"]["edges"]]
         self.assertEqual(len(users), 1)
         self.assertEqual(int(users[0]["id"]), self.user.id)
         self.assertEqual(users[0]["username"], self.user.username)
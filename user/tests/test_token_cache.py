@@ -0,0 +1,128 @@
+from unittest.mock import Mock
+from django.test import Client, TestCase
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
+from blog.tests.factories import UserFactory
+from Core.tests import GraphQLTestCase
+from user.token_cache import TokenCache, get_token, token_cache
+from user.utils import delete_user_token
+
+
+class TestTokenCache(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = UserFactory()
+        self.token = Token.objects.create(user=self.user)
+
+    def test_second_lookup_skips_database(self):
+        get_token(self.token.key)
+        with self.assertNumQueries(0):
+            token = get_token(self.token.key)
+        self.assertEqual(token.user.id, self.user.id)
+
+    def test_unknown_token_raises(self):
+        with self.assertRaises(Token.DoesNotExist):
+            get_token("missing")
+
+    def test_entries_expire(self):
+        cache = TokenCache(ttl=0)
+        cache.set(self.token)
+        self.assertIsNone(cache.get(self.token.key))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenCache(max_size=2)
+        tokens = [Token.objects.create(user=UserFactory()) for _ in range(3)]
+        cache.set(tokens[0])
+        cache.set(tokens[1])
+        cache.get(tokens[0].key)
+        cache.set(tokens[2])
+        self.assertIsNotNone(cache.get(tokens[0].key))
+        self.assertIsNone(cache.get(tokens[1].key))
+
+    def test_callers_get_independent_copies(self):
+        get_token(self.token.key).user.first_name = "Changed"
+        self.assertNotEqual(get_token(self.token.key).user.first_name, "Changed")
+
+    def test_delete_user_token_invalidates(self):
+        get_token(self.token.key)
+        delete_user_token(self.user)
+        with self.assertRaises(Token.DoesNotExist):
+            get_token(self.token.key)
+
+
+class TestCachedTokenAuthentication(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.client = APIClient()
+        self.user = UserFactory()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_repeated_requests_reuse_cached_token(self):
+        self.assertEqual(self.client.get("/cms/api/auth/me/").status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get("/cms/api/auth/me/")
+        self.assertEqual(response.data["id"], self.user.id)
+
+    def test_logout_revokes_cached_token(self):
+        self.client.get("/cms/api/auth/me/")
+        self.client.post("/cms/api/auth/logout/")
+        self.assertEqual(self.client.get("/cms/api/auth/me/").status_code, 401)
+
+    def test_inactive_user_is_rejected(self):
+        self.assertEqual(self.client.get("/cms/api/auth/me/").status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/cms/api/auth/me/").status_code, 401)
+
+    def test_token_deleted_in_the_admin_is_revoked(self):
+        self.assertEqual(self.client.get("/cms/api/auth/me/").status_code, 200)
+        admin = Client()
+        admin.force_login(UserFactory(is_staff=True, is_superuser=True))
+        response = admin.post(f"/admin/authtoken/tokenproxy/{self.user.pk}/delete/", {"post": "yes"})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Token.objects.exists())
+        self.assertEqual(self.client.get("/cms/api/auth/me/").status_code, 401)
+
+    def test_bulk_deleted_tokens_are_revoked(self):
+        self.assertEqual(self.client.get("/cms/api/auth/me/").status_code, 200)
+        Token.objects.filter(user=self.user).delete()
+        self.assertEqual(self.client.get("/cms/api/auth/me/").status_code, 401)
+
+    def test_logins_keep_cached_tokens(self):
+        get_token(self.token.key)
+        self.user.save(update_fields=["last_login"])
+        self.assertIsNotNone(token_cache.get(self.token.key))
+
+
+class TestGraphQLAuthentication(GraphQLTestCase):
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        self.user = UserFactory(password="password")
+        self.token = Token.objects.create(user=self.user)
+        self.context = Mock()
+        self.context.headers = {"Authorization": f"Bearer {self.token.key}"}
+
+    def test_document_authenticates_once(self):
+        query = """
+        mutation {
+            first: createBlog(title: "First blog", description: "One") { success }
+            second: updatePassword(newPassword: "n3w-Passw0rd", confirmPassword: "n3w-Passw0rd") { success }
+        }
+        """
+        with self.assertNumQueries(3):
+            # token lookup, blog insert, user update
+            result = self.client.execute(query, context_value=self.context)
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+
+    def test_update_password_invalidates_cache(self):
+        get_token(self.token.key)
+        query = """
+        mutation {
+            updatePassword(newPassword: "n3w-Passw0rd", confirmPassword: "n3w-Passw0rd") { success }
+        }
+        """
+        result = self.client.execute(query, context_value=self.context)
+        self.assertIsNone(result.get("errors"), result.get("errors"))
+        self.assertIsNone(token_cache.get(self.token.key))
@@ -0,0 +1,102 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authtoken.models import Token
+
+from Core.metrics import token_cache_requests
+from user.constants import TOKEN_CACHE_MAX_SIZE, TOKEN_CACHE_TTL
+
+
+class TokenCache:
+    """
+    Process-wide LRU of token key -> Token (with its user) whose entries
+    expire after ``ttl`` seconds. Callers get copies so that relations cached
+    on a user during one request never leak into the next.
+    """
+
+    def __init__(self, max_size=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, token = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return _copy(token)
+
+    def set(self, token):
+        with self._lock:
+            self._entries[token.key] = (time.monotonic() + self.ttl, _copy(token))
+            self._entries.move_to_end(token.key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in [
+                key for key, (_, token) in self._entries.items() if token.user_id == user_id
+            ]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _copy(token):
+    user = copy.copy(token.user)
+    token = copy.copy(token)
+    token.user = user
+    return token
+
+
+token_cache = TokenCache()
+
+
+def get_token(key):
+    """Return the Token for ``key`` with its user, raising Token.DoesNotExist."""
+    token = token_cache.get(key)
+    if token is not None:
+        token_cache_requests.inc(result="hit")
+        return token
+    token_cache_requests.inc(result="miss")
+    tokens = Token.objects.select_related("user")
+    try:
+        token = tokens.get(key=key)
+    except Token.DoesNotExist:
+        if tokens.db == DEFAULT_DB_ALIAS:
+            raise
+        # Read from a replica that may not have the token created moments ago.
+        token = tokens.using(DEFAULT_DB_ALIAS).get(key=key)
+    token_cache.set(token)
+    return token
+
+
+def request_user(request):
+    """
+    The active user behind ``request``'s session or its ``Token``/``Bearer``
+    key, before any view has authenticated it; None for anonymous requests
+    and unknown keys.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+    scheme, _, key = request.headers.get("Authorization", "").partition(" ")
+    if scheme not in ("Bearer", "Token") or not key.strip():
+        return None
+    try:
+        token = get_token(key.strip())
+    except Token.DoesNotExist:
+        return None
+    return token.user if token.user.is_active else None
@@ -5,9 +5,12 @@ from django.contrib.auth import authenticate
 import logging
 from graphql import GraphQLResolveInfo
 from user.exceptions import AuthenticationError
+from user.token_cache import get_token
 
 logger = logging.getLogger(__name__)
 
+AUTH_MEMO_ATTR = "_authenticated_token"
+
 
 def is_superuser(user: Optional[User]) -> bool:
     return bool(user and getattr(user, "is_superuser", False))
@@ -43,8 +46,14 @@ def get_authenticated_user(info: GraphQLResolveInfo) -> User:
 
     token_key = auth_header.split("Bearer ")[1].strip()
 
+    # Several resolvers of one document share the request.
+    memo = getattr(info.context, "__dict__", {}).get(AUTH_MEMO_ATTR)
+    if memo is not None and memo.key == token_key:
+        return memo.user
+
     try:
-        token = Token.objects.select_related("user").get(key=token_key)
-        return token.user
+        token = get_token(token_key)
     except Token.DoesNotExist:
-        raise AuthenticationError("Invalid or expired token.")
\ No newline at end of file
+        raise AuthenticationError("Invalid or expired token.")
+    setattr(info.context, AUTH_MEMO_ATTR, token)
+    return token.user
\ No newline at end of file
@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
 from django.contrib.auth import login, logout
+from Core.async_views import AsyncViewSetMixin
 from user.serializers import LoginSerializer, UserSerializer, RegisterSerializer
 from user.mixins import AuthenticationMixin
 from drf_spectacular.utils import extend_schema, extend_schema_view
@@ -70,7 +71,7 @@ from drf_spectacular.utils import extend_schema, extend_schema_view
         },
     ),
 )
-class AuthViewSet(viewsets.ViewSet, AuthenticationMixin):
+class AuthViewSet(AsyncViewSetMixin, viewsets.ViewSet, AuthenticationMixin):
 
     @action(detail=False, methods=["post"])
     def login(self, request):
@@ -98,6 +99,10 @@ class AuthViewSet(viewsets.ViewSet, AuthenticationMixin):
     def me(self, request):
         return Response(UserSerializer(request.user).data)
 
+    async def ame(self, request):
+        # request.user was loaded by the authentication run before the handler.
+        return Response(UserSerializer(request.user).data)
+
     @action(detail=False, methods=["post"])
     def register(self, request):
         serializer = RegisterSerializer(data=request.data)